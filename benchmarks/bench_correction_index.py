@@ -0,0 +1,83 @@
+"""
+Microbenchmark: BK-tree backed phonetic_match / correct_misspelled_entity vs the previous linear scans,
+plus BK-tree lookup cost on synthetic dictionaries of growing size.
+
+Usage:
+    python benchmarks/bench_correction_index.py [--repeat 3] [--sizes 200,2000,20000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import textdistance
+from fuzzywuzzy import process
+
+from src.nlu_processor import COMMON_MISSPELLINGS, correct_misspelled_entity, phonetic_match
+from src.text_index import BKTree, levenshtein
+
+QUERIES = ["fevr", "dyabates", "mygrain", "alergi", "caugh", "kabz", "headake", "randomsymptom", "sore throte"]
+
+
+def legacy_phonetic_match(word, candidates_tuple):
+    candidates = list(candidates_tuple)
+    for variants in COMMON_MISSPELLINGS.values():
+        candidates.extend(variants)
+    best = max(candidates, key=lambda c: textdistance.levenshtein.normalized_similarity(word.lower(), c.lower()))
+    if textdistance.levenshtein.normalized_similarity(word.lower(), best.lower()) > 0.7:
+        for canonical, variants in COMMON_MISSPELLINGS.items():
+            if best.lower() == canonical.lower() or best.lower() in [v.lower() for v in variants]:
+                return canonical
+    return word
+
+
+def legacy_correct_misspelled_entity(word):
+    if word.lower() in COMMON_MISSPELLINGS:
+        return word.lower()
+    for canonical, variants in COMMON_MISSPELLINGS.items():
+        if word.lower() in [v.lower() for v in variants]:
+            return canonical
+    best, score = process.extractOne(word.lower(), COMMON_MISSPELLINGS.keys())
+    return best if score > 80 else word
+
+
+def synthetic_terms(count, seed=11):
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    return list({"".join(rng.choice(alphabet) for _ in range(rng.randint(4, 12))) for _ in range(count)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the query set per implementation")
+    parser.add_argument("--sizes", default="200,2000,20000", help="Comma-separated synthetic dictionary sizes")
+    args = parser.parse_args()
+
+    candidates = tuple(COMMON_MISSPELLINGS.keys())
+    calls = len(QUERIES) * args.repeat
+    phonetic_match(QUERIES[0], candidates)  # build the index outside the timed loop
+    rows = [
+        ("phonetic_match (legacy)", lambda: [legacy_phonetic_match(q, candidates) for q in QUERIES]),
+        ("phonetic_match (BK-tree)", lambda: [phonetic_match(q, candidates) for q in QUERIES]),
+        ("correct_misspelled (legacy)", lambda: [legacy_correct_misspelled_entity(q) for q in QUERIES]),
+        ("correct_misspelled (indexed)",
+         lambda: [correct_misspelled_entity.__wrapped__(q) for q in QUERIES]),  # bypass the memo
+    ]
+    for name, fn in rows:
+        seconds = timeit.timeit(fn, number=args.repeat)
+        print(f"{name:>30}: {seconds * 1e6 / calls:9.1f} µs/word")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        terms = synthetic_terms(size)
+        tree = BKTree(terms)
+        linear = timeit.timeit(lambda: [[t for t in terms if levenshtein(q, t) <= 2] for q in QUERIES], number=1)
+        indexed = timeit.timeit(lambda: [tree.search(q, 2) for q in QUERIES], number=1)
+        print(f"{len(terms):>6} terms, radius 2: linear {linear * 1e3 / len(QUERIES):8.2f} ms/word, "
+              f"BK-tree {indexed * 1e3 / len(QUERIES):7.2f} ms/word")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Microbenchmark: Aho-Corasick KB keyword augmentation vs the previous per-keyword re.finditer loop,
+on the shipped symptom KB and on synthetic KBs padded to thousands of symptoms.
+
+Usage:
+    python benchmarks/bench_kb_keyword_index.py [--repeat 20] [--sizes 87,1000,5000]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.nlu_processor import SarvamMNLUProcessor, _build_symptom_keyword_index
+
+SENTENCES = [
+    "I have had a headache and high fever since yesterday, also a sore throat",
+    "My father has chest discomfort, dizziness and feels very tired after walking",
+    "Baby has loose motions and vomiting since morning, not eating properly",
+    "mujhe kal se stomach pain aur cough hai, raat ko neend nahi aati",
+]
+
+
+def legacy_augment(symptom_kb, text):
+    """The original loop: one re.finditer per keyword, nested overlap scan per hit."""
+    entities = []
+    text_lower = text.lower()
+    for symptom_data in symptom_kb:
+        keywords = [symptom_data["symptom_name"].lower()] + [kw.lower() for kw in symptom_data.get("keywords", [])]
+        for keyword in keywords:
+            for match in re.finditer(re.escape(keyword), text_lower):
+                start, end = match.span()
+                if not any(max(start, s) < min(end, e) or keyword in t for t, s, e in entities):
+                    entities.append((text[start:end].lower(), start, end))
+    return entities
+
+
+def padded_kb(symptom_kb, size):
+    """The real KB followed by made-up symptoms, so matches stay the same while the KB grows."""
+    kb = list(symptom_kb)
+    i = 0
+    while len(kb) < size:
+        kb.append({"symptom_name": f"synthetic condition {i:05d}",
+                   "keywords": [f"zq{i:05d} ache", f"xv{i:05d}itis", f"kw{i:05d} pain"]})
+        i += 1
+    return kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the sentence set per implementation")
+    parser.add_argument("--sizes", default="87,1000,5000", help="Comma-separated KB sizes (symptoms)")
+    args = parser.parse_args()
+
+    processor = SarvamMNLUProcessor(api_key="benchmark")
+    calls = len(SENTENCES) * args.repeat
+    for size in (int(s) for s in args.sizes.split(",")):
+        kb = padded_kb(processor.symptom_kb, size)
+        index = _build_symptom_keyword_index(kb)
+
+        def run_legacy():
+            for text in SENTENCES:
+                legacy_augment(kb, text)
+
+        def run_indexed():
+            for text in SENTENCES:
+                sorted(index.iter_matches(text.lower()), key=lambda m: (m[2], m[0]))
+
+        legacy = timeit.timeit(run_legacy, number=args.repeat)
+        indexed = timeit.timeit(run_indexed, number=args.repeat)
+        print(f"KB {len(kb):>5} symptoms / {len(index):>6} keywords: "
+              f"legacy {legacy * 1e6 / calls:9.1f} µs/msg, index {indexed * 1e6 / calls:7.1f} µs/msg "
+              f"({legacy / indexed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Load test: full text pipeline (NLU -> response generation -> translation) against the local
+mock Sarvam server, with concurrent simulated users and configurable upstream latency / errors.
+
+Usage:
+    python benchmarks/bench_pipeline_mock.py [--users 8] [--turns 10] [--median 0.3] [--p95 1.0] [--error-rate 0.0]
+
+The client-side per-endpoint budgets still apply (chat: 5 req/s by default); run with
+HEALBEE_RATE_CHAT=0 HEALBEE_RATE_TRANSLATE=0 to measure the pipeline without them.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.mock_sarvam_server import EndpointProfile, MockSarvamServer
+
+QUERIES = [
+    ("I have had fever and headache since two days", "en-IN"),
+    ("How can I sleep better at night?", "en-IN"),
+    ("What is diabetes and how do I prevent it?", "en-IN"),
+    ("मुझे बुखार है और सिर में दर्द हो रहा है", "hi-IN"),
+    ("mujhe kal se cough aur body ache hai", "en-IN"),
+    ("Is paracetamol safe with a cold?", "en-IN"),
+]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--turns", type=int, default=10, help="Turns per user")
+    parser.add_argument("--median", type=float, default=0.3, help="Mock median latency (s)")
+    parser.add_argument("--p95", type=float, default=1.0, help="Mock p95 latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock 5xx rate")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Mock 429 threshold per endpoint (req/s)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    profile = EndpointProfile(args.median, args.p95, args.error_rate, args.rate_limit)
+    with MockSarvamServer(default=profile, seed=args.seed) as server:
+        # Must be set before the pipeline modules read it at import time
+        os.environ["SARVAM_BASE_URL"] = server.base_url
+        from src.cache import TwoTierCache
+        from src.http_transport import get_transport
+        from src.nlu_processor import SarvamMNLUProcessor
+        from src.response_generator import HealBeeResponseGenerator
+        from src.utils import HealBeeUtilities
+
+        # In-memory caches: mock answers must not land in the on-disk caches the real app reads
+        nlu = SarvamMNLUProcessor(api_key="mock", cache_llm=False)
+        nlu.sarvam_client.cache = TwoTierCache(db_path=None)
+        responder = HealBeeResponseGenerator(api_key="mock")
+        util = HealBeeUtilities(api_key="mock", translation_cache=TwoTierCache(db_path=None), cache_speech=False)
+
+        def user(index):
+            latencies = []
+            for turn in range(args.turns):
+                text, lang = QUERIES[(index + turn) % len(QUERIES)]
+                start = time.perf_counter()
+                result = nlu.process_transcription(f"{text} ({index}-{turn})", lang)
+                reply = responder.generate_response(text, result)
+                util.translate_text(reply, "hi-IN")
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            latencies = [t for user_latencies in pool.map(user, range(args.users)) for t in user_latencies]
+        elapsed = time.perf_counter() - start
+
+    print(f"{len(latencies)} turns by {args.users} users in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:.1f} turns/s)")
+    print(f"turn latency: p50 {statistics.median(latencies):.2f}s, p95 {percentile(latencies, 95):.2f}s, "
+          f"p99 {percentile(latencies, 99):.2f}s")
+    print(f"mock requests {server.stats.requests}, 5xx {server.stats.errors}, 429 {server.stats.throttled}")
+    transport = get_transport().stats()
+    print(f"transport retries {transport['retries']}, coalesced {transport['coalesced']}")
+    for endpoint, stats in transport["rate_limits"].items():
+        print(f"  {endpoint:9} waits {stats['waits']:4}, max wait {stats['max_wait_s']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
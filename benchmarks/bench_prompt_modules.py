@@ -0,0 +1,84 @@
+"""
+Compact intent-scoped system prompts vs the monolithic HEALTHCARE_SYSTEM_PROMPT: estimated
+input tokens per scenario, and generate_response latency against the local mock Sarvam server.
+
+Usage:
+    python benchmarks/bench_prompt_modules.py [--runs 20] [--median 0.2] [--per-kb 0.02]
+
+--per-kb adds mock latency per KiB of request body, standing in for the model's prompt
+processing time, so the latency columns reflect prompt size.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.mock_sarvam_server import EndpointProfile, MockSarvamServer
+
+PROFILE = {"name": "Asha", "age_range": "25-34", "gender": "female", "chronic_conditions": ["asthma"]}
+
+# (name, query, intent, session_context)
+SCENARIOS = [
+    ("wellness tip, first message", "How can I sleep better at night?", "wellness_tip", {}),
+    ("disease info, first message", "What is diabetes?", "disease_info", {}),
+    ("symptom, first message", "I have fever and headache since two days", "symptom_query", {}),
+    ("symptom, follow-up + profile", "Now I also feel tired", "symptom_query", {
+        "extracted_symptoms": ["fever", "headache"],
+        "follow_up_answers": [{"question": "How long?", "answer": "2 days"}],
+        "user_profile": PROFILE,
+    }),
+    ("nearby hospitals", "Hospitals near me", "general_health", {
+        "nearby_places": [{"name": "City Hospital", "address": "MG Road", "distance_km": 1.2}],
+    }),
+    ("reminder set", "Remind me to take my tablet at 9", "medication_info", {
+        "reminder_just_set": {"title": "Take tablet", "time": "09:00"},
+    }),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="generate_response calls per scenario and mode")
+    parser.add_argument("--median", type=float, default=0.2, help="Mock median chat latency (s)")
+    parser.add_argument("--per-kb", type=float, default=0.02, help="Mock latency per KiB of request body (s)")
+    args = parser.parse_args()
+
+    profile = EndpointProfile(args.median, args.median * 1.5, latency_per_kb=args.per_kb)
+    with MockSarvamServer(default=profile, seed=7) as server:
+        # Must be set before the pipeline modules read it at import time
+        os.environ["SARVAM_BASE_URL"] = server.base_url
+        from src.context_packer import estimate_tokens
+        from src.nlu_processor import HealthIntent, NLUResult
+        from src.response_generator import HealBeeResponseGenerator
+
+        generators = {
+            "compact": HealBeeResponseGenerator(api_key="mock", compact_prompts=True),
+            "full": HealBeeResponseGenerator(api_key="mock", compact_prompts=False),
+        }
+        print(f"{'scenario':30} {'full tok':>9} {'compact':>8} {'saved':>6} {'full p50':>9} {'compact p50':>12}")
+        for name, query, intent, context in SCENARIOS:
+            nlu = NLUResult(
+                original_text=query, intent=HealthIntent(intent), confidence=0.9, entities=[],
+                is_emergency=False, requires_disclaimer=True, language_detected="en-IN",
+            )
+            tokens, latency = {}, {}
+            for mode, generator in generators.items():
+                messages = generator._build_messages(query, nlu, context)
+                tokens[mode] = sum(estimate_tokens(m["content"]) for m in messages)
+                samples = []
+                for i in range(args.runs):
+                    start = time.perf_counter()
+                    # Distinct queries so identical requests are not coalesced
+                    generator.generate_response(f"{query} ({i})", nlu, context)
+                    samples.append(time.perf_counter() - start)
+                latency[mode] = statistics.median(samples)
+            saved = 1 - tokens["compact"] / tokens["full"]
+            print(f"{name:30} {tokens['full']:9} {tokens['compact']:8} {saved:6.0%} "
+                  f"{latency['full']:8.3f}s {latency['compact']:11.3f}s")
+
+
+if __name__ == "__main__":
+    main()
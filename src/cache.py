@@ -0,0 +1,345 @@
+"""
+Two-tier result cache: an in-memory LRU in front of an on-disk SQLite table.
+
+Values must be JSON-serializable. Entries expire after a TTL, both tiers are
+size-bounded (least recently used entries are evicted first), and hit / miss /
+eviction counters are kept for monitoring. If the SQLite file cannot be opened
+the cache keeps working in memory only.
+
+DiskLRUCache holds large binary values (synthesized speech) as one file per key,
+bounded by total bytes, with an in-memory LRU index of the files on disk.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_DIR = os.getenv("HEALBEE_CACHE_DIR", os.path.join(_PROJECT_ROOT, ".cache"))
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serializable parts (dict key order does not matter)."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class TwoTierCache:
+    """Thread-safe LRU + SQLite cache with TTL and size-based eviction."""
+
+    def __init__(self, db_path: Optional[str] = None, max_memory_entries: int = 512,
+                 max_disk_entries: int = 20000, ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Args:
+            db_path: SQLite file for the disk tier; None keeps the cache in memory only
+            max_memory_entries: Size of the in-memory LRU tier
+            max_disk_entries: Row limit of the SQLite tier
+            ttl_seconds: Age after which an entry is treated as missing
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._open_disk_tier(db_path)
+
+    def _open_disk_tier(self, db_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Could not open cache database at {db_path}: {e}. Caching in memory only.")
+            self._conn = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss (absent or expired)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        if now - row[1] <= self.ttl_seconds:
+                            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+                            self._conn.commit()
+                            value = json.loads(row[0])
+                            self._remember(key, row[1], value)
+                            self.hits += 1
+                            self.disk_hits += 1
+                            return value
+                        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        self._conn.commit()
+                except (sqlite3.Error, ValueError) as e:
+                    print(f"⚠️ Cache read failed: {e}")
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now),
+                )
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+                overflow = count - self.max_disk_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                        (overflow,),
+                    )
+                    self.evictions += overflow
+                self._conn.commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"⚠️ Cache write failed: {e}")
+
+    def _remember(self, key: str, created_at: float, value: Any) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM entries")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss / eviction counters and current tier sizes."""
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                try:
+                    (disk_entries,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+                except sqlite3.Error:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+
+class DiskLRUCache:
+    """Thread-safe file-per-key byte cache, bounded by total size (LRU eviction)."""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, suffix: str = ".bin"):
+        """
+        Args:
+            directory: Folder holding one file per entry (created if missing)
+            max_bytes: Total size of the entries; least recently used files are deleted beyond it
+            suffix: File extension of the entries
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        # key -> size in bytes, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _load_index(self) -> None:
+        """
+        Index the files already on disk, oldest access (mtime) first. Temp files left by a
+        write that never finished (crash, full disk) are deleted once they are a minute old.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".tmp"):
+                        self._remove_stale_tmp(entry)
+                    elif entry.is_file() and entry.name.endswith(self.suffix):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-len(self.suffix)], stat.st_size))
+        except OSError as e:
+            print(f"⚠️ Could not open cache directory {self.directory}: {e}")
+            return
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def _remove_stale_tmp(entry: os.DirEntry) -> None:
+        try:
+            # Younger ones may belong to another process still writing them
+            if time.time() - entry.stat().st_mtime > 60:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes, or None on a miss."""
+        with self._lock:
+            path = self._path(key)
+            if key not in self._index:
+                try:
+                    # Written by another process sharing the directory
+                    self._adopt(key, os.path.getsize(path))
+                except OSError:
+                    self.misses += 1
+                    return None
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)  # keeps the LRU order across restarts
+            except OSError:
+                # Deleted behind our back
+                self._total_bytes -= self._index.pop(key)
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Store bytes under key, evicting least recently used entries beyond max_bytes."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"⚠️ Cache write failed: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+            self._adopt(key, len(data))
+            self._evict()
+
+    def _adopt(self, key: str, size: int) -> None:
+        self._total_bytes += size - self._index.pop(key, 0)
+        self._index[key] = size
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Delete every entry (counters are kept)."""
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss / eviction counters, entry count and total size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
+
+
+_shared_caches: Dict[str, TwoTierCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_cache(name: str, **kwargs) -> TwoTierCache:
+    """
+    Process-wide cache stored at CACHE_DIR/<name>.sqlite3, created on first use.
+    kwargs are passed to TwoTierCache the first time only.
+    """
+    with _shared_caches_lock:
+        cache = _shared_caches.get(name)
+        if cache is None:
+            cache = TwoTierCache(os.path.join(CACHE_DIR, f"{name}.sqlite3"), **kwargs)
+            _shared_caches[name] = cache
+        return cache
+
+
+_shared_disk_caches: Dict[str, DiskLRUCache] = {}
+
+
+def get_shared_disk_cache(name: str, **kwargs) -> DiskLRUCache:
+    """
+    Process-wide DiskLRUCache stored in CACHE_DIR/<name>/, created on first use.
+    kwargs are passed to DiskLRUCache the first time only.
+    """
+    with _shared_caches_lock:
+        cache = _shared_disk_caches.get(name)
+        if cache is None:
+            cache = DiskLRUCache(os.path.join(CACHE_DIR, name), **kwargs)
+            _shared_disk_caches[name] = cache
+        return cache
@@ -0,0 +1,104 @@
+"""
+Token-budget-aware packing of session context into the response prompt.
+
+Each piece of session context (active symptoms, follow-up answers, profile, memory, past
+messages, journal entries, reminder notice, nearby places) is a ContextSection with a
+priority. pack_sections() keeps sections in priority order while they fit the budget; a
+section that does not fit is first trimmed item by item (oldest / least relevant items
+first), then replaced by its summary, then dropped. Required sections are always
+kept (trimmed to one item if need be). The output keeps the sections' original order so
+the prompt reads the same as before when everything fits.
+
+Token counts are estimates (no tokenizer dependency): ~4 characters per token for ASCII
+text and ~2 per token for Indic and other non-ASCII scripts, which tokenize much denser.
+"""
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Total prompt budget (system + user message) in estimated tokens
+PROMPT_TOKEN_BUDGET = int(os.getenv("HEALBEE_PROMPT_TOKEN_BUDGET", "10000"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text."""
+    if not text:
+        return 0
+    # Non-ASCII characters in the scripts we serve take 2-3 UTF-8 bytes; count them via the byte length
+    non_ascii = min(len(text), (len(text.encode("utf-8")) - len(text)) // 2)
+    return math.ceil((len(text) - non_ascii) / 4 + non_ascii / 2)
+
+
+@dataclass
+class ContextSection:
+    """One block of session context; template gets the joined items as {items}."""
+    name: str
+    priority: int
+    items: List[str]
+    template: str = "{items}"
+    joiner: str = "; "
+    summary: Optional[str] = None   # shorter stand-in used when the full section does not fit
+    required: bool = False
+    keep: str = "head"              # which items survive trimming: "head" (first ones) or "tail" (latest ones)
+
+    def render(self, count: Optional[int] = None) -> str:
+        items = self.items
+        if count is not None:
+            items = items[:count] if self.keep == "head" else items[len(items) - count:]
+        return self.template.format(items=self.joiner.join(items))
+
+
+@dataclass
+class PackedContext:
+    """Result of pack_sections (callers may add their fixed prompt parts to tokens)."""
+    text: str
+    tokens: int
+    budget: int
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    trimmed: List[str] = field(default_factory=list)
+    summarized: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+def _fit(section: ContextSection, remaining: int):
+    """(text, outcome) of the largest form of section within remaining tokens, or (None, "dropped")."""
+    text = section.render()
+    if estimate_tokens(text) <= remaining:
+        return text, "full"
+    for n in range(len(section.items) - 1, 0, -1):
+        text = section.render(n)
+        if estimate_tokens(text) <= remaining:
+            return text, "trimmed"
+    if section.summary and estimate_tokens(section.summary) <= remaining:
+        return section.summary, "summarized"
+    if section.required:
+        return section.render(1), "trimmed"
+    return None, "dropped"
+
+
+def pack_sections(sections: List[ContextSection], budget: int, separator: str = "\n") -> PackedContext:
+    """Fill budget (estimated tokens) with the highest-priority sections; see module docstring."""
+    chosen: Dict[int, str] = {}
+    packed = PackedContext(text="", tokens=0, budget=budget)
+    remaining = budget
+    order = sorted(range(len(sections)), key=lambda i: (not sections[i].required, -sections[i].priority))
+    for i in order:
+        section = sections[i]
+        if not section.items:
+            continue
+        text, outcome = _fit(section, remaining)
+        if text is None:
+            packed.dropped.append(section.name)
+            continue
+        if outcome == "trimmed":
+            packed.trimmed.append(section.name)
+        elif outcome == "summarized":
+            packed.summarized.append(section.name)
+        chosen[i] = text
+        cost = estimate_tokens(text)
+        packed.section_tokens[section.name] = cost
+        remaining -= cost
+    packed.text = separator.join(chosen[i] for i in sorted(chosen))
+    packed.tokens = estimate_tokens(packed.text)
+    return packed
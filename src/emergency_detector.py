@@ -0,0 +1,68 @@
+"""
+Emergency fast path: one Aho-Corasick automaton over the emergency keywords of all
+supported languages (nlu_config.json), plus pre-localized safety responses.
+
+Detection is a single pass over the text with no network access, so an emergency
+message can be answered before any Sarvam call is made. Only whole-token hits count:
+the lists of all languages are searched at once, so a short keyword of one language
+(Marathi "विष", poison) must not fire inside a word of another (Hindi "विषय", topic).
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.messages import LocalizedText
+from src.text_index import KeywordAutomaton, is_whole_token
+
+# Safety message shown for emergencies, pre-written for every supported UI language
+EMERGENCY_RESPONSES: Dict[str, str] = {
+    "en": "The symptoms you're describing sound serious and may require immediate medical attention. Please consult a doctor or go to the nearest hospital right away. I am not equipped to provide emergency medical assistance.",
+    "hi": "आपके द्वारा बताए गए लक्षण गंभीर लग रहे हैं और इसके लिए तत्काल चिकित्सा ध्यान देने की आवश्यकता हो सकती है। कृपया तुरंत डॉक्टर से सलाह लें या नजदीकी अस्पताल जाएँ। मैं आपातकालीन चिकित्सा सहायता प्रदान करने के लिए सुसज्जित नहीं हूँ।",
+    "bn": "আপনি যে লক্ষণগুলির কথা বলছেন তা গুরুতর মনে হচ্ছে এবং এর জন্য অবিলম্বে চিকিৎসা প্রয়োজন হতে পারে। অনুগ্রহ করে এখনই একজন ডাক্তারের পরামর্শ নিন বা নিকটতম হাসপাতালে যান। আমি জরুরি চিকিৎসা সহায়তা দেওয়ার জন্য সক্ষম নই।",
+    "mr": "तुम्ही सांगत असलेली लक्षणे गंभीर वाटत आहेत आणि त्यासाठी तात्काळ वैद्यकीय मदतीची गरज असू शकते. कृपया ताबडतोब डॉक्टरांचा सल्ला घ्या किंवा जवळच्या रुग्णालयात जा. मी आपत्कालीन वैद्यकीय मदत देण्यास सक्षम नाही.",
+    "kn": "ನೀವು ವಿವರಿಸುತ್ತಿರುವ ಲಕ್ಷಣಗಳು ಗಂಭೀರವಾಗಿ ತೋರುತ್ತಿವೆ ಮತ್ತು ತಕ್ಷಣದ ವೈದ್ಯಕೀಯ ಗಮನ ಬೇಕಾಗಬಹುದು. ದಯವಿಟ್ಟು ಈಗಲೇ ವೈದ್ಯರನ್ನು ಸಂಪರ್ಕಿಸಿ ಅಥವಾ ಹತ್ತಿರದ ಆಸ್ಪತ್ರೆಗೆ ಹೋಗಿ. ತುರ್ತು ವೈದ್ಯಕೀಯ ನೆರವು ನೀಡಲು ನಾನು ಸಮರ್ಥನಲ್ಲ.",
+    "ta": "நீங்கள் விவரிக்கும் அறிகுறிகள் தீவிரமானதாகத் தெரிகின்றன, உடனடி மருத்துவ கவனம் தேவைப்படலாம். தயவுசெய்து உடனே ஒரு மருத்துவரை அணுகவும் அல்லது அருகிலுள்ள மருத்துவமனைக்குச் செல்லவும். அவசர மருத்துவ உதவி வழங்க நான் தகுதியானவன் அல்ல.",
+    "te": "మీరు చెబుతున్న లక్షణాలు తీవ్రంగా అనిపిస్తున్నాయి మరియు వెంటనే వైద్య సహాయం అవసరం కావచ్చు. దయచేసి వెంటనే వైద్యుడిని సంప్రదించండి లేదా సమీపంలోని ఆసుపత్రికి వెళ్ళండి. అత్యవసర వైద్య సహాయం అందించే సామర్థ్యం నాకు లేదు.",
+    "ml": "നിങ്ങൾ വിവരിക്കുന്ന ലക്ഷണങ്ങൾ ഗുരുതരമാണെന്ന് തോന്നുന്നു, ഉടൻ വൈദ്യസഹായം ആവശ്യമായേക്കാം. ദയവായി ഉടൻ ഒരു ഡോക്ടറെ സമീപിക്കുക അല്ലെങ്കിൽ അടുത്തുള്ള ആശുപത്രിയിൽ പോകുക. അടിയന്തര വൈദ്യസഹായം നൽകാൻ എനിക്ക് കഴിവില്ല.",
+}
+
+
+def emergency_response(language: Optional[str]) -> str:
+    """Pre-localized emergency message for a language code like 'ta-IN' or 'ta' (English fallback)."""
+    lang = (language or "en").split("-")[0].lower()
+    if lang not in EMERGENCY_RESPONSES:
+        lang = "en"
+    return LocalizedText(EMERGENCY_RESPONSES[lang], lang)
+
+
+@dataclass
+class EmergencyMatch:
+    """The first emergency keyword found in a text"""
+    keyword: str
+    language: str  # keyword list it came from ("en", "hi", ...)
+    start: int
+    end: int
+
+
+class EmergencyDetector:
+    """Case-insensitive emergency keyword search across every language list at once."""
+
+    def __init__(self, keyword_lists: Dict[str, List[str]]):
+        self._automaton = KeywordAutomaton()
+        for language, keywords in keyword_lists.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                self._automaton.add(keyword, (language, keyword))
+        self._automaton.build()
+
+    def __len__(self) -> int:
+        return len(self._automaton)
+
+    def detect(self, text: str) -> Optional[EmergencyMatch]:
+        """First (leftmost-ending) whole-token emergency keyword in text, or None."""
+        if not text:
+            return None
+        text = text.lower()
+        for start, end, (language, keyword) in self._automaton.iter_matches(text):
+            if is_whole_token(text, start, end):
+                return EmergencyMatch(keyword=keyword, language=language, start=start, end=end)
+        return None
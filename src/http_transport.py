@@ -0,0 +1,364 @@
+"""
+Process-wide HTTP transport for every Sarvam-facing client.
+
+One pooled keep-alive requests.Session is shared by SarvamAPIClient and HealBeeUtilities,
+so calls reuse TCP/TLS connections instead of handshaking each time. Requests that fail
+with 429/5xx or cannot connect are retried with exponential backoff and full jitter
+(a numeric Retry-After header is honoured). Timeouts are explicit (connect, read) pairs.
+Read timeouts are not retried: the server may still be working on the request, and
+retrying would multiply the worst-case latency.
+
+AsyncSarvamTransport is the asyncio counterpart (same retry policy) over a pooled
+httpx.AsyncClient, so one worker can overlap many in-flight calls without a thread each.
+
+In front of the network, both transports
+- coalesce identical in-flight JSON requests (same endpoint, headers and payload hash):
+  concurrent callers share the first caller's HTTP call and response (single-flight);
+- queue every attempt on the per-endpoint token bucket of the shared EndpointRateLimiter
+  (chat / translate / tts / stt), so bursts wait for budget instead of drawing 429s.
+Every call reports duration, bytes, status and retries on the active instrumentation span
+(src/instrumentation.py), or on its own span named after the endpoint.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.cache import make_cache_key
+from src.instrumentation import Span, ensure_span
+from src.rate_limit import EndpointRateLimiter, get_rate_limiter
+
+try:
+    import httpx
+except ImportError:  # only the async entry points need it (it is installed with supabase)
+    httpx = None
+
+# Overridable to point the whole app at a local mock (see src/mock_sarvam_server.py)
+SARVAM_BASE_URL = os.getenv("SARVAM_BASE_URL", "https://api.sarvam.ai").rstrip("/")
+
+HTTP_POOL_SIZE = int(os.getenv("HEALBEE_HTTP_POOL_SIZE", "16"))
+HTTP_MAX_RETRIES = int(os.getenv("HEALBEE_HTTP_MAX_RETRIES", "3"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HEALBEE_HTTP_CONNECT_TIMEOUT", "5"))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str], base: float, maximum: float) -> float:
+    """Seconds to wait before retry number attempt + 1: Retry-After if numeric, else full jitter."""
+    if retry_after and retry_after.replace(".", "", 1).isdigit():
+        return min(float(retry_after), maximum)
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+# URL path suffix -> rate-limit endpoint name
+_ENDPOINTS = (("/chat/completions", "chat"), ("/translate", "translate"), ("/translate/batch", "translate"),
+              ("/text-to-speech", "tts"), ("/speech-to-text", "stt"))
+
+
+def endpoint_for_url(url: str) -> str:
+    """Rate-limit endpoint name of a Sarvam URL ("other" if unknown)."""
+    path = url.split("?", 1)[0].rstrip("/")
+    for suffix, name in _ENDPOINTS:
+        if path.endswith(suffix):
+            return name
+    return "other"
+
+
+def _coalesce_key(url: str, kwargs: Dict) -> Optional[str]:
+    """Single-flight key of a request, or None if it must not be shared (streams, file uploads)."""
+    if "json" not in kwargs or kwargs.get("stream") or kwargs.get("files"):
+        return None
+    return make_cache_key(url, kwargs.get("headers"), kwargs["json"])
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Concurrent do() calls with the same key run fn once; the others wait for its result or error."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """asyncio version of SingleFlight (one table of in-flight calls per event loop)."""
+
+    def __init__(self):
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The shared call runs as its own task and every caller awaits it through
+        asyncio.shield, so cancelling one caller (e.g. a wait_for step timeout) does
+        not cancel the call for the others.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = calls[key] = asyncio.ensure_future(fn())
+            self.calls += 1
+
+            def _done(t: "asyncio.Future", key=key) -> None:
+                if calls.get(key) is t:
+                    del calls[key]
+                if not t.cancelled():
+                    t.exception()  # mark retrieved when every caller was cancelled
+
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+
+def _rewind_files(files: Optional[Dict]) -> None:
+    """Multipart bodies (e.g. STT audio) are file objects: rewind them before each attempt."""
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+
+
+class SarvamTransport:
+    """Pooled requests.Session with retries on 429/5xx and connection errors."""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, retry_statuses: Iterable[int] = RETRY_STATUSES,
+                 rate_limiter: Optional[EndpointRateLimiter] = None, coalesce: bool = True):
+        """
+        Args:
+            pool_size: Keep-alive connections kept per host
+            max_retries: Extra attempts after the first one
+            connect_timeout: Seconds to establish a connection
+            backoff_base: First backoff ceiling in seconds (doubles per attempt)
+            backoff_max: Upper bound for a single backoff
+            retry_statuses: HTTP statuses that are retried
+            rate_limiter: Per-endpoint budgets (default: the process-wide limiter)
+            coalesce: Share one HTTP call between identical in-flight JSON requests
+        """
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.retries = 0
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.coalesce = coalesce
+        self.single_flight = SingleFlight()
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        return backoff_delay(attempt, retry_after, self.backoff_base, self.backoff_max)
+
+    def post(self, url: str, read_timeout: float = 30, coalesce: bool = True, **kwargs) -> requests.Response:
+        """
+        POST through the shared session. Returns the final response (callers still call
+        raise_for_status); raises the last requests exception if every attempt failed.
+        Identical concurrent JSON requests receive the same (fully read) response object
+        unless coalesce=False (e.g. a hedged duplicate that must really go out).
+        """
+        with ensure_span("sarvam", endpoint_for_url(url)) as span:
+            key = _coalesce_key(url, kwargs) if self.coalesce and coalesce else None
+            if key is None:
+                response = self._post(url, read_timeout, kwargs, span)
+            else:
+                def _post_and_read() -> requests.Response:
+                    shared = self._post(url, read_timeout, kwargs, span)
+                    shared.content  # read the body once so followers can share it
+                    return shared
+
+                response = self.single_flight.do(key, _post_and_read)
+            span.observe(response, read_body=not kwargs.get("stream"))
+            return response
+
+    def _post(self, url: str, read_timeout: float, kwargs: Dict, span: Span) -> requests.Response:
+        endpoint = endpoint_for_url(url)
+        attempt = 0
+        while True:
+            _rewind_files(kwargs.get("files"))
+            self.rate_limiter.acquire(endpoint)
+            try:
+                # ConnectionError includes ConnectTimeout but not ReadTimeout
+                response = self.session.post(url, timeout=(self.connect_timeout, read_timeout), **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"🔄 Connection to {url} failed ({e.__class__.__name__}); retry {attempt + 1} in {delay:.1f}s")
+            else:
+                if response.status_code not in self.retry_statuses or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff(attempt, response)
+                print(f"🔄 {url} returned {response.status_code}; retry {attempt + 1} in {delay:.1f}s")
+                response.close()
+            attempt += 1
+            self.retries += 1
+            span.retries += 1
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retry / coalescing counters and per-endpoint rate-limiter stats (queue depth, waits)."""
+        return {
+            "retries": self.retries,
+            "coalesced": self.single_flight.coalesced,
+            "rate_limits": self.rate_limiter.stats(),
+        }
+
+
+class AsyncSarvamTransport:
+    """asyncio counterpart of SarvamTransport: pooled httpx.AsyncClient (one per event loop), same retries."""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, retry_statuses: Iterable[int] = RETRY_STATUSES,
+                 rate_limiter: Optional[EndpointRateLimiter] = None, coalesce: bool = True, **client_kwargs):
+        """Same arguments as SarvamTransport; client_kwargs are passed to httpx.AsyncClient."""
+        if httpx is None:
+            raise RuntimeError("httpx is required for the async Sarvam clients (pip install httpx)")
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retries = 0
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.coalesce = coalesce
+        self.single_flight = AsyncSingleFlight()
+        self.client_kwargs = client_kwargs
+        # An AsyncClient is bound to the loop it was first used on
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+    def _client(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            client = httpx.AsyncClient(limits=limits, **self.client_kwargs)
+            self._clients[loop] = client
+        return client
+
+    async def post(self, url: str, read_timeout: float = 30, coalesce: bool = True, **kwargs) -> "httpx.Response":
+        """
+        POST through the pooled client of the running loop. Returns the final response
+        (callers still call raise_for_status); raises the last httpx error if every attempt failed.
+        """
+        with ensure_span("sarvam", endpoint_for_url(url)) as span:
+            key = _coalesce_key(url, kwargs) if self.coalesce and coalesce else None
+            if key is None:
+                response = await self._post(url, read_timeout, kwargs, span)
+            else:
+                response = await self.single_flight.do(key, lambda: self._post(url, read_timeout, kwargs, span))
+            span.observe(response)
+            return response
+
+    async def _post(self, url: str, read_timeout: float, kwargs: Dict, span: Span) -> "httpx.Response":
+        client = self._client()
+        endpoint = endpoint_for_url(url)
+        timeout = httpx.Timeout(read_timeout, connect=self.connect_timeout)
+        attempt = 0
+        while True:
+            _rewind_files(kwargs.get("files"))
+            await self.rate_limiter.acquire_async(endpoint)
+            try:
+                response = await client.post(url, timeout=timeout, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, None, self.backoff_base, self.backoff_max)
+                print(f"🔄 Connection to {url} failed ({e.__class__.__name__}); retry {attempt + 1} in {delay:.1f}s")
+            else:
+                if response.status_code not in self.retry_statuses or attempt >= self.max_retries:
+                    return response
+                delay = backoff_delay(attempt, response.headers.get("Retry-After"), self.backoff_base, self.backoff_max)
+                print(f"🔄 {url} returned {response.status_code}; retry {attempt + 1} in {delay:.1f}s")
+                await response.aclose()
+            attempt += 1
+            self.retries += 1
+            span.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Same counters as SarvamTransport.stats()."""
+        return {
+            "retries": self.retries,
+            "coalesced": self.single_flight.coalesced,
+            "rate_limits": self.rate_limiter.stats(),
+        }
+
+    async def aclose(self) -> None:
+        """Close the client of the running loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+_transport: Optional[SarvamTransport] = None
+_async_transport: Optional[AsyncSarvamTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> SarvamTransport:
+    """Return the process-wide transport, creating it on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = SarvamTransport()
+    return _transport
+
+
+def get_async_transport() -> AsyncSarvamTransport:
+    """Return the process-wide async transport, creating it on first use."""
+    global _async_transport
+    if _async_transport is None:
+        with _transport_lock:
+            if _async_transport is None:
+                _async_transport = AsyncSarvamTransport()
+    return _async_transport
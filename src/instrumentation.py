@@ -0,0 +1,283 @@
+"""
+Per-call instrumentation for outbound calls (Sarvam, Nominatim, Overpass, Supabase).
+
+    with instrument("nominatim", "search") as span:
+        r = requests.get(...)
+        span.observe(r)
+
+Each call becomes a Span (duration, request / response bytes, status, retries, token usage,
+error). On exit the span is folded into in-process histograms keyed by (service, operation)
+and handed to the registered exporters.
+
+The Sarvam transport fills the active span itself (one span per logical call, retries
+included) and opens its own span, named after the endpoint, when the caller did not. A
+hedged call runs each attempt against its own detached span (attempt_span); only the
+winning attempt is merged into the call's span, and the hedge is counted in span.hedges.
+The wrapper costs a perf_counter pair, a ContextVar set/reset and a few bisects under one
+lock; exporters run inline, so they should be cheap too. HEALBEE_METRICS_LOG=<path> adds a
+JSONL exporter.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = tuple(2 ** n for n in range(6, 25, 2))  # 64 B .. 16 MiB
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+@dataclass
+class Span:
+    """One outbound call; filled by the caller and/or the transport."""
+    service: str
+    operation: str
+    duration: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    status: Optional[int] = None
+    retries: int = 0
+    hedges: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+    ts: float = 0.0
+
+    def observe(self, response: Any, read_body: bool = True) -> None:
+        """Take status and sizes from a requests / httpx response (adds to earlier attempts)."""
+        self.status = response.status_code
+        request = getattr(response, "request", None)
+        body = getattr(request, "body", None)
+        if body is None and request is not None and hasattr(request, "content"):
+            body = request.content  # httpx
+        if isinstance(body, (bytes, str)):
+            self.request_bytes += len(body)
+        if read_body:
+            self.response_bytes += len(response.content)
+        else:
+            self.response_bytes += int(response.headers.get("Content-Length") or 0)
+
+    def merge(self, attempt: "Span") -> None:
+        """Fold a finished attempt_span() into this span (status, sizes, retries, tokens)."""
+        if attempt.status is not None:
+            self.status = attempt.status
+        self.request_bytes += attempt.request_bytes
+        self.response_bytes += attempt.response_bytes
+        self.retries += attempt.retries
+        self.prompt_tokens += attempt.prompt_tokens
+        self.completion_tokens += attempt.completion_tokens
+
+    def add_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """Token usage of a chat completion response ("usage" object)."""
+        if usage:
+            self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            self.completion_tokens += int(usage.get("completion_tokens") or 0)
+
+
+class Histogram:
+    """Fixed-bucket histogram with count / sum / min / max."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: above the largest bound
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = self.count * p / 100
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+@dataclass
+class _CallStats:
+    duration: Histogram = field(default_factory=lambda: Histogram(DURATION_BUCKETS))
+    request_bytes: Histogram = field(default_factory=lambda: Histogram(BYTES_BUCKETS))
+    response_bytes: Histogram = field(default_factory=lambda: Histogram(BYTES_BUCKETS))
+    tokens: Histogram = field(default_factory=lambda: Histogram(TOKEN_BUCKETS))
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    retries: int = 0
+    hedges: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+Exporter = Callable[[Span], None]
+
+
+class MetricsRegistry:
+    """Histograms per (service, operation) plus pluggable span exporters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _CallStats] = {}
+        self.exporters: List[Exporter] = []
+
+    def record(self, span: Span) -> None:
+        key = (span.service, span.operation)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _CallStats()
+            stats.duration.add(span.duration)
+            stats.request_bytes.add(span.request_bytes)
+            stats.response_bytes.add(span.response_bytes)
+            stats.statuses[span.status if span.status is not None else "none"] += 1
+            stats.retries += span.retries
+            stats.hedges += span.hedges
+            if span.error:
+                stats.errors += 1
+            if span.prompt_tokens or span.completion_tokens:
+                stats.tokens.add(span.prompt_tokens + span.completion_tokens)
+                stats.prompt_tokens += span.prompt_tokens
+                stats.completion_tokens += span.completion_tokens
+        for exporter in self.exporters:
+            try:
+                exporter(span)
+            except Exception as e:
+                print(f"⚠️ Metrics exporter failed: {e}")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{"service.operation": {...histograms and counters...}}"""
+        with self._lock:
+            return {
+                f"{service}.{operation}": {
+                    "calls": stats.duration.count,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "hedges": stats.hedges,
+                    "statuses": {str(k): v for k, v in stats.statuses.items()},
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "duration_s": stats.duration.to_dict(),
+                    "request_bytes": stats.request_bytes.to_dict(),
+                    "response_bytes": stats.response_bytes.to_dict(),
+                    "tokens": stats.tokens.to_dict(),
+                }
+                for (service, operation), stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class JsonlExporter:
+    """Appends every span as one JSON line (HEALBEE_METRICS_LOG)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(asdict(span), ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+metrics = MetricsRegistry()
+if os.getenv("HEALBEE_METRICS_LOG"):
+    metrics.exporters.append(JsonlExporter(os.environ["HEALBEE_METRICS_LOG"]))
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("healbee_span", default=None)
+
+
+def add_exporter(exporter: Exporter) -> None:
+    """Register a callable that receives every finished Span."""
+    metrics.exporters.append(exporter)
+
+
+def remove_exporter(exporter: Exporter) -> None:
+    if exporter in metrics.exporters:
+        metrics.exporters.remove(exporter)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def instrument(service: str, operation: str) -> Iterator[Span]:
+    """Time the enclosed outbound call and record it as service/operation."""
+    span = Span(service, operation, ts=time.time())
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        span.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        metrics.record(span)
+
+
+@contextmanager
+def attempt_span(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """
+    Make span (from new_attempt_span) the active span without recording it, so one attempt
+    of a hedged call reports into it instead of the call's shared span. None is a no-op.
+    """
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+
+def new_attempt_span() -> Optional[Span]:
+    """Detached span for one attempt of the active span's call (None without an active span)."""
+    parent = _current_span.get()
+    return Span(parent.service, parent.operation, ts=time.time()) if parent is not None else None
+
+
+@contextmanager
+def ensure_span(service: str, operation: str) -> Iterator[Span]:
+    """The caller's active span for service if there is one, else a new instrument() span."""
+    span = _current_span.get()
+    if span is not None and span.service == service:
+        yield span
+    else:
+        with instrument(service, operation) as span:
+            yield span
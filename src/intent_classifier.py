@@ -0,0 +1,391 @@
+"""
+Local intent classifier: character n-gram features + a softmax (multinomial logistic
+regression) model, trained offline and shipped as a JSON artifact (src/intent_model.json).
+
+SarvamMNLUProcessor asks it first and only calls Sarvam-M for the intent when the local
+confidence is below its threshold. Labels are HealthIntent values ("symptom_query", ...).
+
+The model is trained on template seeds and logged traffic only. tests/test_data/nlu_test_cases.json
+is the held-out evaluation set (also scored by tests/test_evaluation.py) and is never trained on.
+
+CLI:
+    python -m src.intent_classifier train [--traffic logs/intent_traffic.jsonl]
+    python -m src.intent_classifier evaluate [--data tests/test_data/nlu_test_cases.json] [--traffic ...]
+    python -m src.intent_classifier predict "mujhe bukhar hai"
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODEL_PATH = os.path.join(_PROJECT_ROOT, "src", "intent_model.json")
+TEST_CASES_PATH = os.path.join(_PROJECT_ROOT, "tests", "test_data", "nlu_test_cases.json")
+
+NGRAM_RANGE = (2, 4)
+
+# Labels used in tests/test_data/nlu_test_cases.json -> HealthIntent values
+DATASET_LABELS = {
+    "SYMPTOM_QUERY": "symptom_query",
+    "CHILD_HEALTH": "symptom_query",
+    "PREGNANCY_QUERY": "symptom_query",
+    "EMERGENCY": "emergency",
+    "MEDICATION_QUERY": "medication_info",
+    "MEDICATION_REMINDER": "medication_info",
+    "DIET_QUERY": "wellness_tip",
+    "LIFESTYLE_QUERY": "wellness_tip",
+    "GENERAL_HEALTH": "general_health",
+    "TEST_INTERPRETATION": "general_health",
+    "DOCTOR_RECOMMENDATION": "general_health",
+    "GREETING": "unknown",
+    "FAREWELL": "unknown",
+    "AFFIRMATION": "unknown",
+    "DENIAL": "unknown",
+    "APPOINTMENT_REQUEST": "unknown",
+    "APPOINTMENT_BOOKING": "unknown",
+}
+
+# Seed phrasing per intent; {s} = symptom, {e} = emergency phrase, {m} = medicine, {d} = disease
+SEED_TEMPLATES = {
+    "symptom_query": [
+        "I have {s}", "I am having {s} since yesterday", "I have had {s} for two days", "my child has {s}",
+        "feeling {s} since morning", "mujhe {s} hai", "mujhe kal se {s} ho raha hai", "mere papa ko {s} hai",
+        "मुझे {s} है", "मुझे दो दिन से {s} हो रहा है", "मेरे बच्चे को {s} है",
+    ],
+    "emergency": [
+        "{e}", "help {e}", "my father has {e}", "emergency {e} please help", "मेरे पिता को {e}", "जल्दी मदद करो {e}",
+    ],
+    "medication_info": [
+        "can I take {m}", "what is the dose of {m}", "side effects of {m}", "is {m} safe", "how often should I take {m}",
+        "{m} kitni baar leni hai", "kya main {m} le sakta hoon", "{m} कब लेनी चाहिए", "क्या {m} लेना सुरक्षित है",
+        "which medicine is used for {d}",
+    ],
+    "disease_info": [
+        "what is {d}", "tell me about {d}", "what causes {d}", "what are the symptoms of {d}", "is {d} contagious",
+        "{d} kya hota hai", "{d} kyun hota hai", "{d} क्या है", "{d} के लक्षण क्या हैं",
+    ],
+    "prevention_info": [
+        "how to prevent {d}", "how can I avoid getting {d}", "is there a vaccine for {d}", "how to protect my family from {d}",
+        "{d} se kaise bache", "{d} से कैसे बचें",
+    ],
+    "diagnosis_request": [
+        "do I have {d}", "is it {d}", "what disease do I have", "can you diagnose me", "kya mujhe {d} hai",
+        "क्या मुझे {d} है", "mujhe kaunsi bimari hai",
+    ],
+}
+
+SEED_SLOTS = {
+    "m": ["paracetamol", "ibuprofen", "crocin", "dolo 650", "insulin", "metformin", "amoxicillin", "cetirizine",
+          "ors", "aspirin", "azithromycin", "antacid", "क्रोसिन", "पैरासिटामोल"],
+    "d": ["diabetes", "malaria", "dengue", "typhoid", "tuberculosis", "asthma", "hypertension", "jaundice",
+          "thyroid", "anemia", "covid", "मधुमेह", "डेंगू", "मलेरिया"],
+}
+
+SEED_SENTENCES = {
+    "wellness_tip": [
+        "tips for better sleep", "healthy diet for weight loss", "how to stay fit", "how much water should I drink daily",
+        "exercises for a strong back", "yoga for stress relief", "what should I eat to stay healthy",
+        "how to improve my immunity naturally", "foods to avoid with high cholesterol", "diet plan to lose weight",
+        "sehat ke liye kya khana chahiye", "wajan kam karne ke tips", "achhi neend ke liye kya karu",
+        "अच्छी नींद के लिए टिप्स", "वजन कम करने के लिए डाइट प्लान", "स्वस्थ रहने के लिए क्या खाएं",
+    ],
+    "general_health": [
+        "how does the immune system work", "what is a normal blood pressure", "what is bmi",
+        "how many hours should a child sleep", "help me understand my blood test results",
+        "recommend a good doctor near me", "what does a high cholesterol report mean", "how does the heart pump blood",
+        "normal sugar level kitna hota hai", "mujhe sehat ke baare mein jaankari chahiye",
+        "सामान्य रक्तचाप कितना होता है", "मुझे स्वास्थ्य के बारे में जानकारी चाहिए",
+    ],
+    "unknown": [
+        "hello", "hi", "hey there", "good morning", "thank you", "thanks a lot", "bye", "okay", "ok thanks", "yes",
+        "no", "book an appointment", "what is the weather today", "tell me a joke", "who are you",
+        "namaste", "dhanyavaad", "theek hai", "haan", "nahi", "नमस्ते", "धन्यवाद", "ठीक है", "हाँ", "नहीं",
+    ],
+}
+
+
+def extract_features(text: str) -> Dict[str, float]:
+    """Binary word and character n-gram features, L2-normalized."""
+    text = " ".join(text.lower().split())
+    features = {f"w:{w}" for w in text.split()}
+    padded = f" {text} "
+    for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+        for i in range(len(padded) - n + 1):
+            features.add(padded[i:i + n])
+    if not features:
+        return {}
+    value = 1.0 / math.sqrt(len(features))
+    return {f: value for f in features}
+
+
+class LocalIntentClassifier:
+    """Sparse softmax classifier over extract_features()."""
+
+    def __init__(self, labels: List[str], weights: Optional[Dict[str, List[float]]] = None,
+                 bias: Optional[List[float]] = None, metadata: Optional[Dict] = None):
+        self.labels = list(labels)
+        self.weights: Dict[str, List[float]] = weights or {}
+        self.bias = bias or [0.0] * len(self.labels)
+        self.metadata = metadata or {}
+
+    def _scores(self, features: Dict[str, float]) -> List[float]:
+        scores = list(self.bias)
+        for feature, value in features.items():
+            row = self.weights.get(feature)
+            if row is not None:
+                for i, w in enumerate(row):
+                    scores[i] += w * value
+        return scores
+
+    @staticmethod
+    def _softmax(scores: List[float]) -> List[float]:
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        probs = self._softmax(self._scores(extract_features(text)))
+        return dict(zip(self.labels, probs))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its probability."""
+        probs = self._softmax(self._scores(extract_features(text)))
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[best], probs[best]
+
+    @classmethod
+    def train(cls, examples: List[Tuple[str, str]], epochs: int = 20, learning_rate: float = 0.5,
+              l2: float = 1e-5, seed: int = 13) -> "LocalIntentClassifier":
+        """Fit with plain SGD on the softmax cross-entropy (deterministic for a given seed)."""
+        labels = sorted({label for _, label in examples})
+        index = {label: i for i, label in enumerate(labels)}
+        model = cls(labels)
+        data = [(extract_features(text), index[label]) for text, label in examples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            lr = learning_rate / (1 + 0.1 * epoch)
+            for features, target in data:
+                probs = cls._softmax(model._scores(features))
+                grads = [p - (1.0 if i == target else 0.0) for i, p in enumerate(probs)]
+                for i, g in enumerate(grads):
+                    model.bias[i] -= lr * g
+                for feature, value in features.items():
+                    row = model.weights.setdefault(feature, [0.0] * len(labels))
+                    for i, g in enumerate(grads):
+                        row[i] -= lr * (g * value + l2 * row[i])
+        return model
+
+    def save(self, path: str = MODEL_PATH, min_weight: float = 0.05) -> None:
+        """Write the artifact, dropping near-zero features and rounding weights to keep it small."""
+        weights = {
+            f: [round(w, 3) for w in row] for f, row in sorted(self.weights.items())
+            if max(abs(w) for w in row) >= min_weight
+        }
+        artifact = {
+            "format": "healbee-intent-ngram-softmax/1",
+            "ngram_range": list(NGRAM_RANGE),
+            "labels": self.labels,
+            "bias": [round(b, 4) for b in self.bias],
+            "weights": weights,
+            "metadata": self.metadata,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "LocalIntentClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+        if list(artifact.get("ngram_range", [])) != list(NGRAM_RANGE):
+            raise ValueError(f"Model at {path} was trained with different n-gram settings; retrain it.")
+        return cls(artifact["labels"], artifact["weights"], artifact["bias"], artifact.get("metadata"))
+
+
+_shared_classifier: Optional[LocalIntentClassifier] = None
+_shared_classifier_loaded = False
+_shared_classifier_lock = threading.Lock()
+
+
+def get_local_intent_classifier() -> Optional[LocalIntentClassifier]:
+    """The shipped model, loaded once per process; None if the artifact is missing or unreadable."""
+    global _shared_classifier, _shared_classifier_loaded
+    if not _shared_classifier_loaded:
+        with _shared_classifier_lock:
+            if not _shared_classifier_loaded:
+                try:
+                    _shared_classifier = LocalIntentClassifier.load(MODEL_PATH)
+                    print(f"✅ Local intent model loaded from {MODEL_PATH}.")
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠️ Local intent model unavailable ({e}). All intents will go to Sarvam-M.")
+                    _shared_classifier = None
+                _shared_classifier_loaded = True
+    return _shared_classifier
+
+
+# --- Traffic log (opt-in via HEALBEE_INTENT_LOG) -------------------------------------------
+
+_traffic_lock = threading.Lock()
+
+
+def log_intent_example(path: str, text: str, intent: str, confidence: float, language: str) -> None:
+    """Append one LLM-labelled query to a JSONL file for later retraining."""
+    record = {"text": text, "intent": intent, "confidence": confidence, "language": language, "ts": time.time()}
+    try:
+        with _traffic_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not log intent example: {e}")
+
+
+# --- Training data ----------------------------------------------------------------------------
+
+def load_test_cases(path: str = TEST_CASES_PATH) -> List[Tuple[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+    return [(c["input_text"], DATASET_LABELS.get(c["expected_intent"], c["expected_intent"].lower()))
+            for c in cases]
+
+
+def load_traffic(path: str, min_confidence: float = 0.7) -> List[Tuple[str, str]]:
+    """LLM-labelled queries from log_intent_example(); low-confidence labels are skipped."""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("confidence", 1.0) >= min_confidence:
+                examples.append((record["text"], record["intent"]))
+    return examples
+
+
+def seed_examples(max_per_label: int = 300, seed: int = 5) -> List[Tuple[str, str]]:
+    """
+    Synthetic examples from the templates above and the repo's symptom / emergency vocabularies,
+    capped per label so the large symptom vocabulary doesn't swamp the class prior.
+    """
+    with open(os.path.join(_PROJECT_ROOT, "src", "hinglish_symptoms.json"), "r", encoding="utf-8") as f:
+        symptom_terms = sorted({v for variants in json.load(f).values() for v in variants})
+    with open(os.path.join(_PROJECT_ROOT, "src", "nlu_config.json"), "r", encoding="utf-8") as f:
+        emergency_terms = sorted({k for kws in json.load(f)["keyword_lists"]["emergency_keywords"].values() for k in kws})
+
+    slots = dict(SEED_SLOTS, s=symptom_terms, e=emergency_terms)
+    examples = []
+    for label, templates in SEED_TEMPLATES.items():
+        for template in templates:
+            for slot, values in slots.items():
+                if "{" + slot + "}" in template:
+                    examples.extend((template.replace("{" + slot + "}", v), label) for v in values)
+                    break
+            else:
+                examples.append((template, label))
+    for label, sentences in SEED_SENTENCES.items():
+        examples.extend((s, label) for s in sentences)
+
+    rng = random.Random(seed)
+    by_label: Dict[str, List[Tuple[str, str]]] = {}
+    for example in examples:
+        by_label.setdefault(example[1], []).append(example)
+    capped = []
+    for label in sorted(by_label):
+        group = by_label[label]
+        capped.extend(group if len(group) <= max_per_label else rng.sample(group, max_per_label))
+    return capped
+
+
+def _normalize(examples: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Apply the same Hinglish normalization the processor applies before predicting."""
+    from src.nlu_processor import normalize_hinglish_terms
+    return [(normalize_hinglish_terms(text), label) for text, label in examples]
+
+
+def evaluate(model: LocalIntentClassifier, examples: List[Tuple[str, str]], threshold: float) -> Dict[str, float]:
+    """Overall accuracy, share of queries answered locally at threshold, and accuracy on that share."""
+    correct = confident = confident_correct = 0
+    start = time.perf_counter()
+    for text, label in examples:
+        predicted, confidence = model.predict(text)
+        correct += predicted == label
+        if confidence >= threshold:
+            confident += 1
+            confident_correct += predicted == label
+    elapsed = time.perf_counter() - start
+    n = len(examples) or 1
+    return {
+        "examples": len(examples),
+        "accuracy": correct / n,
+        "coverage": confident / n,
+        "accuracy_when_confident": confident_correct / confident if confident else 0.0,
+        "avg_predict_ms": elapsed * 1000 / n,
+    }
+
+
+def _print_report(name: str, report: Dict[str, float], threshold: float) -> None:
+    print(f"{name}: {report['examples']} examples | accuracy {report['accuracy']:.1%} | "
+          f"local at >= {threshold:.2f}: {report['coverage']:.1%} (accuracy {report['accuracy_when_confident']:.1%}) | "
+          f"{report['avg_predict_ms']:.3f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train / evaluate the local HealBee intent classifier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train_p = sub.add_parser("train", help="Retrain from seeds and logged traffic; writes the artifact")
+    train_p.add_argument("--traffic", action="append", default=[], help="JSONL traffic log(s) with LLM labels")
+    train_p.add_argument("--eval-data", default=TEST_CASES_PATH, help="Held-out NLU test cases JSON (not trained on)")
+    train_p.add_argument("--output", default=MODEL_PATH)
+    train_p.add_argument("--epochs", type=int, default=20)
+    train_p.add_argument("--threshold", type=float, default=0.9)
+
+    eval_p = sub.add_parser("evaluate", help="Report accuracy of the artifact against labelled data")
+    eval_p.add_argument("--model", default=MODEL_PATH)
+    eval_p.add_argument("--data", default=TEST_CASES_PATH, help="NLU test cases JSON")
+    eval_p.add_argument("--traffic", action="append", default=[], help="JSONL traffic log(s) with LLM labels")
+    eval_p.add_argument("--threshold", type=float, default=0.9)
+
+    pred_p = sub.add_parser("predict", help="Classify one query")
+    pred_p.add_argument("text")
+    pred_p.add_argument("--model", default=MODEL_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "train":
+        labelled = []
+        for path in args.traffic:
+            labelled += load_traffic(path)
+        labelled = _normalize(labelled)
+        seeds = _normalize(seed_examples())
+
+        model = LocalIntentClassifier.train(seeds + labelled, epochs=args.epochs)
+        model.metadata = {"seed_examples": len(seeds), "labelled_examples": len(labelled),
+                          "traffic_logs": [os.path.basename(p) for p in args.traffic]}
+        model.save(args.output)
+        print(f"✅ Saved {len(model.labels)}-label model ({os.path.getsize(args.output) // 1024} KB) to {args.output}")
+        _print_report("held-out test cases", evaluate(model, _normalize(load_test_cases(args.eval_data)), args.threshold),
+                      args.threshold)
+
+    elif args.command == "evaluate":
+        model = LocalIntentClassifier.load(args.model)
+        _print_report("test cases", evaluate(model, _normalize(load_test_cases(args.data)), args.threshold), args.threshold)
+        for path in args.traffic:
+            _print_report(os.path.basename(path), evaluate(model, _normalize(load_traffic(path)), args.threshold),
+                          args.threshold)
+
+    else:
+        model = LocalIntentClassifier.load(args.model)
+        label, confidence = model.predict(_normalize([(args.text, "")])[0][0])
+        print(f"{label} ({confidence:.2%})")
+
+
+if __name__ == "__main__":
+    main()
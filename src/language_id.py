@@ -0,0 +1,141 @@
+"""
+Offline language identification for HealBee's languages (en, hi, bn, mr, kn, ta, te, ml).
+
+1. One pass over the text counts letters per Unicode script block.
+2. Any Indic script wins over Latin (code-mixed "मुझे fever है" is Hindi), and the
+   most frequent Indic script picks the language.
+3. Devanagari is split into Hindi vs Marathi by a small character n-gram model
+   (naive Bayes over 1-3 grams of the embedded sample sentences).
+4. Latin text is English; romanized Hindi ("mujhe bukhar hai") is flagged via
+   function-word markers but still reported as en-IN, which is what the STT/UI pipeline uses.
+"""
+import math
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List
+
+# Unicode block (codepoint >> 7) -> (script, language); each Indic block is 128 code points
+_INDIC_BLOCKS = {
+    0x0900 >> 7: ("Deva", "hi-IN"),  # Devanagari (Hindi / Marathi)
+    0x0980 >> 7: ("Beng", "bn-IN"),  # Bengali
+    0x0B80 >> 7: ("Taml", "ta-IN"),  # Tamil
+    0x0C00 >> 7: ("Telu", "te-IN"),  # Telugu
+    0x0C80 >> 7: ("Knda", "kn-IN"),  # Kannada
+    0x0D00 >> 7: ("Mlym", "ml-IN"),  # Malayalam
+}
+# Script-neutral code points inside those blocks: Devanagari danda / double danda and digits
+_NEUTRAL = {0x0964, 0x0965} | set(range(0x0966, 0x0970))
+
+SUPPORTED_LANGUAGES = ["en-IN", "hi-IN", "bn-IN", "mr-IN", "kn-IN", "ta-IN", "te-IN", "ml-IN"]
+
+# Sample sentences for the Hindi / Marathi n-gram model
+_DEVANAGARI_SAMPLES: Dict[str, List[str]] = {
+    "hi-IN": [
+        "मुझे बुखार है और सिर में दर्द हो रहा है", "मेरे पेट में दो दिन से दर्द हो रहा है",
+        "मुझे खांसी और गले में खराश है", "क्या मैं यह दवा ले सकता हूँ", "मुझे नींद नहीं आ रही है",
+        "मेरे बच्चे को कल से उल्टी हो रही है", "डॉक्टर से कब मिलना चाहिए", "मुझे बहुत कमजोरी महसूस हो रही है",
+        "मधुमेह के क्या लक्षण हैं", "मेरी माँ को घुटनों में दर्द रहता है", "क्या यह गंभीर बीमारी है",
+        "मुझे अपनी दवा का समय याद रखने में मदद चाहिए", "मैं गर्भवती हूं और मुझे चक्कर आते हैं",
+        "आपको आराम करना चाहिए और पानी पीते रहिए", "नजदीकी अस्पताल कहाँ है", "मेरी छाती में बहुत तेज दर्द हो रहा है",
+        "उसे सांस लेने में तकलीफ हो रही है", "मुझे वजन कम करने के लिए डाइट प्लान चाहिए", "हाँ, बिलकुल यही।",
+        "नहीं, यह समस्या नहीं है।", "मुझे डायबिटीज के बारे में जानकारी चाहिए", "क्या यह दवा सुरक्षित है",
+        "मेरी उम्र पैंतालीस साल है और मुझे जोड़ों में दर्द होता है", "बच्चों को कितना पानी पीना चाहिए",
+    ],
+    "mr-IN": [
+        "मला ताप आहे आणि डोकं दुखत आहे", "माझ्या पोटात दोन दिवसांपासून दुखत आहे",
+        "मला खोकला आहे आणि घसा खवखवतो", "मी हे औषध घेऊ शकतो का", "मला झोप येत नाही",
+        "माझ्या मुलाला कालपासून उलट्या होत आहेत", "डॉक्टरांना कधी भेटायला हवे", "मला खूप अशक्तपणा जाणवतो आहे",
+        "मधुमेहाची लक्षणे काय आहेत", "माझ्या आईचे गुडघे दुखतात", "हा गंभीर आजार आहे का",
+        "मला माझ्या औषधाची वेळ लक्षात ठेवण्यासाठी मदत हवी आहे", "मी गरोदर आहे आणि मला चक्कर येते",
+        "तुम्ही आराम करा आणि पाणी पीत राहा", "जवळचे रुग्णालय कुठे आहे", "माझ्या छातीत खूप दुखत आहे",
+        "त्याला श्वास घेण्यास त्रास होत आहे", "मला वजन कमी करण्यासाठी आहार योजना हवी आहे", "हो, अगदी बरोबर.",
+        "नाही, ही समस्या नाही.", "मला मधुमेहाबद्दल माहिती हवी आहे", "हे औषध सुरक्षित आहे का",
+        "माझे वय पंचेचाळीस वर्षे आहे आणि माझे सांधे दुखतात", "मुलांनी किती पाणी प्यावे", "डोळे लाल झाले आहेत",
+    ],
+}
+
+# Frequent Hindi function words / symptom words in romanized (Latin-script) Hinglish
+ROMANIZED_HINDI_MARKERS = frozenset("""
+hai hain tha thi mujhe mujhko mera meri mere mai main mein nahi nahin kya kyun kaise aur bhi ho raha rahi rahe
+se ko ka ki ke kal aaj abhi bahut thoda kuch dard bukhar khansi pet sir sar jukam ulti dawai dawa chahiye karo
+karna lag lagta lagti gaya gayi hua hui wala wali yeh woh hum aap ap tum kab kitna kitni din raat subah
+""".split())
+
+
+def _ngrams(text: str, max_n: int = 3):
+    padded = f" {' '.join(text.split())} "
+    for n in range(1, max_n + 1):
+        for i in range(len(padded) - n + 1):
+            yield padded[i:i + n]
+
+
+class _NgramNaiveBayes:
+    """Add-one smoothed character 1-3 gram model over a few languages."""
+
+    def __init__(self, samples: Dict[str, List[str]]):
+        self.counts = {lang: Counter(g for s in sents for g in _ngrams(s)) for lang, sents in samples.items()}
+        self.totals = {lang: sum(c.values()) for lang, c in self.counts.items()}
+        self.vocab = len(set().union(*self.counts.values()))
+
+    def scores(self, text: str) -> Dict[str, float]:
+        grams = list(_ngrams(text))
+        return {
+            lang: sum(math.log((counts[g] + 1) / (self.totals[lang] + self.vocab)) for g in grams)
+            for lang, counts in self.counts.items()
+        }
+
+
+_DEVANAGARI_MODEL = _NgramNaiveBayes(_DEVANAGARI_SAMPLES)
+
+
+@dataclass
+class LanguageGuess:
+    """Result of identify_language"""
+    language: str            # e.g. "hi-IN"
+    script: str              # ISO 15924 code of the dominant script ("Latn" when no letters at all)
+    confidence: float        # share of letters in the chosen script (or n-gram margin for hi/mr)
+    romanized_hinglish: bool = False
+
+
+@lru_cache(maxsize=1024)
+def identify_language(text: str) -> LanguageGuess:
+    """Identify the language of text without any network call."""
+    indic: Dict[int, int] = {}
+    latin = 0
+    for ch in text:
+        cp = ord(ch)
+        if cp < 128:
+            if ch.isalpha():
+                latin += 1
+            continue
+        block = cp >> 7
+        if block in _INDIC_BLOCKS and cp not in _NEUTRAL:
+            indic[block] = indic.get(block, 0) + 1
+
+    if indic:
+        block, count = max(indic.items(), key=lambda kv: kv[1])
+        script, language = _INDIC_BLOCKS[block]
+        confidence = count / (sum(indic.values()) + latin)
+        if script == "Deva":
+            scores = _DEVANAGARI_MODEL.scores(text)
+            language = max(scores, key=scores.get)
+            # Probability of the winner from the two log-likelihoods
+            other = min(scores.values())
+            confidence = 1 / (1 + math.exp(other - scores[language]))
+        return LanguageGuess(language=language, script=script, confidence=confidence)
+
+    tokens = [t.strip(".,!?;:'\"()") for t in text.lower().split()]
+    tokens = [t for t in tokens if t]
+    markers = sum(1 for t in tokens if t in ROMANIZED_HINDI_MARKERS)
+    romanized = markers >= 2 and markers / len(tokens) >= 0.2 if tokens else False
+    return LanguageGuess(language="en-IN", script="Latn", confidence=1.0 if latin else 0.0,
+                         romanized_hinglish=romanized)
+
+
+def detect_language(text: str, default: str = "en-IN") -> str:
+    """Language code (e.g. "ta-IN") for text; default when the text has no letters."""
+    if not text or not text.strip():
+        return default
+    guess = identify_language(text)
+    return guess.language if guess.confidence > 0 else default
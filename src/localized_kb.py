@@ -0,0 +1,216 @@
+"""
+Build-time translations of the symptom knowledge base.
+
+Symptom names, keywords, follow-up questions and basic_triage_points in
+symptom_knowledge_base.json are static English strings. Instead of translating them on
+every turn, an offline build step translates them once into every supported language
+and writes a localized artifact:
+
+    python -m src.localized_kb [--languages hi-IN ta-IN ...] [--force]
+
+The artifact (symptom_knowledge_base.localized.json) maps the SHA-256 of each English
+string to its translations, so a rebuild only translates strings that are new or changed
+and drops the ones no longer in the KB. It also records the format version, the KB's
+content hash and the translation model / mode.
+
+At runtime LocalizedKB.translate() / translate_many() serve KB strings from the
+artifact with no network call and fall back to live translation for anything else
+(or when the artifact is missing or was built for another model).
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+KB_PATH = os.path.join(_PROJECT_ROOT, "src", "symptom_knowledge_base.json")
+LOCALIZED_KB_PATH = os.getenv(
+    "HEALBEE_LOCALIZED_KB", os.path.join(_PROJECT_ROOT, "src", "symptom_knowledge_base.localized.json")
+)
+ARTIFACT_VERSION = 1
+# Non-English languages offered in the UI
+KB_LANGUAGES = ("hi-IN", "bn-IN", "mr-IN", "kn-IN", "ta-IN", "te-IN", "ml-IN")
+# Translated KB fields (per symptom); names and keywords feed the multilingual symptom lexicon
+LOCALIZED_FIELDS = ("symptom_name", "keywords", "follow_up_questions", "basic_triage_points")
+# Must match HealBeeUtilities._translate_payload; an artifact built for another model is ignored
+TRANSLATION_MODEL = "mayura:v1"
+TRANSLATION_MODE = "formal"
+
+
+def string_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def kb_strings(kb: Dict[str, Any]) -> List[str]:
+    """Distinct translatable strings of a KB (in KB order)."""
+    strings = []
+    for symptom in kb.get("symptoms", []):
+        for field in LOCALIZED_FIELDS:
+            values = symptom.get(field, [])
+            values = [values] if isinstance(values, str) else values
+            strings.extend(s for s in values if isinstance(s, str) and s.strip())
+    return list(dict.fromkeys(strings))
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read {path}: {e}")
+        return None
+
+
+def build_localized_kb(util, kb_path: str = KB_PATH, out_path: str = LOCALIZED_KB_PATH,
+                       languages: Iterable[str] = KB_LANGUAGES, force: bool = False) -> Dict[str, int]:
+    """
+    Translate every KB string missing from the artifact at out_path (all of them with
+    force) using util.translate_many, and rewrite the artifact. Failed translations (API error
+    or empty reply) are left out so the next build retries them; a translation identical to
+    its source (drug names, "COVID-19") is kept. Returns {"strings", "translated", "reused", "failed"}.
+    """
+    with open(kb_path, "rb") as f:
+        raw = f.read()
+    kb = json.loads(raw.decode("utf-8"))
+    languages = list(languages)
+    strings = kb_strings(kb)
+
+    previous = None if force else _read_json(out_path)
+    if previous and (previous.get("version") != ARTIFACT_VERSION or previous.get("model") != TRANSLATION_MODEL
+                     or previous.get("mode") != TRANSLATION_MODE):
+        print("🔄 Localized KB was built with another format or model; rebuilding from scratch.")
+        previous = None
+    old_entries = (previous or {}).get("strings", {})
+
+    entries = {string_hash(s): {"en-IN": s, **old_entries.get(string_hash(s), {})} for s in strings}
+    counts = {"strings": len(strings), "translated": 0, "reused": 0, "failed": 0}
+    for lang in languages:
+        missing = [s for s in strings if lang not in entries[string_hash(s)]]
+        counts["reused"] += len(strings) - len(missing)
+        if not missing:
+            continue
+        print(f"🔄 Translating {len(missing)} KB strings to {lang}...")
+        failed = set()
+        for text, translated in util.translate_many(missing, lang, failed=failed).items():
+            if text in failed:
+                counts["failed"] += 1
+            else:
+                entries[string_hash(text)][lang] = translated
+                counts["translated"] += 1
+
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "source_hash": hashlib.sha256(raw).hexdigest(),
+        "model": TRANSLATION_MODEL,
+        "mode": TRANSLATION_MODE,
+        "languages": sorted(set(languages) | set((previous or {}).get("languages", []))),
+        "strings": entries,
+    }
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, out_path)
+    print(f"✅ Localized KB written to {out_path}: {counts}")
+    return counts
+
+
+class LocalizedKB:
+    """Read side of the artifact: KB string translations without network calls."""
+
+    def __init__(self, path: str = LOCALIZED_KB_PATH, kb_path: str = KB_PATH):
+        self.path = path
+        self._strings: Dict[str, Dict[str, str]] = {}
+        artifact = _read_json(path)
+        if artifact is None:
+            return
+        if (artifact.get("version") != ARTIFACT_VERSION or artifact.get("model") != TRANSLATION_MODEL
+                or artifact.get("mode") != TRANSLATION_MODE):
+            print(f"⚠️ Ignoring localized KB at {path}: built for another format, model or mode.")
+            return
+        self._strings = artifact.get("strings", {})
+        try:
+            with open(kb_path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() != artifact.get("source_hash"):
+                    # Unchanged strings still match by hash; changed ones are translated live
+                    print("⚠️ Localized KB is older than the symptom KB; run python -m src.localized_kb.")
+        except OSError:
+            pass
+        print(f"✅ Localized KB loaded: {len(self._strings)} strings, {', '.join(artifact.get('languages', []))}")
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def get(self, text: str, target_lang: str) -> Optional[str]:
+        """Prebuilt translation of a KB string, or None."""
+        if target_lang.startswith("en"):
+            return text
+        return self._strings.get(string_hash(text), {}).get(target_lang)
+
+    def variants(self, text: str) -> List[str]:
+        """Every prebuilt translation of a KB string (no English)."""
+        return [v for lang, v in self._strings.get(string_hash(text), {}).items() if lang != "en-IN"]
+
+    def translate(self, text: str, target_lang: str, util=None) -> str:
+        """KB translation if prebuilt, else util.translate_text (text itself without util)."""
+        found = self.get(text, target_lang)
+        if found is not None:
+            return found
+        return util.translate_text(text, target_lang) if util is not None else text
+
+    def translate_many(self, texts: Iterable[str], target_lang: str, util=None) -> Dict[str, str]:
+        """{text: translation}: prebuilt KB strings first, the rest in one util.translate_many pass."""
+        texts = list(texts)
+        result = {}
+        for text in texts:
+            found = self.get(text, target_lang) if text else None
+            if found is not None:
+                result[text] = found
+        rest = [t for t in texts if t not in result]
+        if rest:
+            result.update(util.translate_many(rest, target_lang) if util is not None else {t: t for t in rest})
+        return result
+
+
+_localized_kb: Optional[LocalizedKB] = None
+_localized_kb_lock = threading.Lock()
+
+
+def get_localized_kb() -> LocalizedKB:
+    """Process-wide LocalizedKB, loaded on first use."""
+    global _localized_kb
+    if _localized_kb is None:
+        with _localized_kb_lock:
+            if _localized_kb is None:
+                _localized_kb = LocalizedKB()
+    return _localized_kb
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute translations of the symptom knowledge base")
+    parser.add_argument("--kb", default=KB_PATH, help="symptom KB JSON")
+    parser.add_argument("--out", default=LOCALIZED_KB_PATH, help="localized KB artifact to update")
+    parser.add_argument("--languages", nargs="+", default=list(KB_LANGUAGES))
+    parser.add_argument("--force", action="store_true", help="retranslate every string")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from src.utils import HealBeeUtilities
+
+    load_dotenv()
+    api_key = os.getenv("SARVAM_API_KEY")
+    if not api_key:
+        raise SystemExit("❌ SARVAM_API_KEY is not set (or point SARVAM_BASE_URL at the mock server).")
+    # The translation cache is skipped so a rebuild always reflects the current model output
+    util = HealBeeUtilities(api_key=api_key, cache_translations=False)
+    counts = build_localized_kb(util, args.kb, args.out, args.languages, args.force)
+    if counts["failed"]:
+        raise SystemExit(f"⚠️ {counts['failed']} translations failed; re-run to retry them.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Pre-translated catalog of the fixed assistant messages (message_catalog.json).
+
+Canned replies (reminder / journal confirmations, nearby-places labels, STT failure,
+response fallbacks) are written once per supported language instead of being sent to
+/translate on every use, so those flows need no network call. Templates take named
+parameters: get_message("reminder_set", "ta-IN", title="Paracetamol").
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+MESSAGE_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "message_catalog.json")
+MESSAGE_LANGUAGES = ("en", "hi", "bn", "mr", "kn", "ta", "te", "ml")
+
+
+class LocalizedText(str):
+    """
+    Text already written in `language` (catalog messages, emergency replies).
+    translate_stream passes it through when it matches the target language instead of
+    sending it to /translate again.
+    """
+
+    def __new__(cls, text: str, language: str) -> "LocalizedText":
+        obj = super().__new__(cls, text)
+        obj.language = language
+        return obj
+
+    def is_in(self, language: Optional[str]) -> bool:
+        return self.language == (language or "en").split("-")[0].lower()
+
+
+@lru_cache(maxsize=1)
+def load_message_catalog() -> Dict[str, Dict[str, str]]:
+    """{message key: {language: template}}, read once per process."""
+    with open(MESSAGE_CATALOG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_message(key: str, language: str = "en", **params: str) -> str:
+    """
+    Message key in language ('ta-IN' or 'ta'; English fallback) with params filled in.
+    Raises KeyError for an unknown key.
+    """
+    templates = load_message_catalog()[key]
+    lang = (language or "en").split("-")[0].lower()
+    if lang not in templates:
+        lang = "en"
+    template = templates[lang]
+    return LocalizedText(template.format(**params) if params else template, lang)
@@ -0,0 +1,317 @@
+"""
+Local stand-in for the Sarvam API, for benchmarks and offline load tests.
+
+Implements /v1/chat/completions (incl. SSE streaming), /translate, /translate/batch,
+/text-to-speech, /speech-to-text and /detect-language with the response shapes HealBee reads.
+Each endpoint has an EndpointProfile: log-normal latency (median / p95), a random 5xx error
+rate and an optional requests-per-second limit answered with 429 + Retry-After.
+
+Usage:
+    python -m src.mock_sarvam_server --port 8765 --median 0.4 --p95 1.5 --error-rate 0.02
+    SARVAM_BASE_URL=http://127.0.0.1:8765 SARVAM_API_KEY=mock streamlit run src/ui.py
+
+or in-process:
+    with MockSarvamServer() as server:
+        client = SarvamAPIClient(api_key="mock", base_url=server.base_url)
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+import wave
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from src.language_id import identify_language
+
+ENDPOINTS = ("chat", "translate", "tts", "stt", "detect")
+
+_PATHS = {
+    "/v1/chat/completions": "chat",
+    "/translate": "translate",
+    "/translate/batch": "translate",
+    "/text-to-speech": "tts",
+    "/speech-to-text": "stt",
+    "/detect-language": "detect",
+}
+
+# Symptom words the mock NLU recognises (English and common Hinglish)
+_SYMPTOM_WORDS = ("fever", "headache", "cough", "cold", "sore throat", "chest pain", "nausea", "vomiting",
+                  "dizziness", "fatigue", "body ache", "stomach pain", "rash", "diarrhea", "bukhar", "dard", "khansi")
+_INTENT_KEYWORDS = (
+    ("emergency", ("chest pain", "unconscious", "can't breathe", "bleeding")),
+    ("medication_info", ("medicine", "tablet", "dose", "paracetamol", "dawa")),
+    ("disease_info", ("diabetes", "what is", "symptoms of", "malaria", "dengue")),
+    ("prevention_info", ("prevent", "avoid", "vaccine")),
+    ("wellness_tip", ("diet", "sleep", "exercise", "healthy", "weight")),
+    ("symptom_query", _SYMPTOM_WORDS),
+)
+
+_STT_TRANSCRIPT = "I have had fever and headache since two days"
+
+
+@dataclass
+class EndpointProfile:
+    """Latency / failure behaviour of one mock endpoint."""
+    median_latency: float = 0.3   # seconds
+    p95_latency: float = 1.0      # seconds; log-normal tail
+    error_rate: float = 0.0       # share of requests answered with a random 5xx
+    rate_limit: float = 0.0       # requests per second before 429 (0 = unlimited)
+    latency_per_kb: float = 0.0   # extra seconds per KiB of request body (prompt processing)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.median_latency <= 0:
+            return 0.0
+        # log-normal with the given median; sigma from the p95 (z = 1.645)
+        sigma = max(0.0, math.log(max(self.p95_latency, self.median_latency) / self.median_latency) / 1.645)
+        return rng.lognormvariate(math.log(self.median_latency), sigma)
+
+
+@dataclass
+class _Window:
+    """Requests seen in the current one-second window (for 429s)."""
+    started: float = 0.0
+    count: int = 0
+
+
+@dataclass
+class _Stats:
+    requests: Dict[str, int] = field(default_factory=lambda: {name: 0 for name in ENDPOINTS})
+    errors: Dict[str, int] = field(default_factory=lambda: {name: 0 for name in ENDPOINTS})
+    throttled: Dict[str, int] = field(default_factory=lambda: {name: 0 for name in ENDPOINTS})
+
+
+def _usage(messages: List[Dict], content: str) -> Dict[str, int]:
+    prompt = sum(len(str(m.get("content", "")).split()) for m in messages)
+    completion = len(content.split())
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _mock_intent(text: str) -> str:
+    lowered = text.lower()
+    for intent, keywords in _INTENT_KEYWORDS:
+        if any(k in lowered for k in keywords):
+            return intent
+    return "general_health"
+
+
+def _mock_entities(text: str) -> List[Dict]:
+    lowered = text.lower()
+    entities = []
+    for word in _SYMPTOM_WORDS:
+        start = lowered.find(word)
+        if start >= 0:
+            entities.append({"text": word, "type": "symptom", "start": start, "end": start + len(word),
+                             "confidence": 0.9})
+    return entities
+
+
+def mock_chat_content(messages: List[Dict]) -> str:
+    """Answer in the format the system prompt asks for (intent / entity JSON or a short reply)."""
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    if system.startswith("You are a healthcare intent classifier"):
+        return json.dumps({"intent": _mock_intent(user), "confidence": 0.9})
+    if system.startswith("You are a healthcare NLU engine"):
+        return json.dumps({"intent": _mock_intent(user), "confidence": 0.9, "entities": _mock_entities(user)})
+    if system.startswith("You are a medical entity extractor"):
+        return json.dumps({"entities": _mock_entities(user)})
+    return ("Thank you for sharing. Rest, drink plenty of fluids and keep track of how you feel. "
+            "If your symptoms get worse or do not improve in two days, please consult a doctor. "
+            "This is general information, not a medical diagnosis.")
+
+
+def _silent_wav(seconds: float, sample_rate: int = 22050) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+
+class MockSarvamServer:
+    """Threaded HTTP server emulating the Sarvam endpoints HealBee calls."""
+
+    def __init__(self, profiles: Optional[Dict[str, EndpointProfile]] = None, host: str = "127.0.0.1",
+                 port: int = 0, seed: Optional[int] = None, default: Optional[EndpointProfile] = None):
+        """
+        Args:
+            profiles: Endpoint name ("chat", "translate", "tts", "stt", "detect") -> EndpointProfile
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            seed: Seed for latency / error sampling (reproducible runs)
+            default: Profile of endpoints missing from profiles (default: no latency, no errors)
+        """
+        default = default or EndpointProfile(median_latency=0.0, p95_latency=0.0)
+        self.profiles = {name: (profiles or {}).get(name, default) for name in ENDPOINTS}
+        self.stats = _Stats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows = {name: _Window() for name in ENDPOINTS}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockSarvamServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockSarvamServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _admit(self, endpoint: str) -> Tuple[Optional[int], float]:
+        """(error status or None, latency) for the next request on endpoint."""
+        profile = self.profiles[endpoint]
+        with self._lock:
+            self.stats.requests[endpoint] += 1
+            if profile.rate_limit > 0:
+                window = self._windows[endpoint]
+                now = time.monotonic()
+                if now - window.started >= 1.0:
+                    window.started, window.count = now, 0
+                window.count += 1
+                if window.count > profile.rate_limit:
+                    self.stats.throttled[endpoint] += 1
+                    return 429, 0.0
+            latency = profile.sample_latency(self._rng)
+            if profile.error_rate and self._rng.random() < profile.error_rate:
+                self.stats.errors[endpoint] += 1
+                return self._rng.choice((500, 502, 503)), latency
+        return None, latency
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                endpoint = _PATHS.get(path)
+                if endpoint is None:
+                    return self._json(404, {"error": {"message": f"Unknown path {path}"}})
+                status, latency = server._admit(endpoint)
+                if status == 429:
+                    return self._json(429, {"error": {"message": "Rate limit exceeded"}}, {"Retry-After": "1"})
+                time.sleep(latency + server.profiles[endpoint].latency_per_kb * len(body) / 1024)
+                if status is not None:
+                    return self._json(status, {"error": {"message": "Mock upstream failure"}})
+                try:
+                    if endpoint == "stt":
+                        return self._json(200, server._stt(body))
+                    payload = json.loads(body or b"{}")
+                    if endpoint == "chat" and payload.get("stream"):
+                        return self._stream(mock_chat_content(payload.get("messages", [])), payload)
+                    return self._json(200, server._respond(path, payload))
+                except (ValueError, KeyError, TypeError) as e:
+                    return self._json(400, {"error": {"message": f"Bad request: {e}"}})
+
+            def _json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, content: str, payload: Dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                for word in re.findall(r"\S+\s*", content):
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": payload.get("model"),
+                             "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _respond(self, path: str, payload: Dict) -> Dict:
+        request_id = uuid.uuid4().hex
+        if path == "/v1/chat/completions":
+            messages = payload["messages"]
+            content = mock_chat_content(messages)
+            return {
+                "id": f"chatcmpl-{request_id[:12]}", "object": "chat.completion", "created": int(time.time()),
+                "model": payload.get("model", "sarvam-m"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": _usage(messages, content),
+            }
+        if path == "/translate":
+            text, target = payload["input"], payload["target_language_code"]
+            source = identify_language(text).language
+            translated = text if target == source else f"[{target}] {text}"
+            return {"request_id": request_id, "translated_text": translated, "source_language_code": source}
+        if path == "/translate/batch":
+            target = payload["target_lang"]
+            return {"request_id": request_id, "translations": [f"[{target}] {t}" for t in payload["texts"]]}
+        if path == "/text-to-speech":
+            # ~15 characters of speech per second
+            seconds = min(10.0, max(0.2, len(payload["text"]) / 15))
+            audio = _silent_wav(seconds, int(payload.get("speech_sample_rate", 22050)))
+            return {"request_id": request_id, "audios": [base64.b64encode(audio).decode("ascii")]}
+        guess = identify_language(payload["input"])
+        return {"request_id": request_id, "language_code": guess.language, "script_code": guess.script}
+
+    def _stt(self, body: bytes) -> Dict:
+        match = re.search(rb'name="language_code"\r\n\r\n([^\r\n]+)', body)
+        language = match.group(1).decode("ascii", "replace") if match else "en-IN"
+        return {"request_id": uuid.uuid4().hex, "transcript": _STT_TRANSCRIPT,
+                "language_code": "en-IN" if language == "unknown" else language}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local mock of the Sarvam API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--median", type=float, default=0.3, help="median latency in seconds")
+    parser.add_argument("--p95", type=float, default=1.0, help="p95 latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 5xx")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/s per endpoint before 429 (0 = off)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    profile = EndpointProfile(args.median, args.p95, args.error_rate, args.rate_limit)
+    server = MockSarvamServer(host=args.host, port=args.port, seed=args.seed, default=profile)
+    print(f"✅ Mock Sarvam API listening on {server.base_url} (set SARVAM_BASE_URL to use it)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
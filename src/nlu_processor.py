@@ -1,16 +1,30 @@
+import asyncio
+import dataclasses
 import json
 import time
 import re
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import requests
 from dotenv import load_dotenv
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 from functools import lru_cache
 from fuzzywuzzy import process
 import textdistance
 import logging
+from src.cache import TwoTierCache, get_shared_cache, make_cache_key
+from src.emergency_detector import EmergencyDetector, EmergencyMatch
+from src.http_transport import (SARVAM_BASE_URL, AsyncSarvamTransport, SarvamTransport, get_async_transport,
+                                get_transport, httpx)
+from src.instrumentation import instrument
+from src.intent_classifier import get_local_intent_classifier, log_intent_example
+from src.language_id import detect_language
+from src.rate_limit import TokenBucket
+from src.resilience import CircuitOpenError, ResilientCaller, get_resilient_caller
+from src.text_index import BKTree, IntervalSet, KeywordAutomaton
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,14 +35,47 @@ _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 with open(os.path.join(_PROJECT_ROOT, "src", "hinglish_symptoms.json"), "r", encoding="utf-8") as f:
     HINGLISH_SYMPTOMS = json.load(f)
 
-import re
+def _trie_regex(words: List[str]) -> str:
+    """
+    Build a regex alternation shaped like a character trie, so the engine walks shared
+    prefixes once instead of retrying every alternative at every position.
+    Optional tails are greedy, which gives longest-match semantics.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + _render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return _render(trie)
+
+def _build_hinglish_normalizer(symptom_map: Dict[str, List[str]]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """
+    Compile every Hinglish/Devanagari variant into one case-insensitive trie regex.
+    The longest variant wins at each position; a variant listed under several keys
+    resolves to the first key in file order.
+    """
+    replacements: Dict[str, str] = {}
+    for key, variations in symptom_map.items():
+        for variant in variations:
+            replacements.setdefault(variant.lower(), key)
+    pattern = re.compile(r'(?<!\w)(?:' + _trie_regex(list(replacements)) + r')(?!\w)', re.IGNORECASE)
+    return pattern, replacements
+
+_HINGLISH_PATTERN, _HINGLISH_REPLACEMENTS = _build_hinglish_normalizer(HINGLISH_SYMPTOMS)
 
+@lru_cache(maxsize=1024)
 def normalize_hinglish_terms(text: str) -> str:
-    for key, variations in HINGLISH_SYMPTOMS.items():
-        for variant in variations:
-            pattern = r'(?<!\w)' + re.escape(variant) + r'(?!\w)'
-            text = re.sub(pattern, key, text)
-    return text
+    """Rewrite all known symptom variants to their canonical key in a single pass (memoized)."""
+    return _HINGLISH_PATTERN.sub(lambda m: _HINGLISH_REPLACEMENTS[m.group(0).lower()], text)
 
 def tokenize_hinglish_query(text: str) -> List[str]:
     """Break down Hinglish sentence into individual tokens."""
@@ -47,40 +94,173 @@ def load_common_misspellings(filepath=None):
 
 COMMON_MISSPELLINGS = load_common_misspellings()
 
+def _build_variant_map(misspellings: Dict[str, List[str]], include_keys: bool) -> Dict[str, str]:
+    """Lowercased variant (and optionally canonical key) -> canonical key; the first canonical in file order wins."""
+    mapping = {}
+    for canonical, variants in misspellings.items():
+        if include_keys:
+            mapping.setdefault(canonical.lower(), canonical)
+        for variant in variants:
+            mapping.setdefault(variant.lower(), canonical)
+    return mapping
+
+# Exact lookups, precomputed once instead of lowercasing every variant list per call
+_VARIANT_TO_CANONICAL = _build_variant_map(COMMON_MISSPELLINGS, include_keys=False)
+_TERM_TO_CANONICAL = _build_variant_map(COMMON_MISSPELLINGS, include_keys=True)
+
+def _similarity_radius(length: int) -> int:
+    """
+    Largest edit distance that can still give a normalized Levenshtein similarity > 0.7
+    for a word of this length (distance < 0.3 * max_len and max_len < length / 0.7).
+    """
+    return (3 * length) // 7
+
+FUZZY_SHORTLIST_SIZE = 32
+
+def _char_trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+@lru_cache(maxsize=1)
+def _fuzzy_key_index() -> Tuple[BKTree, Dict[str, List[str]], Dict[str, int]]:
+    """BK-tree over lowercased canonical keys, trigram -> keys postings, and key order."""
+    keys = [k.lower() for k in COMMON_MISSPELLINGS.keys()]
+    postings: Dict[str, List[str]] = {}
+    for key in keys:
+        for gram in _char_trigrams(key):
+            postings.setdefault(gram, []).append(key)
+    order = {}
+    for i, key in enumerate(keys):
+        order.setdefault(key, i)
+    return BKTree(keys), postings, order
+
+def _fuzzy_shortlist(word: str) -> List[str]:
+    """
+    Keys worth scoring with fuzzywuzzy: those within edit distance of the word, plus the keys
+    sharing the most character trigrams with it (catches partial and token matches). Returned
+    in dictionary order so ties resolve the same way as a full scan.
+    """
+    tree, postings, order = _fuzzy_key_index()
+    keys = {k for _, k in tree.search(word, max(2, _similarity_radius(len(word))))}
+    shared: Dict[str, int] = {}
+    for gram in _char_trigrams(word):
+        for key in postings.get(gram, ()):
+            shared[key] = shared.get(key, 0) + 1
+    keys.update(sorted(shared, key=lambda k: (-shared[k], order[k]))[:FUZZY_SHORTLIST_SIZE])
+    return sorted(keys, key=order.__getitem__)
+
 @lru_cache(maxsize=256)
 def correct_misspelled_entity(word: str) -> str:
+    word_lower = word.lower()
     # Direct match to key
-    if word.lower() in COMMON_MISSPELLINGS:
-        return word.lower()
+    if word_lower in COMMON_MISSPELLINGS:
+        return word_lower
     # Match to value
-    for canonical, variants in COMMON_MISSPELLINGS.items():
-        if word.lower() in [v.lower() for v in variants]:
-            return canonical
-    # Fuzzy match to keys
-    result = process.extractOne(word.lower(), COMMON_MISSPELLINGS.keys())
+    canonical = _VARIANT_TO_CANONICAL.get(word_lower)
+    if canonical is not None:
+        return canonical
+    # Fuzzy match to keys, scored only against the nearby ones
+    shortlist = _fuzzy_shortlist(word_lower)
+    if not shortlist:
+        return word
+    result = process.extractOne(word_lower, shortlist)
     if result is None:
         return word
     best_match, score = result
     return best_match if score > 80 else word
 
+@lru_cache(maxsize=8)
+def _phonetic_index(candidates_tuple: tuple) -> Tuple[BKTree, Dict[str, int]]:
+    """BK-tree over the candidates plus every misspelling variant, and each term's first position."""
+    order: Dict[str, int] = {}
+    for candidate in list(candidates_tuple) + [v for vs in COMMON_MISSPELLINGS.values() for v in vs]:
+        order.setdefault(candidate.lower(), len(order))
+    return BKTree(order), order
+
 def phonetic_match(word: str, candidates_tuple: tuple) -> str:
-    candidates = list(candidates_tuple)
-    # Add all variant values to candidates
-    for variants in COMMON_MISSPELLINGS.values():
-        candidates.extend(variants)
-    if not candidates:
+    tree, order = _phonetic_index(candidates_tuple)
+    word_lower = word.lower()
+    # An exact hit has similarity 1.0, so nothing can beat it
+    if word_lower in order:
+        return _TERM_TO_CANONICAL.get(word_lower, word)
+    # Only terms within this edit distance can clear the 0.7 similarity bar
+    neighbours = tree.search(word_lower, _similarity_radius(len(word_lower)))
+    if not neighbours:
         return word
-    best_match = max(
-        candidates,
-        key=lambda c: textdistance.levenshtein.normalized_similarity(word.lower(), c.lower())
+    # Highest normalized similarity wins; ties go to the earliest candidate, as with max() over the list
+    _, _, best_match = max(
+        (1 - d / max(len(word_lower), len(t), 1), -order[t], t) for d, t in neighbours
     )
-    if textdistance.levenshtein.normalized_similarity(word.lower(), best_match.lower()) > 0.7:
+    if textdistance.levenshtein.normalized_similarity(word_lower, best_match) > 0.7:
         # If best_match is a variant, return its canonical key
-        for canonical, variants in COMMON_MISSPELLINGS.items():
-            if best_match.lower() == canonical.lower() or best_match.lower() in [v.lower() for v in variants]:
-                return canonical
+        canonical = _TERM_TO_CANONICAL.get(best_match)
+        if canonical is not None:
+            return canonical
     return word
 
+# Shared, bounded pool for the network-bound NLU steps (intent / entity calls) of all processors
+NLU_MAX_WORKERS = int(os.getenv("HEALBEE_NLU_MAX_WORKERS", "8"))
+_nlu_executor: Optional[ThreadPoolExecutor] = None
+_nlu_executor_lock = threading.Lock()
+
+def _get_nlu_executor() -> ThreadPoolExecutor:
+    """Return the process-wide NLU thread pool, creating it on first use."""
+    global _nlu_executor
+    if _nlu_executor is None:
+        with _nlu_executor_lock:
+            if _nlu_executor is None:
+                _nlu_executor = ThreadPoolExecutor(max_workers=NLU_MAX_WORKERS, thread_name_prefix="healbee-nlu")
+    return _nlu_executor
+
+# Symptom KB + keyword index per KB file, shared by every processor in the process
+_SYMPTOM_KB_CACHE: Dict[str, Tuple[List[Dict], KeywordAutomaton]] = {}
+_SYMPTOM_KB_LOCK = threading.Lock()
+
+def _build_symptom_keyword_index(symptom_kb: List[Dict]) -> KeywordAutomaton:
+    """
+    Index every lowercased symptom name and keyword. The payload is the keyword's position in
+    KB order (symptom, then name before keywords), so callers can replay matches in that order.
+    A keyword repeated across symptoms keeps its first position.
+    """
+    index = KeywordAutomaton()
+    rank = 0
+    for symptom_data in symptom_kb:
+        for keyword in [symptom_data["symptom_name"]] + list(symptom_data.get("keywords", [])):
+            index.add(keyword.lower(), rank)
+            rank += 1
+    return index.build()
+
+def _extract_json_content(content: str) -> str:
+    """Strip markdown code fences the LLM sometimes wraps around its JSON answer."""
+    content = content.strip()
+    if '```json' in content:
+        content = content.split('```json')[1].split('```')[0].strip()
+    elif '```' in content:
+        content = content.split('```')[1].strip()
+    return content
+
+def iter_sse_content(lines: Iterable) -> Iterator[str]:
+    """
+    Content deltas from the server-sent-event lines of a streamed chat completion
+    ("data: {json chunk}" ... "data: [DONE]"). Lines may be bytes or str; other SSE fields are ignored.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        for choice in chunk.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield content
+
 class HealthIntent(Enum):
     """Healthcare-specific intents"""
     SYMPTOM_QUERY = "symptom_query"
@@ -93,6 +273,68 @@ class HealthIntent(Enum):
     GENERAL_HEALTH = "general_health"
     UNKNOWN = "unknown"
 
+# LLM label -> enum (anything else maps to UNKNOWN)
+INTENT_MAPPING = {
+    "symptom_query": HealthIntent.SYMPTOM_QUERY,
+    "disease_info": HealthIntent.DISEASE_INFO,
+    "medication_info": HealthIntent.MEDICATION_INFO,
+    "wellness_tip": HealthIntent.WELLNESS_TIP,
+    "emergency": HealthIntent.EMERGENCY,
+    "diagnosis_request": HealthIntent.DIAGNOSIS_REQUEST,
+    "prevention_info": HealthIntent.PREVENTION_INFO,
+    "general_health": HealthIntent.GENERAL_HEALTH,
+}
+
+# System prompts of the Sarvam-M NLU steps
+_INTENT_SYSTEM_PROMPT = """You are a healthcare intent classifier. Classify user queries into these categories:
+
+1. symptom_query - User is describing one or more physical symptoms, feelings of illness, or specific pains (e.g., 'I have a headache and fever', 'my throat hurts').
+2. disease_info - Information about diseases/conditions
+3. medication_info - Medicine-related queries
+4. wellness_tip - Health and wellness advice
+5. emergency - Urgent medical situations
+6. diagnosis_request - Seeking medical diagnosis
+7. prevention_info - Disease prevention information
+8. general_health - General health questions
+
+Respond ONLY with JSON format: {"intent": "category_name", "confidence": 0.95}"""
+
+_COMBINED_SYSTEM_PROMPT = """You are a healthcare NLU engine. For each user query, classify the intent AND extract medical entities.
+
+Intent categories:
+1. symptom_query - User is describing one or more physical symptoms, feelings of illness, or specific pains (e.g., 'I have a headache and fever', 'my throat hurts').
+2. disease_info - Information about diseases/conditions
+3. medication_info - Medicine-related queries
+4. wellness_tip - Health and wellness advice
+5. emergency - Urgent medical situations
+6. diagnosis_request - Seeking medical diagnosis
+7. prevention_info - Disease prevention information
+8. general_health - General health questions
+
+Entity types:
+- symptom: fever, headache, cough, chest pain, sore throat, body ache, nausea, dizziness, fatigue, etc. Be specific in identifying the symptom text.
+- disease: diabetes, hypertension, covid, etc.
+- medication: paracetamol, metformin, aspirin, etc.
+- body_part: head, chest, stomach, heart, etc.
+- medical_term: blood pressure, sugar level, etc.
+
+Respond ONLY with JSON format:
+{"intent": "category_name", "confidence": 0.95, "entities": [{"text": "fever", "type": "symptom", "start": 5, "end": 10, "confidence": 0.95}]}"""
+
+_ENTITY_SYSTEM_PROMPT = """You are a medical entity extractor. Extract these entity types from healthcare queries:
+
+- symptoms: Detailed descriptions of physical feelings or ailments like fever, headache, cough, chest pain, sore throat, body ache, nausea, dizziness, fatigue, etc. Be specific in identifying the symptom text.
+- diseases: diabetes, hypertension, covid, etc.
+- medications: paracetamol, metformin, aspirin, etc.
+- body_parts: head, chest, stomach, heart, etc.
+- medical_terms: blood pressure, sugar level, etc.
+
+Respond ONLY with JSON format:
+{"entities": [{"text": "fever", "type": "symptom", "start": 5, "end": 10, "confidence": 0.95}]}"""
+
+_STEP_NAMES = {"intent": "intent classification", "combined": "combined intent + entity extraction",
+               "entities": "entity extraction"}
+
 @dataclass
 class MedicalEntity:
     """Represents extracted medical entities"""
@@ -113,26 +355,36 @@ class NLUResult:
     requires_disclaimer: bool
     language_detected: str
 
+@dataclass
+class _LocalStage:
+    """Output of the network-free NLU stages for one (normalized) input"""
+    text: str
+    emergency: Optional[EmergencyMatch]
+    requires_disclaimer: bool
+    detected_language: str
+    known_intent: Optional[Tuple[HealthIntent, float]]
+
 class SarvamAPIClient:
     """Client for Sarvam AI API services"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[TwoTierCache] = None,
+                 transport: Optional[SarvamTransport] = None, async_transport: Optional[AsyncSarvamTransport] = None,
+                 resilience: Optional[ResilientCaller] = None, base_url: Optional[str] = None):
         # Get API key from environment variable if not provided
         self.api_key = api_key or os.getenv("SARVAM_API_KEY")
         if not self.api_key:
             raise ValueError("SARVAM_API_KEY environment variable or api_key parameter is required")
 
-        self.base_url = "https://api.sarvam.ai"
+        self.base_url = (base_url or SARVAM_BASE_URL).rstrip("/")
+        self.cache = cache
+        # Shared pooled session (keep-alive + retries) unless one is injected
+        self.transport = transport or get_transport()
+        self._async_transport = async_transport  # created on first async call
+        # Hedging + circuit breaker for chat completions, shared process-wide unless injected
+        self.resilience = resilience or get_resilient_caller("chat")
 
-    def chat_completion(self, messages: List[Dict], model: str = "sarvam-m", **kwargs) -> Dict:
-        """
-        Generate chat completion using Sarvam-M model
-
-        Args:
-            messages: List of message objects with role and content
-            model: Model name (default: sarvam-m)
-            **kwargs: Additional parameters like temperature, max_tokens, etc.
-        """
+    def _chat_request(self, messages: List[Dict], model: str, kwargs: Dict) -> Tuple[str, Dict, Dict]:
+        """URL, headers and payload of a chat completion call (shared by the sync and async paths)."""
         url = f"{self.base_url}/v1/chat/completions"
 
         headers = {
@@ -148,23 +400,149 @@ class SarvamAPIClient:
             "max_tokens": kwargs.get("max_tokens", 512),
             "n": kwargs.get("n", 1)
         }
+        return url, headers, payload
+
+    def _cache_key(self, payload: Dict, use_cache: bool) -> Optional[str]:
+        # Sampling params are part of the key: the same messages at another temperature are another request.
+        # So is the API base URL: a mock or staging server's answers must never be served for the real API.
+        if use_cache and self.cache is not None:
+            return make_cache_key("chat_completion", self.base_url, payload)
+        return None
+
+    def _store(self, cache_key: Optional[str], result: Dict) -> Dict:
+        if cache_key is not None and result.get("choices"):
+            self.cache.set(cache_key, result)
+        return result
 
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+    def chat_completion(self, messages: List[Dict], model: str = "sarvam-m", use_cache: bool = False,
+                        operation: str = "chat", **kwargs) -> Dict:
+        """
+        Generate chat completion using Sarvam-M model
+
+        Args:
+            messages: List of message objects with role and content
+            model: Model name (default: sarvam-m)
+            use_cache: Serve / store the response in self.cache. Only for deterministic calls
+                (fixed prompts, low temperature) whose answer may be reused verbatim.
+            operation: Name the call is instrumented under (e.g. "nlu.intent")
+            **kwargs: Additional parameters like temperature, max_tokens, etc.
+        """
+        url, headers, payload = self._chat_request(messages, model, kwargs)
+        cache_key = self._cache_key(payload, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        def _attempt(hedged: bool) -> Dict:
+            # A hedge must not be coalesced onto the slow request it is racing
+            extra = {"coalesce": False} if hedged else {}
+            response = self.transport.post(url, headers=headers, json=payload, read_timeout=30, **extra)
             response.raise_for_status()
             return response.json()
 
+        try:
+            with instrument("sarvam", operation) as span:
+                result = self.resilience.call(_attempt)
+                span.add_usage(result.get("usage"))
+            return self._store(cache_key, result)
+
+        except CircuitOpenError as e:
+            print(f"⚡ {e}; skipping Sarvam call")
+            return {}
         except requests.exceptions.RequestException as e:
             print(f"❌ Sarvam API request failed: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 print(f"Response: {e.response.text}")
             return {}
 
+    def chat_completion_stream(self, messages: List[Dict], model: str = "sarvam-m", operation: str = "chat",
+                               **kwargs) -> Iterator[str]:
+        """
+        Stream a chat completion: yields content deltas as the server sends them (SSE).
+        Yields nothing if the request fails; streamed answers are never cached.
+        """
+        url, headers, payload = self._chat_request(messages, model, kwargs)
+        payload["stream"] = True
+        breaker = self.resilience.breaker
+        if not breaker.allow():
+            print("⚡ chat circuit breaker is open; skipping Sarvam streaming call")
+            return
+        try:
+            # The span covers time to the response headers; the body is consumed lazily
+            with instrument("sarvam", operation):
+                response = self.transport.post(url, headers=headers, json=payload, read_timeout=30, stream=True)
+            with response:
+                response.raise_for_status()
+                breaker.record_success()
+                yield from iter_sse_content(response.iter_lines())
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Sarvam API streaming request failed: {e}")
+            if self.resilience.is_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+
+    async def chat_completion_async(self, messages: List[Dict], model: str = "sarvam-m",
+                                    use_cache: bool = False, operation: str = "chat", **kwargs) -> Dict:
+        """asyncio version of chat_completion (same payload, cache and {} on failure)."""
+        url, headers, payload = self._chat_request(messages, model, kwargs)
+        cache_key = self._cache_key(payload, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def _attempt(hedged: bool) -> Dict:
+            extra = {"coalesce": False} if hedged else {}
+            response = await self.async_transport.post(url, headers=headers, json=payload, read_timeout=30, **extra)
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            with instrument("sarvam", operation) as span:
+                result = await self.resilience.call_async(_attempt)
+                span.add_usage(result.get("usage"))
+            return self._store(cache_key, result)
+
+        except CircuitOpenError as e:
+            print(f"⚡ {e}; skipping Sarvam call")
+            return {}
+        except httpx.HTTPError as e:
+            print(f"❌ Sarvam API request failed: {e}")
+            if getattr(e, 'response', None) is not None:
+                print(f"Response: {e.response.text}")
+            return {}
+
+    @property
+    def async_transport(self) -> AsyncSarvamTransport:
+        if self._async_transport is None:
+            self._async_transport = get_async_transport()
+        return self._async_transport
+
 class SarvamMNLUProcessor:
     """NLU processor using Sarvam-M for healthcare queries"""
 
-    def __init__(self, api_key: Optional[str] = None):
-        self.sarvam_client = SarvamAPIClient(api_key)
+    def __init__(self, api_key: Optional[str] = None, combined_nlu: bool = False, step_timeout: float = 35.0,
+                 cache_llm: bool = True, local_intent_threshold: Optional[float] = 0.9):
+        """
+        Args:
+            api_key: Sarvam API key (falls back to SARVAM_API_KEY)
+            combined_nlu: Get intent and entities from a single Sarvam-M call instead of two.
+                The two-call path is still used whenever the combined answer cannot be parsed.
+            step_timeout: Seconds to wait for each network-bound NLU step before using its fallback.
+            cache_llm: Reuse intent / entity answers for repeated queries via the shared
+                on-disk LLM cache (HEALBEE_CACHE_DIR/llm_cache.sqlite3).
+            local_intent_threshold: Accept the local intent model's answer (and skip the Sarvam-M
+                intent call) when its confidence is at least this; None disables the local model.
+        """
+        self.sarvam_client = SarvamAPIClient(api_key, cache=get_shared_cache("llm_cache") if cache_llm else None)
+        self.local_intent_threshold = local_intent_threshold
+        self.local_intent_classifier = get_local_intent_classifier() if local_intent_threshold is not None else None
+        # Opt-in JSONL log of LLM-labelled queries, used to retrain the local intent model
+        self.intent_log_path = os.getenv("HEALBEE_INTENT_LOG")
+        self.combined_nlu = combined_nlu
+        self.step_timeout = step_timeout
         self.symptom_kb = None  # For storing symptom knowledge base
         self.emergency_keywords = {} # Initialize as empty dict
         self._load_keyword_config() # Load keywords from config file
@@ -201,35 +579,32 @@ class SarvamMNLUProcessor:
         except Exception as e: # Catch any other unexpected errors during loading
             print(f"❌ An unexpected error occurred while loading keyword config from {config_filepath}: {e}")
             self.emergency_keywords = {}
+        # One automaton over every language's list: emergencies are caught whatever language the UI is set to
+        self.emergency_detector = EmergencyDetector(self.emergency_keywords)
 
     def _load_symptom_kb(self, filepath=None):
-        """Loads the symptom knowledge base from a JSON file."""
+        """Loads the symptom knowledge base from a JSON file and its keyword index (once per process)."""
         if filepath is None:
             filepath = os.path.join(_PROJECT_ROOT, "src", "symptom_knowledge_base.json")
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.symptom_kb = data.get("symptoms", [])
-                print(f"✅ Symptom knowledge base loaded successfully from {filepath}.")
-        except FileNotFoundError:
-            print(f"⚠️ Symptom knowledge base file not found at {filepath}. Keyword matching will be limited.")
-            self.symptom_kb = []
-        except json.JSONDecodeError:
-            print(f"⚠️ Error decoding JSON from symptom knowledge base file at {filepath}. Keyword matching will be limited.")
-            self.symptom_kb = []
+        with _SYMPTOM_KB_LOCK:
+            cached = _SYMPTOM_KB_CACHE.get(filepath)
+            if cached is None:
+                try:
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    symptom_kb = data.get("symptoms", [])
+                    cached = (symptom_kb, _build_symptom_keyword_index(symptom_kb))
+                    _SYMPTOM_KB_CACHE[filepath] = cached
+                    print(f"✅ Symptom knowledge base loaded successfully from {filepath} ({len(cached[1])} keywords indexed).")
+                except FileNotFoundError:
+                    print(f"⚠️ Symptom knowledge base file not found at {filepath}. Keyword matching will be limited.")
+                    cached = ([], KeywordAutomaton())
+                except json.JSONDecodeError:
+                    print(f"⚠️ Error decoding JSON from symptom knowledge base file at {filepath}. Keyword matching will be limited.")
+                    cached = ([], KeywordAutomaton())
+        self.symptom_kb, self.symptom_keyword_index = cached
 
     def process_transcription(self, transcribed_text: str, source_language: str = "hi-IN") -> NLUResult:
-        transcribed_text = normalize_hinglish_terms(transcribed_text)
-
-            # Hinglish intent pre-check
-        hinglish_intent = self.get_intent(transcribed_text)
-        if hinglish_intent == HealthIntent.SYMPTOM_QUERY:
-            intent, intent_confidence = hinglish_intent, 1.0
-        else:
-            intent, intent_confidence = self._classify_intent(transcribed_text, source_language)
-
-        print(f"🧠 Processing NLU for: '{transcribed_text}'")
-
         """
         Process transcribed text through Sarvam-M for NLU
 
@@ -240,56 +615,250 @@ class SarvamMNLUProcessor:
         Returns:
             NLUResult with intent, entities, and safety flags
         """
-        print(f"🧠 Processing NLU for: '{transcribed_text}'")
+        return self._finish_nlu(self._local_stage(transcribed_text), source_language)
 
-        # Step 1: Safety checks first
-        is_emergency = self._detect_emergency(transcribed_text, source_language)
-        requires_disclaimer = self._requires_medical_disclaimer(transcribed_text)
+    def process_many(self, texts: Iterable[str], languages: Union[str, Iterable[str], None] = None,
+                     max_concurrency: int = 4, requests_per_second: Optional[float] = None) -> Iterator[NLUResult]:
+        """
+        Batch version of process_transcription; yields one NLUResult per input, in input order.
 
-        # Intent already set above from Hinglish pre-check or _classify_intent; do not overwrite.
+        Identical (normalized text, language) pairs are processed once. The local stages
+        (normalization, emergency, disclaimer, language, local intent) run over the whole
+        batch before any network call; the remaining Sarvam-M work runs on a dedicated pool of
+        max_concurrency workers, at most requests_per_second queries per second (None = no limit).
+        Queries answered locally (emergencies) don't consume the rate budget.
 
-        # Step 2: Entity extraction
-        entities = self._extract_medical_entities(transcribed_text, source_language)
+        Args:
+            texts: Transcribed texts
+            languages: One source language for all texts, or one per text (default "hi-IN")
+            max_concurrency: Queries in flight against Sarvam-M at once
+            requests_per_second: Client-side rate limit for queries that reach Sarvam-M
+        """
+        texts = list(texts)
+        if languages is None or isinstance(languages, str):
+            languages = [languages or "hi-IN"] * len(texts)
+        else:
+            languages = list(languages)
+            if len(languages) != len(texts):
+                raise ValueError(f"Got {len(texts)} texts but {len(languages)} languages")
+        if not texts:
+            return
+
+        # Local stages, once per distinct normalized input
+        stages: Dict[Tuple[str, str], _LocalStage] = {}
+        keys: List[Tuple[str, str]] = []
+        last_use: Dict[Tuple[str, str], int] = {}
+        for i, (text, language) in enumerate(zip(texts, languages)):
+            key = (normalize_hinglish_terms(text), language)
+            if key not in stages:
+                stages[key] = self._local_stage(text)
+            keys.append(key)
+            last_use[key] = i
+        order = list(stages)
+        print(f"📦 Batch NLU: {len(texts)} inputs, {len(order)} distinct; max_concurrency={max_concurrency}")
+
+        limiter = TokenBucket(requests_per_second) if requests_per_second else None
+
+        def _run(key: Tuple[str, str]) -> NLUResult:
+            stage = stages[key]
+            if limiter is not None and stage.emergency is None:
+                limiter.acquire()
+            try:
+                return self._finish_nlu(stage, key[1])
+            except Exception as e:
+                print(f"❌ Batch NLU failed for '{stage.text}': {e}")
+                return NLUResult(original_text=stage.text, intent=HealthIntent.UNKNOWN, confidence=0.0,
+                                 entities=[], is_emergency=stage.emergency is not None,
+                                 requires_disclaimer=stage.requires_disclaimer,
+                                 language_detected=stage.detected_language)
+
+        # A dedicated pool: _finish_nlu itself submits to the shared NLU pool and waits on it
+        executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="healbee-nlu-batch")
+        futures: Dict[Tuple[str, str], Future] = {}
+        position = {key: n for n, key in enumerate(order)}
+        window = max(1, max_concurrency) * 2  # distinct inputs submitted ahead of the one being yielded
+        submitted = 0
+        try:
+            for i, key in enumerate(keys):
+                while submitted < len(order) and submitted <= position[key] + window:
+                    futures[order[submitted]] = executor.submit(_run, order[submitted])
+                    submitted += 1
+                result = futures[key].result()
+                if last_use[key] == i:
+                    del futures[key]
+                yield dataclasses.replace(result, entities=list(result.entities))
+        finally:
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _local_stage(self, transcribed_text: str) -> "_LocalStage":
+        """Everything decided without the network: normalization, safety flags, language, local intent."""
+        # Step 0: Emergency stage on the raw text, before anything else (single automaton pass, no network)
+        emergency: Optional[EmergencyMatch] = self.emergency_detector.detect(transcribed_text)
+
+        transcribed_text = normalize_hinglish_terms(transcribed_text)
+        print(f"🧠 Processing NLU for: '{transcribed_text}'")
 
-        # Step 3: Language detection refinement
+        # Step 1: Local checks first (no network): safety, Hinglish pre-check, language
+        if emergency is None:
+            # Romanized variants (e.g. "seene mein dard") only match once normalized
+            emergency = self.emergency_detector.detect(transcribed_text)
+        requires_disclaimer = self._requires_medical_disclaimer(transcribed_text)
         detected_language = self._detect_language(transcribed_text)
 
+        known_intent = None
+        if emergency is None:
+            # Step 2: Local intent (Hinglish pre-check, then the n-gram model); a confident answer saves the LLM intent call
+            # Text is already normalized; don't normalize again
+            if self.get_intent(transcribed_text, is_normalized=True) == HealthIntent.SYMPTOM_QUERY:
+                known_intent = (HealthIntent.SYMPTOM_QUERY, 1.0)
+            else:
+                known_intent = self._local_intent(transcribed_text)
+
+        return _LocalStage(text=transcribed_text, emergency=emergency, requires_disclaimer=requires_disclaimer,
+                           detected_language=detected_language, known_intent=known_intent)
+
+    def _finish_nlu(self, stage: "_LocalStage", source_language: str) -> NLUResult:
+        """Run whatever the local stage left open (the Sarvam-M steps) and build the NLUResult."""
+        if stage.emergency is not None:
+            return self._nlu_result(stage, *self._emergency_outcome(stage))
+        # Step 3: Remaining LLM work (intent + entities), fanned out on the shared pool
+        return self._nlu_result(stage, *self._run_llm_steps(stage.text, source_language, known_intent=stage.known_intent))
+
+    async def process_transcription_async(self, transcribed_text: str, source_language: str = "hi-IN") -> NLUResult:
+        """asyncio version of process_transcription: the Sarvam-M steps run as coroutines on the event loop."""
+        stage = self._local_stage(transcribed_text)
+        if stage.emergency is not None:
+            return self._nlu_result(stage, *self._emergency_outcome(stage))
+        return self._nlu_result(stage, *await self._run_llm_steps_async(stage.text, source_language, stage.known_intent))
+
+    def _emergency_outcome(self, stage: "_LocalStage") -> Tuple[HealthIntent, float, List[MedicalEntity]]:
+        # Emergency fast path: the outcome is already decided, so don't wait on the LLM
+        print(f"🚨 Emergency keyword '{stage.emergency.keyword}' ({stage.emergency.language}); skipping LLM intent/entity calls.")
+        return HealthIntent.EMERGENCY, 1.0, self._augment_and_correct_entities(stage.text, [])
+
+    def _nlu_result(self, stage: "_LocalStage", intent: HealthIntent, intent_confidence: float,
+                    entities: List[MedicalEntity]) -> NLUResult:
+        is_emergency = stage.emergency is not None
         result = NLUResult(
-            original_text=transcribed_text,
+            original_text=stage.text,
             intent=intent,
             confidence=intent_confidence,
             entities=entities,
             is_emergency=is_emergency,
-            requires_disclaimer=requires_disclaimer,
-            language_detected=detected_language
+            requires_disclaimer=stage.requires_disclaimer,
+            language_detected=stage.detected_language
         )
 
         print(f"✅ NLU Result - Intent: {intent.value}, Confidence: {intent_confidence:.2%}")
-        print(f"🚨 Emergency: {is_emergency}, Disclaimer: {requires_disclaimer}")
+        print(f"🚨 Emergency: {is_emergency}, Disclaimer: {stage.requires_disclaimer}")
 
         return result
 
-    def _detect_emergency(self, text: str, language: str) -> bool:
-        """Detect emergency situations"""
-        text_lower = text.lower()
-
-        lang_code = language.split('-')[0] if '-' in language else language
+    def _local_intent(self, text: str) -> Optional[Tuple[HealthIntent, float]]:
+        """
+        Intent from the local n-gram model if it clears local_intent_threshold, else None.
+        "unknown" (greetings, appointments, chit-chat) is never accepted: Sarvam-M still
+        classifies those, since a confident miss would pin the turn to UNKNOWN.
+        """
+        if self.local_intent_classifier is None or self.local_intent_threshold is None:
+            return None
+        label, confidence = self.local_intent_classifier.predict(text)
+        if label == "unknown" or confidence < self.local_intent_threshold:
+            return None
+        print(f"⚡ Local intent model: {label} ({confidence:.0%}); skipping Sarvam-M intent call.")
+        return self._intent_from_result({"intent": label, "confidence": confidence}, text)
+
+    def _run_llm_steps(self, text: str, language: str,
+                       known_intent: Optional[Tuple[HealthIntent, float]] = None) -> Tuple[HealthIntent, float, List[MedicalEntity]]:
+        """
+        Run the network-bound NLU steps concurrently on the shared pool and join the results.
+        Intent classification and entity extraction are independent, so the turn waits for
+        max(intent, entities) rather than their sum. With known_intent only entities are fetched.
+        A step that overruns step_timeout is cancelled and replaced by its fallback
+        (UNKNOWN intent / keyword-only entities).
+        """
+        executor = _get_nlu_executor()
+        deadline = time.monotonic() + self.step_timeout
 
-        # Safely get default English keywords
-        default_emergency_words = self.emergency_keywords.get('en', [])
-        # Get language-specific keywords, falling back to default (English) ones
-        emergency_words = self.emergency_keywords.get(lang_code, default_emergency_words)
+        if self.combined_nlu and known_intent is None:
+            combined = self._await_step(
+                executor.submit(self._classify_and_extract, text, language), "Combined NLU", deadline, None
+            )
+            if combined is not None:
+                self._log_llm_intent(text, language, combined[0], combined[1])
+                return combined
+            deadline = time.monotonic() + self.step_timeout
+
+        intent_future = None if known_intent else executor.submit(self._classify_intent, text, language)
+        entities_future = executor.submit(self._extract_medical_entities, text, language)
+
+        intent, intent_confidence = known_intent or (HealthIntent.UNKNOWN, 0.5)
+        if intent_future is not None:
+            intent, intent_confidence = self._await_step(
+                intent_future, "Intent classification", deadline, (HealthIntent.UNKNOWN, 0.5)
+            )
+            self._log_llm_intent(text, language, intent, intent_confidence)
+        entities = self._await_step(entities_future, "Entity extraction", deadline, None)
+        if entities is None:
+            entities = self._augment_and_correct_entities(text, [])
+        return intent, intent_confidence, entities
+
+    async def _run_llm_steps_async(self, text: str, language: str,
+                                   known_intent: Optional[Tuple[HealthIntent, float]] = None) -> Tuple[HealthIntent, float, List[MedicalEntity]]:
+        """asyncio version of _run_llm_steps: the steps are gathered on the event loop instead of the thread pool."""
+        if self.combined_nlu and known_intent is None:
+            combined = await self._await_step_async(
+                self._run_step_async("combined", text, language), "Combined NLU", self.step_timeout, None
+            )
+            if combined is not None:
+                self._log_llm_intent(text, language, combined[0], combined[1])
+                return combined
+
+        steps = [self._await_step_async(self._run_step_async("entities", text, language), "Entity extraction",
+                                        self.step_timeout, None)]
+        if known_intent is None:
+            steps.append(self._await_step_async(self._run_step_async("intent", text, language), "Intent classification",
+                                                self.step_timeout, (HealthIntent.UNKNOWN, 0.5)))
+        entities, *intent_result = await asyncio.gather(*steps)
+
+        intent, intent_confidence = known_intent or intent_result[0]
+        if known_intent is None:
+            self._log_llm_intent(text, language, intent, intent_confidence)
+        if entities is None:
+            entities = self._augment_and_correct_entities(text, [])
+        return intent, intent_confidence, entities
+
+    async def _await_step_async(self, coro, step_name: str, timeout: float, fallback):
+        """Await an NLU step for at most timeout seconds; return fallback on timeout or error."""
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️ {step_name} exceeded {self.step_timeout:.0f}s; using fallback.")
+        except Exception as e:
+            print(f"⚠️ {step_name} failed: {e}")
+        return fallback
 
-        # If no keywords are available (neither for the specific language nor for English fallback),
-        # then no detection can occur.
-        if not emergency_words:
-            return False
+    def _log_llm_intent(self, text: str, language: str, intent: HealthIntent, confidence: float) -> None:
+        """Record an LLM-labelled query for retraining the local model (only when HEALBEE_INTENT_LOG is set)."""
+        if self.intent_log_path and intent != HealthIntent.UNKNOWN:
+            log_intent_example(self.intent_log_path, text, intent.value, confidence, language)
 
-        for keyword in emergency_words:
-            if keyword.lower() in text_lower: # Ensure keyword itself is also lowercased for comparison
-                return True
+    def _await_step(self, future: Future, step_name: str, deadline: float, fallback):
+        """Wait for a pooled NLU step until the deadline; cancel it and return fallback on timeout or error."""
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeoutError:
+            future.cancel()
+            print(f"⏱️ {step_name} exceeded {self.step_timeout:.0f}s; using fallback.")
+        except Exception as e:
+            print(f"⚠️ {step_name} failed: {e}")
+        return fallback
 
-        return False
+    def _detect_emergency(self, text: str, language: str) -> bool:
+        """Detect emergency situations (keywords of all languages are checked, whatever `language` is)"""
+        return self.emergency_detector.detect(text) is not None
 
     def _requires_medical_disclaimer(self, text: str) -> bool:
         """Check if query requires medical disclaimer"""
@@ -299,78 +868,81 @@ class SarvamMNLUProcessor:
 
     def _classify_intent(self, text: str, language: str) -> Tuple[HealthIntent, float]:
         """Classify intent using real Sarvam-M API"""
+        return self._run_step("intent", text, language)
 
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a healthcare intent classifier. Classify user queries into these categories:
-
-1. symptom_query - User is describing one or more physical symptoms, feelings of illness, or specific pains (e.g., 'I have a headache and fever', 'my throat hurts').
-2. disease_info - Information about diseases/conditions
-3. medication_info - Medicine-related queries
-4. wellness_tip - Health and wellness advice
-5. emergency - Urgent medical situations
-6. diagnosis_request - Seeking medical diagnosis
-7. prevention_info - Disease prevention information
-8. general_health - General health questions
-
-Respond ONLY with JSON format: {"intent": "category_name", "confidence": 0.95}"""
-            },
-            {
-                "role": "user",
-                "content": f"Classify this healthcare query: '{text}'\nLanguage: {language}"
-            }
-        ]
-
+    def _classify_and_extract(self, text: str, language: str) -> Optional[Tuple[HealthIntent, float, List[MedicalEntity]]]:
+        """
+        Classify intent and extract entities with a single Sarvam-M call.
+        Returns None if the call fails or the answer is not the expected JSON,
+        so the caller can fall back to _classify_intent + _extract_medical_entities.
+        """
+        return self._run_step("combined", text, language)
+
+    def _step_request(self, step: str, text: str, language: str) -> Tuple[List[Dict], Dict]:
+        """Messages and chat_completion params of an NLU step ("intent", "combined" or "entities")."""
+        if step == "intent":
+            system, user = _INTENT_SYSTEM_PROMPT, f"Classify this healthcare query: '{text}'\nLanguage: {language}"
+            params = {"temperature": 0.3, "max_tokens": 100}
+        elif step == "combined":
+            system, user = _COMBINED_SYSTEM_PROMPT, f"Analyze this healthcare query: '{text}'\nLanguage: {language}"
+            params = {"temperature": 0.1, "max_tokens": 300}
+        else:
+            system, user = _ENTITY_SYSTEM_PROMPT, f"Extract medical entities from: '{text}'\nLanguage: {language}"
+            params = {"temperature": 0.1, "max_tokens": 200}
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+        return messages, params
+
+    def _parse_step(self, step: str, response: Dict, text: str):
+        """Turn a chat completion into the step's result (raises on unparsable JSON)."""
+        if not response or "choices" not in response:
+            return self._step_fallback(step, text)
+        content = response["choices"][0]["message"]["content"]
+        result = json.loads(_extract_json_content(content))
+        if step == "intent":
+            return self._intent_from_result(result, text)
+        if step == "combined":
+            if not isinstance(result, dict) or "intent" not in result or not isinstance(result.get("entities"), list):
+                print("⚠️ Combined NLU answer missing 'intent' or 'entities'; falling back to separate calls.")
+                return None
+            intent, confidence = self._intent_from_result(result, text)
+            return intent, confidence, self._augment_and_correct_entities(text, self._entities_from_result(result))
+        return self._augment_and_correct_entities(text, self._entities_from_result(result))
+
+    def _step_fallback(self, step: str, text: str):
+        """Result of a failed step: UNKNOWN intent, None (combined) or keyword-only entities."""
+        if step == "intent":
+            return HealthIntent.UNKNOWN, 0.5
+        if step == "combined":
+            return None
+        return self._augment_and_correct_entities(text, [])
+
+    def _run_step(self, step: str, text: str, language: str):
+        """One NLU step over the sync client; errors give the step's fallback."""
+        messages, params = self._step_request(step, text, language)
         try:
-            print(f"🔄 Calling Sarvam-M for intent classification...")
-            response = self.sarvam_client.chat_completion(
-                messages=messages,
-                temperature=0.3,
-                max_tokens=100
-            )
-
-            if response and "choices" in response:
-                content = response["choices"][0]["message"]["content"]
-                # Clean the response to extract JSON
-                content = content.strip()
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0].strip()
-                elif '```' in content:
-                    content = content.split('```')[1].strip()
-
-                result = json.loads(content)
-
-                intent_str = result.get("intent", "unknown")
-                confidence = result.get("confidence", 0.5)
-
-                # Map to enum
-                intent_mapping = {
-                    "symptom_query": HealthIntent.SYMPTOM_QUERY,
-                    "disease_info": HealthIntent.DISEASE_INFO,
-                    "medication_info": HealthIntent.MEDICATION_INFO,
-                    "wellness_tip": HealthIntent.WELLNESS_TIP,
-                    "emergency": HealthIntent.EMERGENCY,
-                    "diagnosis_request": HealthIntent.DIAGNOSIS_REQUEST,
-                    "prevention_info": HealthIntent.PREVENTION_INFO,
-                    "general_health": HealthIntent.GENERAL_HEALTH,
-                }
-
-                intent = intent_mapping.get(intent_str, HealthIntent.UNKNOWN)
-
-                # Check for diagnosis request patterns as backup
-                if self._is_diagnosis_request(text):
-                    intent = HealthIntent.DIAGNOSIS_REQUEST
-
-                return intent, confidence
-
+            print(f"🔄 Calling Sarvam-M for {_STEP_NAMES[step]}...")
+            response = self.sarvam_client.chat_completion(messages=messages, use_cache=True,
+                                                          operation=f"nlu.{step}", **params)
+            return self._parse_step(step, response, text)
         except Exception as e:
-            print(f"⚠️ Error in intent classification: {e}")
+            print(f"⚠️ Error in {_STEP_NAMES[step]}: {e}")
+            return self._step_fallback(step, text)
 
-        return HealthIntent.UNKNOWN, 0.5
+    async def _run_step_async(self, step: str, text: str, language: str):
+        """asyncio version of _run_step."""
+        messages, params = self._step_request(step, text, language)
+        try:
+            print(f"🔄 Calling Sarvam-M for {_STEP_NAMES[step]}...")
+            response = await self.sarvam_client.chat_completion_async(messages=messages, use_cache=True,
+                                                                      operation=f"nlu.{step}", **params)
+            return self._parse_step(step, response, text)
+        except Exception as e:
+            print(f"⚠️ Error in {_STEP_NAMES[step]}: {e}")
+            return self._step_fallback(step, text)
 
-    def get_intent(self, text: str) -> HealthIntent:
-        normalized_text = normalize_hinglish_terms(text.lower())
+    def get_intent(self, text: str, is_normalized: bool = False) -> HealthIntent:
+        # Normalization is case-insensitive, so an already-normalized string can be reused as-is.
+        normalized_text = text if is_normalized else normalize_hinglish_terms(text)
         for symptom in HINGLISH_SYMPTOMS.keys():
             if symptom in normalized_text:
                 return HealthIntent.SYMPTOM_QUERY
@@ -378,93 +950,70 @@ Respond ONLY with JSON format: {"intent": "category_name", "confidence": 0.95}""
 
     def _extract_medical_entities(self, text: str, language: str) -> List[MedicalEntity]:
         """Extract medical entities using real Sarvam-M API"""
+        return self._run_step("entities", text, language)
 
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a medical entity extractor. Extract these entity types from healthcare queries:
-
-- symptoms: Detailed descriptions of physical feelings or ailments like fever, headache, cough, chest pain, sore throat, body ache, nausea, dizziness, fatigue, etc. Be specific in identifying the symptom text.
-- diseases: diabetes, hypertension, covid, etc.
-- medications: paracetamol, metformin, aspirin, etc.
-- body_parts: head, chest, stomach, heart, etc.
-- medical_terms: blood pressure, sugar level, etc.
-
-Respond ONLY with JSON format:
-{"entities": [{"text": "fever", "type": "symptom", "start": 5, "end": 10, "confidence": 0.95}]}"""
-            },
-            {
-                "role": "user",
-                "content": f"Extract medical entities from: '{text}'\nLanguage: {language}"
-            }
-        ]
-
+    def _entities_from_result(self, result: Dict) -> List[MedicalEntity]:
+        """Build MedicalEntity objects from the 'entities' list of a parsed LLM JSON answer."""
         entities = []
-
-        try:
-            print(f"🔄 Calling Sarvam-M for entity extraction...")
-            response = self.sarvam_client.chat_completion(
-                messages=messages,
-                temperature=0.1,
-                max_tokens=200
-            )
-
-            if response and "choices" in response:
-                content = response["choices"][0]["message"]["content"]
-                content = content.strip()
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0].strip()
-                elif '```' in content:
-                    content = content.split('```')[1].strip()
-                result = json.loads(content)
-                entity_list = result.get("entities", [])
-
-                for entity_data in entity_list:
-                    entity = MedicalEntity(
-                        text=entity_data.get("text", ""),
-                        entity_type=entity_data.get("type", "unknown"),
-                        confidence=entity_data.get("confidence", 0.5),
-                        start_pos=entity_data.get("start", 0),
-                        end_pos=entity_data.get("end", 0)
-                    )
-                    entities.append(entity)
-
-        except Exception as e:
-            print(f"⚠️ Error in entity extraction: {e}")
-
-        # Augment with keyword matching from symptom knowledge base
+        for entity_data in result.get("entities", []):
+            entities.append(MedicalEntity(
+                text=entity_data.get("text", ""),
+                entity_type=entity_data.get("type", "unknown"),
+                confidence=entity_data.get("confidence", 0.5),
+                start_pos=entity_data.get("start", 0),
+                end_pos=entity_data.get("end", 0)
+            ))
+        return entities
+
+    def _intent_from_result(self, result: Dict, text: str) -> Tuple[HealthIntent, float]:
+        """Map the 'intent'/'confidence' fields of a parsed LLM JSON answer to a HealthIntent."""
+        intent = INTENT_MAPPING.get(result.get("intent", "unknown"), HealthIntent.UNKNOWN)
+        confidence = result.get("confidence", 0.5)
+
+        # Check for diagnosis request patterns as backup
+        if self._is_diagnosis_request(text):
+            intent = HealthIntent.DIAGNOSIS_REQUEST
+
+        return intent, confidence
+
+    def _augment_and_correct_entities(self, text: str, entities: List[MedicalEntity]) -> List[MedicalEntity]:
+        """Add KB keyword matches the LLM missed, then spell-correct and de-duplicate entity texts."""
+        # Augment with keyword matching from symptom knowledge base (one pass over the text)
         if self.symptom_kb:
             augmented_count = 0
             text_lower = text.lower()
-            for symptom_data in self.symptom_kb:
-                keywords_to_check = [symptom_data["symptom_name"].lower()] + [kw.lower() for kw in symptom_data.get("keywords", [])]
-
-                for keyword in keywords_to_check:
-                    for match in re.finditer(re.escape(keyword), text_lower):
-                        start_pos, end_pos = match.span()
-
-                        # Check for overlap with existing LLM-found entities
-                        is_covered = False
-                        for existing_entity in entities:
-                            if existing_entity.entity_type == "symptom":
-                                # Simple overlap check: if keyword is within an existing symptom entity's text span
-                                if max(start_pos, existing_entity.start_pos) < min(end_pos, existing_entity.end_pos):
-                                    is_covered = True
-                                    break
-                                # Check if the existing entity text contains the keyword (more robust for partial matches by LLM)
-                                if keyword in existing_entity.text.lower():
-                                    is_covered = True
-                                    break
-
-                        if not is_covered:
-                            entities.append(MedicalEntity(
-                                text=text[start_pos:end_pos], # Use original casing from text
-                                entity_type="symptom",
-                                confidence=0.75, # Default confidence for keyword match
-                                start_pos=start_pos,
-                                end_pos=end_pos
-                            ))
-                            augmented_count += 1
+            # Spans and texts already claimed by symptom entities, LLM-found or added below
+            covered = IntervalSet()
+            covered_texts = []
+            for existing_entity in entities:
+                if existing_entity.entity_type == "symptom":
+                    covered.add(existing_entity.start_pos, existing_entity.end_pos)
+                    covered_texts.append(existing_entity.text.lower())
+
+            # Replay hits in KB order (symptom, keyword, position) so the same keyword wins a span as before
+            matches = sorted(self.symptom_keyword_index.iter_matches(text_lower), key=lambda m: (m[2], m[0]))
+            last_end: Dict[int, int] = {}
+            for start_pos, end_pos, rank in matches:
+                # Occurrences of one keyword don't overlap each other (re.finditer semantics)
+                if start_pos < last_end.get(rank, 0):
+                    continue
+                last_end[rank] = end_pos
+                keyword = text_lower[start_pos:end_pos]
+
+                # Skip if the span overlaps an existing symptom, or an existing symptom's text contains the keyword
+                if covered.overlaps(start_pos, end_pos) or any(keyword in t for t in covered_texts):
+                    continue
+
+                entities.append(MedicalEntity(
+                    text=text[start_pos:end_pos], # Use original casing from text
+                    entity_type="symptom",
+                    confidence=0.75, # Default confidence for keyword match
+                    start_pos=start_pos,
+                    end_pos=end_pos
+                ))
+                covered.add(start_pos, end_pos)
+                covered_texts.append(text[start_pos:end_pos].lower())
+                augmented_count += 1
             if augmented_count > 0:
                 print(f"ℹ️ Augmented entities with {augmented_count} symptoms from keyword matching.")
         # Apply spelling and phonetic correction to entity texts
@@ -493,22 +1042,8 @@ Respond ONLY with JSON format:
         return False
 
     def _detect_language(self, text: str) -> str:
-        """Detect language of the text"""
-        # Simplified language detection
-        # In practice, use Sarvam-M's language detection capabilities
-
-        hindi_chars = bool(re.search(r'[\u0900-\u097F]', text))
-        tamil_chars = bool(re.search(r'[\u0B80-\u0BFF]', text))
-        telugu_chars = bool(re.search(r'[\u0C00-\u0C7F]', text))
-
-        if hindi_chars:
-            return "hi-IN"
-        elif tamil_chars:
-            return "ta-IN"
-        elif telugu_chars:
-            return "te-IN"
-        else:
-            return "en-IN"
+        """Detect language of the text (offline script + n-gram identification)"""
+        return detect_language(text)
 
 # Integration with audio capture
 def integrate_stt_nlu_pipeline():
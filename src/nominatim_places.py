@@ -9,6 +9,8 @@ from typing import List, Dict, Any, Optional, Tuple
 
 import requests
 
+from src.instrumentation import instrument
+
 NOMINATIM_BASE = "https://nominatim.openstreetmap.org"
 OVERPASS_BASE = "https://overpass-api.de/api/interpreter"
 HEADERS = {"User-Agent": "HealBee/1.0 (health app; nominatim usage)"}
@@ -44,12 +46,14 @@ DEFAULT_SEARCH_HINTS = ["hospital", "clinic"]
 def _search(q: str, limit: int = 10) -> List[Dict[str, Any]]:
     """Run a single Nominatim search. Returns [] on error."""
     try:
-        r = requests.get(
-            f"{NOMINATIM_BASE}/search",
-            params={"q": q, "format": "json", "limit": limit},
-            headers=HEADERS,
-            timeout=15,
-        )
+        with instrument("nominatim", "search") as span:
+            r = requests.get(
+                f"{NOMINATIM_BASE}/search",
+                params={"q": q, "format": "json", "limit": limit},
+                headers=HEADERS,
+                timeout=15,
+            )
+            span.observe(r)
         r.raise_for_status()
         data = r.json()
         return data if isinstance(data, list) else []
@@ -95,12 +99,14 @@ def _overpass_health_near(lat: float, lon: float, radius_m: int = 8000, limit: i
         );
         out center body;
         """
-        r = requests.post(
-            OVERPASS_BASE,
-            data={"data": query},
-            headers=HEADERS,
-            timeout=30,
-        )
+        with instrument("overpass", "health_near") as span:
+            r = requests.post(
+                OVERPASS_BASE,
+                data={"data": query},
+                headers=HEADERS,
+                timeout=30,
+            )
+            span.observe(r)
         r.raise_for_status()
         data = r.json()
         elements = data.get("elements") or []
@@ -243,12 +249,14 @@ def search_nearby_by_gps(
         );
         out center body;
         """
-        r = requests.post(
-            OVERPASS_BASE,
-            data={"data": query},
-            headers=HEADERS,
-            timeout=30,
-        )
+        with instrument("overpass", "nearby_by_gps") as span:
+            r = requests.post(
+                OVERPASS_BASE,
+                data={"data": query},
+                headers=HEADERS,
+                timeout=30,
+            )
+            span.observe(r)
         r.raise_for_status()
         data = r.json()
         elements = data.get("elements") or []
@@ -1,3 +1,7 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
+
 HEALTHCARE_SYSTEM_PROMPT = """
 # SYSTEM PROMPT: HealBee AI Healthcare Information Assistant
 
@@ -476,3 +480,76 @@ Not like: a casual chatbot; a translator with memory loss; a greeting loop.
 
 The CURRENT USER CONTEXT block (if any) appears below. Use only the fields that are present.
 """
+
+
+# --- Intent-scoped system prompts --------------------------------------------------------------
+# HEALTHCARE_SYSTEM_PROMPT is split at its numbered headings; each turn gets the shared core plus
+# only the modules its intent and session context need. Sections keep their original numbering
+# and order, so cross-references ("Section 3.3") stay valid and all modules together give back
+# the full prompt.
+
+_SECTION_HEADING = re.compile(r"^#{2,3} (\d+(?:\.\d+)?)\.? ", re.M)
+
+PROMPT_MODULES: Dict[str, Tuple[str, ...]] = {
+    # Persona, language, safety protocols, response guidelines, hard constraints, parity rules
+    "core": ("", "1", "2", "3", "3.1", "3.2", "3.3", "3.4", "3.5", "4", "5", "6.5", "6.7",
+             "10", "10.1", "10.3", "11", "11.1", "11.6", "11.7", "11.8"),
+    # How to use profile / memory / journal context (age matrix, pregnancy)
+    "continuity": ("6", "6.1", "6.2", "6.3", "6.4", "6.6", "6.8"),
+    # Multi-turn rules: no repeated questions, no greeting mid-chat
+    "conversation": ("7", "7.1", "7.2", "7.3", "7.4", "7.5", "7.6", "7.7", "7.8"),
+    # Structured clinical interview and cumulative symptom handling
+    "symptom": ("8", "8.1", "8.2", "8.3", "8.4", "8.5", "8.6", "8.7",
+                "9", "9.1", "9.2", "9.3", "9.4", "9.5", "9.6", "9.7", "11.3", "11.4", "11.5"),
+    # Nearby hospital / clinic list format
+    "nearby": ("10.2", "10.4", "11.2"),
+}
+
+SYMPTOM_INTENTS = frozenset({"symptom_query", "diagnosis_request"})
+
+# Session-context features build_system_prompt understands
+PROMPT_FEATURES = frozenset({"prior_context", "user_context", "symptoms", "journal", "nearby", "reminder"})
+
+
+def _split_prompt(prompt: str) -> Dict[str, str]:
+    """Section number -> text (a "##" section holds only its intro); "" is the title block."""
+    starts = [(m.start(), m.group(1)) for m in _SECTION_HEADING.finditer(prompt)]
+    sections = {"": prompt[:starts[0][0]] if starts else prompt}
+    for (start, number), (end, _) in zip(starts, starts[1:] + [(len(prompt), None)]):
+        sections[number] = prompt[start:end]
+    return sections
+
+
+_PROMPT_SECTIONS = _split_prompt(HEALTHCARE_SYSTEM_PROMPT)
+_SECTION_ORDER = {number: i for i, number in enumerate(_PROMPT_SECTIONS)}
+
+
+def select_prompt_modules(intent: str, features: FrozenSet[str] = frozenset()) -> Tuple[str, ...]:
+    """
+    Modules a turn needs. intent is a HealthIntent value; features are the session-context
+    features present (see PROMPT_FEATURES). A reminder acknowledgement needs no module beyond
+    core: the instruction travels in the user message.
+    """
+    modules = ["core"]
+    if features & {"user_context", "journal"}:
+        modules.append("continuity")
+    if "prior_context" in features or intent in SYMPTOM_INTENTS:
+        modules.append("conversation")
+    if "nearby" in features:
+        # A nearby-places turn is a lookup: list the places, no symptom interview
+        modules.append("nearby")
+    elif intent in SYMPTOM_INTENTS or "symptoms" in features:
+        modules.append("symptom")
+    return tuple(modules)
+
+
+@lru_cache(maxsize=64)
+def assemble_system_prompt(modules: Tuple[str, ...]) -> str:
+    """Concatenate the sections of modules in their original order (memoized per module set)."""
+    numbers = {number for module in modules for number in PROMPT_MODULES[module]}
+    return "".join(_PROMPT_SECTIONS[n] for n in sorted(numbers, key=_SECTION_ORDER.__getitem__))
+
+
+def build_system_prompt(intent: str, features: FrozenSet[str] = frozenset()) -> str:
+    """Compact system prompt for one turn (see select_prompt_modules)."""
+    return assemble_system_prompt(select_prompt_modules(intent, features))
@@ -0,0 +1,152 @@
+"""
+Client-side rate limiting for outbound Sarvam calls.
+
+TokenBucket allows `rate` acquisitions per second with bursts of up to `capacity`.
+acquire() blocks (queues) until a token is available instead of failing; waiters are
+served in arrival order. EndpointRateLimiter keeps one bucket per Sarvam endpoint
+(chat, translate, tts, stt) and reports queue depth and wait times.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Requests per second allowed per endpoint (0 disables limiting for that endpoint)
+ENDPOINT_BUDGETS: Dict[str, float] = {
+    "chat": float(os.getenv("HEALBEE_RATE_CHAT", "5")),
+    "translate": float(os.getenv("HEALBEE_RATE_TRANSLATE", "10")),
+    "tts": float(os.getenv("HEALBEE_RATE_TTS", "5")),
+    "stt": float(os.getenv("HEALBEE_RATE_STT", "5")),
+}
+
+
+class TokenBucket:
+    """Thread-safe blocking token bucket."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second (> 0)
+            capacity: Maximum burst size
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waits = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now; never blocks."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.acquired += 1
+                return True
+            return False
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens now (the balance may go negative) and return how long the caller must wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            # Reserving up front serves waiters in arrival order
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.acquired += 1
+            if wait > 0:
+                self.waits += 1
+                self.waiting += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def _done_waiting(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until tokens are available and take them. Returns the seconds waited."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._done_waiting()
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """asyncio version of acquire (sleeps without blocking the event loop)."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting()
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget, current queue depth and wait-time counters."""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "queue_depth": self.waiting,
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "total_wait_s": self.total_wait,
+                "max_wait_s": self.max_wait,
+                "avg_wait_s": self.total_wait / self.acquired if self.acquired else 0.0,
+            }
+
+
+class EndpointRateLimiter:
+    """One TokenBucket per endpoint name; endpoints without a budget are not limited."""
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            budgets: Endpoint name -> requests per second (burst of the same size); default ENDPOINT_BUDGETS
+        """
+        budgets = ENDPOINT_BUDGETS if budgets is None else budgets
+        self.buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(rate, capacity=rate) for name, rate in budgets.items() if rate > 0
+        }
+
+    def acquire(self, endpoint: str) -> float:
+        """Queue for a slot on endpoint; returns the seconds waited."""
+        bucket = self.buckets.get(endpoint)
+        return bucket.acquire() if bucket is not None else 0.0
+
+    async def acquire_async(self, endpoint: str) -> float:
+        bucket = self.buckets.get(endpoint)
+        return await bucket.acquire_async() if bucket is not None else 0.0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint TokenBucket.stats()."""
+        return {name: bucket.stats() for name, bucket in self.buckets.items()}
+
+
+_rate_limiter: Optional[EndpointRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> EndpointRateLimiter:
+    """Process-wide limiter shared by the sync and async transports."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = EndpointRateLimiter()
+    return _rate_limiter
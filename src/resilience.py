@@ -0,0 +1,316 @@
+"""
+Hedged requests and circuit breaking for outbound Sarvam calls.
+
+ResilientCaller wraps one endpoint:
+- Hedging: if the first attempt has not answered by the hedge deadline (a percentile of
+  recent successful latencies, or HEALBEE_HEDGE_DELAY until enough samples exist), a
+  duplicate attempt is started and the first successful answer wins.
+- Circuit breaker: after HEALBEE_BREAKER_FAILURES consecutive failed calls the breaker
+  opens and calls fail fast with CircuitOpenError. After HEALBEE_BREAKER_RESET seconds a
+  single half-open probe is let through; its success closes the breaker, its failure
+  re-opens it.
+
+Only outages count as failures (connection errors, timeouts, 429 and 5xx); a 4xx answer
+means the service is up. stats() / resilience_metrics() export success, hedge-win and
+trip counts.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.instrumentation import Span, attempt_span, current_span, new_attempt_span
+
+HEDGE_PERCENTILE = float(os.getenv("HEALBEE_HEDGE_PERCENTILE", "95"))
+HEDGE_DELAY = float(os.getenv("HEALBEE_HEDGE_DELAY", "5"))
+BREAKER_FAILURES = int(os.getenv("HEALBEE_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("HEALBEE_BREAKER_RESET", "30"))
+
+# Successful latencies kept per endpoint, and how many are needed before the percentile is trusted
+_LATENCY_WINDOW = 200
+_MIN_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+def is_outage(exc: BaseException) -> bool:
+    """True for errors that say the service is unhealthy (no response, 429 or 5xx)."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed / open."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a half-open probe
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (admits a single probe when half-open)."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                print("✅ Circuit breaker closed: endpoint recovered")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    print(f"🚨 Circuit breaker open after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot whose outcome says nothing about the endpoint."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class ResilientCaller:
+    """Hedging + circuit breaker + metrics for one endpoint."""
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None,
+                 hedge_percentile: float = HEDGE_PERCENTILE, hedge_delay: float = HEDGE_DELAY,
+                 is_failure: Callable[[BaseException], bool] = is_outage):
+        """
+        Args:
+            name: Endpoint name used in logs and metrics
+            breaker: Circuit breaker (default: one with the env-configured thresholds)
+            hedge_percentile: Latency percentile after which a hedge is sent (0 disables hedging)
+            hedge_delay: Hedge deadline in seconds until enough latencies were observed
+            is_failure: Which exceptions count against the breaker
+        """
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.is_failure = is_failure
+        self._latencies: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_deadline(self) -> Optional[float]:
+        """Seconds to wait for the first attempt before hedging (None = never hedge)."""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            if len(self._latencies) < _MIN_SAMPLES:
+                return self.hedge_delay
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+        with self._lock:
+            self.calls += 1
+
+    def _hedged(self, deadline: float) -> None:
+        with self._lock:
+            self.hedges += 1
+        print(f"⏱️ {self.name} slower than {deadline:.1f}s, sending hedged request")
+
+    def _succeeded(self, latency: float, hedged: bool) -> None:
+        with self._lock:
+            self.successes += 1
+            self._latencies.append(latency)
+            if hedged:
+                self.hedge_wins += 1
+        self.breaker.record_success()
+
+    @staticmethod
+    def _settle(attempt: Optional[Span], hedged: bool) -> None:
+        """Merge the deciding attempt's span into the caller's span and count the hedge."""
+        span = current_span()
+        if attempt is None or span is None:
+            return
+        span.merge(attempt)
+        if hedged:
+            span.hedges += 1
+
+    def _failed(self, exc: BaseException) -> None:
+        with self._lock:
+            self.failures += 1
+        if self.is_failure(exc):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    def call(self, fn: Callable[[bool], Any]) -> Any:
+        """
+        Run fn(hedged) and return the first successful result. fn(False) is the first attempt,
+        fn(True) the hedge. Raises CircuitOpenError when the breaker is open, otherwise the
+        error of the last attempt if none succeeded.
+        """
+        self._admit()
+        deadline = self.hedge_deadline()
+        executor = _get_hedge_executor()
+        # Attempts run in the caller's context, each reporting into its own attempt span;
+        # only the attempt whose outcome is returned is merged into the caller's span
+        started: Dict[Any, bool] = {}
+        spans = {}
+
+        def _start(hedged: bool) -> None:
+            span = new_attempt_span()
+            future = executor.submit(contextvars.copy_context().run, _timed, fn, hedged, span)
+            started[future], spans[future] = hedged, span
+
+        _start(False)
+        done, _ = wait(started, timeout=deadline)
+        if not done:
+            self._hedged(deadline)
+            _start(True)
+        pending = set(started)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, latency = future.result()
+                except Exception as e:
+                    error, failed = e, future
+                    continue
+                # Losing attempt keeps running in the background; its result and span are dropped
+                self._settle(spans[future], len(started) > 1)
+                self._succeeded(latency, started[future])
+                return result
+        self._settle(spans[failed], len(started) > 1)
+        self._failed(error)
+        raise error
+
+    async def call_async(self, fn: Callable[[bool], Awaitable[Any]]) -> Any:
+        """asyncio version of call(); the losing attempt is cancelled."""
+        self._admit()
+        deadline = self.hedge_deadline()
+        started: Dict[Any, bool] = {}
+        spans = {}
+
+        def _start(hedged: bool) -> None:
+            span = new_attempt_span()
+            task = asyncio.ensure_future(_timed_async(fn, hedged, span))
+            started[task], spans[task] = hedged, span
+
+        _start(False)
+        done, _ = await asyncio.wait(started, timeout=deadline)
+        if not done:
+            self._hedged(deadline)
+            _start(True)
+        pending = set(started)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result, latency = task.result()
+                    except Exception as e:
+                        error, failed = e, task
+                        continue
+                    self._settle(spans[task], len(started) > 1)
+                    self._succeeded(latency, started[task])
+                    return result
+        finally:
+            for task in pending:
+                task.cancel()
+        self._settle(spans[failed], len(started) > 1)
+        self._failed(error)
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        """Call, success, hedge and breaker counters."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "state": self.breaker.state,
+                "trips": self.breaker.trips,
+                "rejected": self.breaker.rejected,
+            }
+
+
+def _timed(fn: Callable[[bool], Any], hedged: bool, span: Optional[Span]):
+    with attempt_span(span):
+        start = time.perf_counter()
+        return fn(hedged), time.perf_counter() - start
+
+
+async def _timed_async(fn: Callable[[bool], Awaitable[Any]], hedged: bool, span: Optional[Span]):
+    with attempt_span(span):
+        start = time.perf_counter()
+        return await fn(hedged), time.perf_counter() - start
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_callers: Dict[str, ResilientCaller] = {}
+_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="healbee-hedge")
+    return _hedge_executor
+
+
+def get_resilient_caller(endpoint: str) -> ResilientCaller:
+    """Process-wide ResilientCaller per endpoint (one breaker shared by every client)."""
+    caller = _callers.get(endpoint)
+    if caller is None:
+        with _lock:
+            caller = _callers.setdefault(endpoint, ResilientCaller(endpoint))
+    return caller
+
+
+def resilience_metrics() -> Dict[str, Dict[str, Any]]:
+    """stats() of every endpoint that has been called through a ResilientCaller."""
+    return {name: caller.stats() for name, caller in list(_callers.items())}
@@ -1,7 +1,14 @@
-from typing import Optional, Dict, List, Any
+import os
+from typing import Optional, Dict, Iterator, List, Any
 
+from src.context_packer import PROMPT_TOKEN_BUDGET, ContextSection, estimate_tokens, pack_sections
 from src.nlu_processor import NLUResult, HealthIntent, SarvamAPIClient
-from src.prompts import HEALTHCARE_SYSTEM_PROMPT
+from src.prompts import HEALTHCARE_SYSTEM_PROMPT, build_system_prompt
+from src.emergency_detector import emergency_response
+from src.messages import get_message
+
+# Send only the system prompt modules a turn needs (0 = always the full prompt)
+COMPACT_PROMPTS = os.getenv("HEALBEE_COMPACT_PROMPTS", "1") != "0"
 
 
 def build_user_context(session_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -134,35 +141,37 @@ def user_context_to_prompt_text(user_context: Dict[str, Any]) -> str:
     return "\n".join(lines).strip()
 
 class HealBeeResponseGenerator:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        prompt_token_budget: int = PROMPT_TOKEN_BUDGET,
+        compact_prompts: bool = COMPACT_PROMPTS,
+    ):
         self.sarvam_client = SarvamAPIClient(api_key=api_key)
+        self.compact_prompts = compact_prompts
+        # Estimated tokens for system prompt + user message; session context is packed into what is left
+        self.prompt_token_budget = prompt_token_budget
+        self.last_packed_context = None
 
-    def _get_hardcoded_safety_response(self, nlu_result: NLUResult) -> Optional[str]:
+    def _get_hardcoded_safety_response(self, nlu_result: NLUResult, language: Optional[str] = None) -> Optional[str]:
         """
         Provides immediate hardcoded responses for critical safety scenarios
-        based on NLU output.
+        based on NLU output, in `language` (default: the detected language).
         """
         # Determine language for response (simplified, assumes NLU provides it or defaults)
-        lang = nlu_result.language_detected.split('-')[0] if nlu_result.language_detected else "en"
+        language = language or nlu_result.language_detected
+        lang = language.split('-')[0] if language else "en"
 
         if nlu_result.is_emergency:
-            if lang == "hi":
-                return "आपके द्वारा बताए गए लक्षण गंभीर लग रहे हैं और इसके लिए तत्काल चिकित्सा ध्यान देने की आवश्यकता हो सकती है। कृपया तुरंत डॉक्टर से सलाह लें या नजदीकी अस्पताल जाएँ। मैं आपातकालीन चिकित्सा सहायता प्रदान करने के लिए सुसज्जित नहीं हूँ।"
-            else: # Default to English
-                return "The symptoms you're describing sound serious and may require immediate medical attention. Please consult a doctor or go to the nearest hospital right away. I am not equipped to provide emergency medical assistance."
+            # Pre-localized for all supported languages (en fallback)
+            return emergency_response(lang)
 
         if nlu_result.intent == HealthIntent.DIAGNOSIS_REQUEST:
-            if lang == "hi":
-                return "मैं समझता/सकती हूँ कि आप उत्तर ढूंढ रहे हैं, लेकिन मैं मेडिकल निदान प्रदान नहीं कर सकता/सकती। किसी भी स्वास्थ्य चिंता या निदान के लिए, कृपया एक योग्य स्वास्थ्य पेशेवर से सलाह लें।"
-            else: # Default to English
-                return "I understand you're looking for answers, but I cannot provide a medical diagnosis. For any health concerns or to get a diagnosis, it's very important to consult a qualified healthcare professional."
+            return get_message("diagnosis_refusal", lang)
 
         if nlu_result.intent == HealthIntent.MEDICATION_INFO and "advice" in nlu_result.original_text.lower(): # Simple check
              # More robust check for treatment/medication advice needed in NLU
-            if lang == "hi":
-                return "मैं उपचार सलाह या विशिष्ट दवाएं सुझाने में असमर्थ हूँ। उपचार, दवाओं या अपनी स्वास्थ्य स्थिति के प्रबंधन के बारे में किसी भी प्रश्न के लिए, कृपया अपने डॉक्टर या एक योग्य स्वास्थ्य सेवा प्रदाता से सलाह लें।"
-            else: # Default to English
-                return "I am unable to offer treatment advice or suggest specific medications. Please consult with your doctor or a qualified healthcare provider for any questions about treatments, medications, or managing your health condition."
+            return get_message("treatment_refusal", lang)
         return None
 
     def generate_response(
@@ -184,15 +193,93 @@ class HealBeeResponseGenerator:
             print("ℹ️ Applying hardcoded safety response.")
             return safety_response
 
+        messages = self._build_messages(user_query, nlu_result, session_context)
+        try:
+            llm_response_data = self.sarvam_client.chat_completion(
+                messages=messages,
+                temperature=0.5, # Adjust for desired creativity/factuality
+                max_tokens=500,  # Adjust as needed
+                operation="response"
+            )
+            return self._text_from_completion(llm_response_data, nlu_result)
+
+        except Exception as e:
+            print(f"❌ Error during LLM call: {e}")
+            return self._error_response(nlu_result)
+
+    async def generate_response_async(
+        self,
+        user_query: str,
+        nlu_result: NLUResult,
+        session_context: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """asyncio version of generate_response (same safety layers, prompt and fallbacks)."""
+        safety_response = self._get_hardcoded_safety_response(nlu_result)
+        if safety_response:
+            print("ℹ️ Applying hardcoded safety response.")
+            return safety_response
+
+        messages = self._build_messages(user_query, nlu_result, session_context)
+        try:
+            llm_response_data = await self.sarvam_client.chat_completion_async(
+                messages=messages,
+                temperature=0.5,
+                max_tokens=500,
+                operation="response"
+            )
+            return self._text_from_completion(llm_response_data, nlu_result)
+
+        except Exception as e:
+            print(f"❌ Error during LLM call: {e}")
+            return self._error_response(nlu_result)
+
+    def generate_response_stream(
+        self,
+        user_query: str,
+        nlu_result: NLUResult,
+        session_context: Optional[Dict[str, Any]] = None,
+        reply_language: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming version of generate_response: yields text chunks as Sarvam-M produces them.
+        Hardcoded safety responses and fallbacks come as a single LocalizedText chunk, written in
+        reply_language (default: the detected language) so translate_stream can pass them through.
+        """
+        safety_response = self._get_hardcoded_safety_response(nlu_result, reply_language)
+        if safety_response:
+            print("ℹ️ Applying hardcoded safety response.")
+            yield safety_response
+            return
+
+        messages = self._build_messages(user_query, nlu_result, session_context)
+        started = False
+        try:
+            for delta in self.sarvam_client.chat_completion_stream(messages=messages, temperature=0.5, max_tokens=500,
+                                                                   operation="response"):
+                if not started:
+                    delta = delta.lstrip()
+                    if not delta:
+                        continue
+                    started = True
+                yield delta
+        except Exception as e:
+            print(f"❌ Error during LLM call: {e}")
+            if not started:
+                yield self._error_response(nlu_result, reply_language)
+            return
+        if not started:
+            yield self._text_from_completion({}, nlu_result, reply_language)
+
+    def _build_messages(
+        self,
+        user_query: str,
+        nlu_result: NLUResult,
+        session_context: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, str]]:
+        """System prompt (with user context) and user message for the response LLM call."""
         # TASK 3 — Build user_context, convert to text, inject into SYSTEM prompt (not user message)
         user_context = build_user_context(session_context)
         formatted = user_context_to_prompt_text(user_context)
-        system_content = HEALTHCARE_SYSTEM_PROMPT
-        if formatted:
-            system_content += "\n\n---\n\nCURRENT USER CONTEXT (trusted information):\n\n" + formatted
-
-        # Layer 3: LLM-level response generation with system prompt including user_context
-        print(f"💬 Generating response for query: '{user_query}' using LLM.")
 
         # Conversation state: first message = no prior symptoms, follow-up answers, advice, or past messages
         has_prior_context = bool(
@@ -204,6 +291,17 @@ class HealBeeResponseGenerator:
                 or session_context.get("past_messages")
             )
         )
+        if self.compact_prompts:
+            system_content = build_system_prompt(
+                nlu_result.intent.value, self._prompt_features(session_context, bool(formatted), has_prior_context)
+            )
+        else:
+            system_content = HEALTHCARE_SYSTEM_PROMPT
+        if formatted:
+            system_content += "\n\n---\n\nCURRENT USER CONTEXT (trusted information):\n\n" + formatted
+
+        # Layer 3: LLM-level response generation with system prompt including user_context
+        print(f"💬 Generating response for query: '{user_query}' using LLM.")
         first_message_hint = "This is the FIRST message of this chat. A brief greeting is acceptable." if not has_prior_context else "This is NOT the first message. Do NOT greet (no Hello/Hi). Continue the conversation."
 
         user_content = f"User query: \"{user_query}\"\nDetected language: {nlu_result.language_detected}\nNLU Intent: {nlu_result.intent.value}\nNLU Entities: {[e.text for e in nlu_result.entities]}"
@@ -211,132 +309,181 @@ class HealBeeResponseGenerator:
         if nlu_result.intent == HealthIntent.SYMPTOM_QUERY:
             user_content += "\n\n[SYMPTOM QUERY — CUMULATIVE CONTEXT: Combine this message with ALL previously stated symptoms (see ACTIVE SYMPTOM SET). Your response MUST mention all active symptoms together and give a combined interpretation; do NOT narrow to only the latest complaint. Use entity-first thinking: extract KNOWN vs UNKNOWN; NEVER ask about KNOWN entities. Give a brief assessment and practical steps; then at most ONE follow-up about an UNKNOWN, clinically relevant entity. Do NOT ask 'How long have you had the fever?' if duration is already stated.]"
 
-        if session_context:
-            parts = []
-            # ALREADY ANSWERED — instruct LLM never to ask these again
-            already_lines = []
-            if session_context.get("extracted_symptoms"):
-                sym_list = session_context["extracted_symptoms"][:20]
-                parts.append(f"ACTIVE SYMPTOM SET (cumulative — you MUST use ALL of these in your response; do not narrow to only the latest message): {', '.join(sym_list)}")
-                parts.append(f"Previously mentioned symptoms in this session: {', '.join(sym_list)}")
-            if session_context.get("follow_up_answers"):
-                fa = session_context["follow_up_answers"][-10:]
-                parts.append("Follow-up answers from this session: " + "; ".join(
-                    f"{x.get('symptom_name', '')}: {x.get('answer', '')[:80]}" for x in fa
-                ))
-                for x in fa:
-                    q = (x.get("question") or "").strip()
-                    a = (x.get("answer") or "").strip()[:100]
-                    if q and a:
-                        already_lines.append(f"  - {q} → User already said: {a}")
-            if already_lines:
-                parts.append("ALREADY ANSWERED — DO NOT ASK AGAIN:\n" + "\n".join(already_lines))
-            if session_context.get("last_advice_given"):
-                parts.append(f"Last advice given (summary): {session_context['last_advice_given'][:400]}")
-            # User profile: for tone, follow-up relevance, continuity only; do NOT use for diagnosis or medical conclusions
-            up = session_context.get("user_profile") or {}
-            if up and any(up.get(k) for k in ("name", "age", "gender", "height_cm", "weight_kg", "location", "known_conditions", "allergies", "preferred_language")):
-                profile_parts = []
-                if up.get("name"):
-                    profile_parts.append(f"Name: {up['name']}")
-                if up.get("age") is not None:
-                    profile_parts.append(f"Age: {up['age']}")
-                if up.get("gender"):
-                    profile_parts.append(f"Gender: {up['gender']}")
-                if up.get("height_cm") is not None:
-                    profile_parts.append(f"Height: {up['height_cm']} cm")
-                if up.get("weight_kg") is not None:
-                    profile_parts.append(f"Weight: {up['weight_kg']} kg")
-                if up.get("location"):
-                    profile_parts.append(f"Location: {up['location']}")
-                if up.get("known_conditions"):
-                    profile_parts.append(f"Known conditions (user-reported): {', '.join(up['known_conditions'][:15])}")
-                if up.get("allergies"):
-                    profile_parts.append(f"Allergies (user-reported): {up['allergies'][:200]}")
-                if up.get("preferred_language"):
-                    profile_parts.append(f"Preferred language: {up['preferred_language']}")
-                if profile_parts:
-                    parts.append("[User profile – use ONLY for tone, follow-up relevance, and continuity; do NOT use for diagnosis or medical conclusions.] " + " | ".join(profile_parts))
-            # Phase C: persistent user_memory (e.g. last_symptoms, last_advice across chats)
-            um = session_context.get("user_memory") or {}
-            if um:
-                um_str = "; ".join(f"{k}: {str(v)[:200]}" for k, v in list(um.items())[:10])
-                parts.append("[User memory across chats – use ONLY for continuity, e.g. 'You previously mentioned…'; do NOT use for diagnosis.] " + um_str)
-            # Phase C: selected past messages from other chats
-            pm = session_context.get("past_messages") or []
-            if pm:
-                pm_str = " | ".join(f"{m.get('role', 'user')}: {(m.get('content') or '')[:150]}" for m in pm[:8])
-                parts.append("[Past messages from other chats – for continuity only; do not diagnose from these.] " + pm_str)
-            # Journal: entries relevant to user message (e.g. "I had this problem last week") – use to guide/respond with continuity
-            journal_entries = session_context.get("relevant_journal_entries") or []
-            if journal_entries:
-                journal_parts = []
-                for je in journal_entries[:5]:
-                    dt_str = (je.get("datetime") or "")[:19]
-                    title = (je.get("title") or "").strip()[:100]
-                    cond = (je.get("condition_summary") or je.get("content") or "").strip()[:300]
-                    exp = (je.get("user_experience") or "").strip()[:200]
-                    syms = je.get("symptoms")
-                    line = f"Date: {dt_str}; Title: {title}"
-                    if cond:
-                        line += f"; Summary: {cond}"
-                    if exp:
-                        line += f"; User experience: {exp}"
-                    if syms:
-                        line += f"; Symptoms: {', '.join(str(s) for s in syms[:10])}"
-                    journal_parts.append(line)
-                if journal_parts:
-                    parts.append("[Journal entries (from user's Health Journal, e.g. from chat or manual notes) – use to give continuity and guidance when user refers to past problems like 'last week' or 'that time'; do not diagnose from these alone.] " + " | ".join(journal_parts))
-            # Reminder set from chat: user said e.g. "Set a reminder for medicine" – we added it; ask LLM to acknowledge
-            reminder_set = session_context.get("reminder_just_set") or {}
-            if reminder_set and reminder_set.get("title"):
-                title = (reminder_set.get("title") or "").strip()[:150]
-                parts.append("[The user asked to set a reminder. We have already added it to their Reminders page. The reminder title is: \"" + title + "\". You MUST acknowledge briefly in your response that the reminder has been set and that they can view or edit it in the Reminders page. Respond in the same language as the user's query.]")
-            # Nearby hospitals/clinics: user asked for nearby places; we have results (within 10 km) from their location
-            nearby_places = session_context.get("nearby_places") or []
-            if nearby_places:
-                place_lines = []
-                for i, p in enumerate(nearby_places[:8], 1):
-                    name = (p.get("name") or "—").strip()
-                    address = (p.get("address") or "—").strip()[:200]
-                    phone = (p.get("phone") or "").strip()
-                    website = (p.get("website") or "").strip()[:80]
-                    line = f"{i}. {name} | Address: {address}"
-                    if phone:
-                        line += f" | Phone: {phone}"
-                    if website:
-                        line += f" | Website: {website}"
-                    place_lines.append(line)
-                places_text = "\n".join(place_lines)
-                parts.append("[The user asked for nearby hospitals/clinics. Here are the results (within 10 km from their location). You MUST include this list in your response in the user's language. For each place give: name, address, phone number (if available), and website (if available). Be concise and clear.]\n" + places_text)
-            if parts:
-                user_content += "\n\n[Session context – use only for continuity and follow-up, e.g. 'Last time you mentioned…'; do not diagnose from this alone.]\n" + "\n".join(parts)
+        # Fill what is left of the prompt budget with the most valuable session context
+        header = "\n\n[Session context – use only for continuity and follow-up, e.g. 'Last time you mentioned…'; do not diagnose from this alone.]\n"
+        fixed_tokens = estimate_tokens(system_content) + estimate_tokens(user_content)
+        sections = self._context_sections(session_context) if session_context else []
+        packed = pack_sections(sections, self.prompt_token_budget - fixed_tokens - estimate_tokens(header))
+        if packed.text:
+            user_content += header + packed.text
+            packed.tokens += estimate_tokens(header)
+        packed.tokens += fixed_tokens
+        self.last_packed_context = packed
+        omitted = packed.trimmed + packed.summarized + packed.dropped
+        print(f"📦 Prompt ≈ {packed.tokens} tokens (budget {self.prompt_token_budget})"
+              + (f"; trimmed/summarized/dropped: {', '.join(omitted)}" if omitted else ""))
 
         messages = [
             {"role": "system", "content": system_content},
             {"role": "user", "content": user_content},
         ]
 
-        try:
-            llm_response_data = self.sarvam_client.chat_completion(
-                messages=messages,
-                temperature=0.5, # Adjust for desired creativity/factuality
-                max_tokens=500  # Adjust as needed
-            )
+        return messages
 
-            if llm_response_data and "choices" in llm_response_data and llm_response_data["choices"]:
-                generated_text = llm_response_data["choices"][0]["message"]["content"]
-                # The system prompt instructs the LLM to include disclaimers.
-                return generated_text.strip()
-            else:
-                print("⚠️ LLM response was empty or malformed.")
-                # Fallback response if LLM fails
-                if nlu_result.language_detected.startswith("hi"):
-                    return "माफ़ कीजिए, मैं अभी आपकी मदद नहीं कर सकता। कृपया बाद में प्रयास करें।"
-                return "Sorry, I am unable to assist you at the moment. Please try again later."
+    @staticmethod
+    def _prompt_features(
+        session_context: Optional[Dict[str, Any]], has_user_context: bool, has_prior_context: bool
+    ) -> frozenset:
+        """Session-context features that select system prompt modules (see prompts.PROMPT_FEATURES)."""
+        ctx = session_context or {}
+        flags = {
+            "prior_context": has_prior_context,
+            "user_context": has_user_context,
+            "symptoms": bool(ctx.get("extracted_symptoms")),
+            "journal": bool(ctx.get("relevant_journal_entries")),
+            "nearby": bool(ctx.get("nearby_places")),
+            "reminder": bool(ctx.get("reminder_just_set")),
+        }
+        return frozenset(name for name, present in flags.items() if present)
 
-        except Exception as e:
-            print(f"❌ Error during LLM call: {e}")
-            if nlu_result.language_detected.startswith("hi"):
-                return "क्षमा करें, प्रतिक्रिया उत्पन्न करते समय एक त्रुटि हुई।"
-            return "Sorry, an error occurred while generating the response."
\ No newline at end of file
+    def _context_sections(self, session_context: Dict[str, Any]) -> List[ContextSection]:
+        """Session context as prioritized sections for the prompt packer (items most valuable first)."""
+        sections = []
+        if session_context.get("extracted_symptoms"):
+            sections.append(ContextSection(
+                "symptoms", 90, list(session_context["extracted_symptoms"][:20]), joiner=", ",
+                template="ACTIVE SYMPTOM SET (cumulative — you MUST use ALL of these in your response; do not narrow to only the latest message): {items}\nPreviously mentioned symptoms in this session: {items}",
+            ))
+        # Trimming keeps the latest answers
+        fa = (session_context.get("follow_up_answers") or [])[-10:]
+        if fa:
+            sections.append(ContextSection(
+                "follow_up_answers", 60, [f"{x.get('symptom_name', '')}: {x.get('answer', '')[:80]}" for x in fa],
+                template="Follow-up answers from this session: {items}", keep="tail",
+            ))
+            already_lines = []
+            for x in fa:
+                q = (x.get("question") or "").strip()
+                a = (x.get("answer") or "").strip()[:100]
+                if q and a:
+                    already_lines.append(f"  - {q} → User already said: {a}")
+            if already_lines:
+                sections.append(ContextSection(
+                    "already_answered", 85, already_lines, joiner="\n", keep="tail",
+                    template="ALREADY ANSWERED — DO NOT ASK AGAIN:\n{items}",
+                ))
+        if session_context.get("last_advice_given"):
+            advice = session_context["last_advice_given"]
+            sections.append(ContextSection(
+                "last_advice", 70, [advice[:400]], template="Last advice given (summary): {items}",
+                summary=f"Last advice given (summary): {advice[:120]}",
+            ))
+        # User profile: for tone, follow-up relevance, continuity only; do NOT use for diagnosis or medical conclusions
+        up = session_context.get("user_profile") or {}
+        if up and any(up.get(k) for k in ("name", "age", "gender", "height_cm", "weight_kg", "location", "known_conditions", "allergies", "preferred_language")):
+            profile_parts = []
+            if up.get("name"):
+                profile_parts.append(f"Name: {up['name']}")
+            if up.get("age") is not None:
+                profile_parts.append(f"Age: {up['age']}")
+            if up.get("gender"):
+                profile_parts.append(f"Gender: {up['gender']}")
+            if up.get("height_cm") is not None:
+                profile_parts.append(f"Height: {up['height_cm']} cm")
+            if up.get("weight_kg") is not None:
+                profile_parts.append(f"Weight: {up['weight_kg']} kg")
+            if up.get("location"):
+                profile_parts.append(f"Location: {up['location']}")
+            if up.get("known_conditions"):
+                profile_parts.append(f"Known conditions (user-reported): {', '.join(up['known_conditions'][:15])}")
+            if up.get("allergies"):
+                profile_parts.append(f"Allergies (user-reported): {up['allergies'][:200]}")
+            if up.get("preferred_language"):
+                profile_parts.append(f"Preferred language: {up['preferred_language']}")
+            if profile_parts:
+                sections.append(ContextSection(
+                    "profile", 65, profile_parts, joiner=" | ",
+                    template="[User profile – use ONLY for tone, follow-up relevance, and continuity; do NOT use for diagnosis or medical conclusions.] {items}",
+                ))
+        # Phase C: persistent user_memory (e.g. last_symptoms, last_advice across chats)
+        um = session_context.get("user_memory") or {}
+        if um:
+            sections.append(ContextSection(
+                "user_memory", 40, [f"{k}: {str(v)[:200]}" for k, v in list(um.items())[:10]],
+                template="[User memory across chats – use ONLY for continuity, e.g. 'You previously mentioned…'; do NOT use for diagnosis.] {items}",
+            ))
+        # Phase C: selected past messages from other chats
+        pm = session_context.get("past_messages") or []
+        if pm:
+            template = "[Past messages from other chats – for continuity only; do not diagnose from these.] {items}"
+            user_lines = [(m.get("content") or "")[:60] for m in pm[:8] if (m.get("role") or "user") == "user"]
+            sections.append(ContextSection(
+                "past_messages", 30, [f"{m.get('role', 'user')}: {(m.get('content') or '')[:150]}" for m in pm[:8]],
+                template=template, joiner=" | ",
+                summary=template.format(items="user said: " + " | ".join(user_lines)) if user_lines else None,
+            ))
+        # Journal: entries relevant to user message (e.g. "I had this problem last week") – use to guide/respond with continuity
+        journal_entries = session_context.get("relevant_journal_entries") or []
+        if journal_entries:
+            journal_parts, journal_titles = [], []
+            for je in journal_entries[:5]:
+                dt_str = (je.get("datetime") or "")[:19]
+                title = (je.get("title") or "").strip()[:100]
+                cond = (je.get("condition_summary") or je.get("content") or "").strip()[:300]
+                exp = (je.get("user_experience") or "").strip()[:200]
+                syms = je.get("symptoms")
+                line = f"Date: {dt_str}; Title: {title}"
+                journal_titles.append(line)
+                if cond:
+                    line += f"; Summary: {cond}"
+                if exp:
+                    line += f"; User experience: {exp}"
+                if syms:
+                    line += f"; Symptoms: {', '.join(str(s) for s in syms[:10])}"
+                journal_parts.append(line)
+            template = "[Journal entries (from user's Health Journal, e.g. from chat or manual notes) – use to give continuity and guidance when user refers to past problems like 'last week' or 'that time'; do not diagnose from these alone.] {items}"
+            sections.append(ContextSection(
+                "journal", 50, journal_parts, template=template, joiner=" | ",
+                summary=template.format(items=" | ".join(journal_titles)),
+            ))
+        # Reminder set from chat: user said e.g. "Set a reminder for medicine" – we added it; ask LLM to acknowledge
+        reminder_set = session_context.get("reminder_just_set") or {}
+        if reminder_set and reminder_set.get("title"):
+            title = (reminder_set.get("title") or "").strip()[:150]
+            sections.append(ContextSection(
+                "reminder", 100, [title], required=True,
+                template="[The user asked to set a reminder. We have already added it to their Reminders page. The reminder title is: \"{items}\". You MUST acknowledge briefly in your response that the reminder has been set and that they can view or edit it in the Reminders page. Respond in the same language as the user's query.]",
+            ))
+        # Nearby hospitals/clinics: user asked for nearby places; we have results (within 10 km) from their location
+        nearby_places = session_context.get("nearby_places") or []
+        if nearby_places:
+            place_lines = []
+            for i, p in enumerate(nearby_places[:8], 1):
+                name = (p.get("name") or "—").strip()
+                address = (p.get("address") or "—").strip()[:200]
+                phone = (p.get("phone") or "").strip()
+                website = (p.get("website") or "").strip()[:80]
+                line = f"{i}. {name} | Address: {address}"
+                if phone:
+                    line += f" | Phone: {phone}"
+                if website:
+                    line += f" | Website: {website}"
+                place_lines.append(line)
+            sections.append(ContextSection(
+                "nearby_places", 95, place_lines, joiner="\n", required=True,
+                template="[The user asked for nearby hospitals/clinics. Here are the results (within 10 km from their location). You MUST include this list in your response in the user's language. For each place give: name, address, phone number (if available), and website (if available). Be concise and clear.]\n{items}",
+            ))
+        return sections
+
+    def _text_from_completion(self, llm_response_data: Dict, nlu_result: NLUResult,
+                              language: Optional[str] = None) -> str:
+        if llm_response_data and "choices" in llm_response_data and llm_response_data["choices"]:
+            generated_text = llm_response_data["choices"][0]["message"]["content"]
+            # The system prompt instructs the LLM to include disclaimers.
+            return generated_text.strip()
+        print("⚠️ LLM response was empty or malformed.")
+        # Fallback response if LLM fails
+        return get_message("response_unavailable", language or nlu_result.language_detected)
+
+    def _error_response(self, nlu_result: NLUResult, language: Optional[str] = None) -> str:
+        return get_message("response_error", language or nlu_result.language_detected)
@@ -2,10 +2,13 @@
 Supabase client and DB helpers for Phase C: auth + persistent chats/memory.
 Uses SUPABASE_URL and SUPABASE_ANON_KEY from env. Graceful fallback if missing or on errors.
 """
+import json
 import os
 from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 
+from src.instrumentation import Span, instrument
+
 _supabase_client = None
 
 
@@ -30,6 +33,29 @@ def is_supabase_configured() -> bool:
     return get_supabase_client() is not None
 
 
+def _observe_result(span: Span, result: Any) -> None:
+    """
+    supabase-py does not expose the HTTP response: it raises on non-2xx, so a returned result
+    is recorded as 200 (or its status_code if it has one) and sized by its serialized payload.
+    """
+    span.status = getattr(result, "status_code", None) or 200
+    if hasattr(result, "data"):
+        body = json.dumps(result.data, default=str)
+    elif hasattr(result, "model_dump_json"):
+        body = result.model_dump_json()  # auth responses (pydantic models)
+    else:
+        body = ""
+    span.response_bytes += len(body.encode("utf-8"))
+
+
+def _execute(query, operation: str):
+    """Run a PostgREST query, instrumented as supabase/<table>.<verb>."""
+    with instrument("supabase", operation) as span:
+        r = query.execute()
+        _observe_result(span, r)
+        return r
+
+
 # --- Auth (email/password only) ---
 
 def auth_sign_up(email: str, password: str) -> tuple[Optional[Dict], Optional[str]]:
@@ -38,7 +64,9 @@ def auth_sign_up(email: str, password: str) -> tuple[Optional[Dict], Optional[st
     if not sb:
         return None, "Supabase is not configured."
     try:
-        r = sb.auth.sign_up({"email": email, "password": password})
+        with instrument("supabase", "auth.sign_up") as span:
+            r = sb.auth.sign_up({"email": email, "password": password})
+            _observe_result(span, r)
         if r.session and r.user:
             return {
                 "user_id": str(r.user.id),
@@ -58,7 +86,9 @@ def auth_sign_in(email: str, password: str) -> tuple[Optional[Dict], Optional[st
     if not sb:
         return None, "Supabase is not configured."
     try:
-        r = sb.auth.sign_in_with_password({"email": email, "password": password})
+        with instrument("supabase", "auth.sign_in") as span:
+            r = sb.auth.sign_in_with_password({"email": email, "password": password})
+            _observe_result(span, r)
         if r.session and r.user:
             return {
                 "user_id": str(r.user.id),
@@ -74,7 +104,8 @@ def auth_sign_out() -> None:
     sb = get_supabase_client()
     if sb:
         try:
-            sb.auth.sign_out()
+            with instrument("supabase", "auth.sign_out") as span:
+                _observe_result(span, sb.auth.sign_out())
         except Exception:
             pass
 
@@ -103,7 +134,8 @@ def auth_set_session_from_tokens(access_token: str, refresh_token: str) -> None:
     if not sb or not access_token:
         return
     try:
-        sb.auth.set_session(access_token, refresh_token)
+        with instrument("supabase", "auth.set_session") as span:
+            _observe_result(span, sb.auth.set_session(access_token, refresh_token))
     except Exception:
         pass
 
@@ -116,7 +148,7 @@ def chats_list(user_id: str) -> List[Dict[str, Any]]:
     if not sb:
         return []
     try:
-        r = sb.table("chats").select("id, title, created_at").eq("user_id", user_id).order("created_at", desc=True).execute()
+        r = _execute(sb.table("chats").select("id, title, created_at").eq("user_id", user_id).order("created_at", desc=True), "chats.select")
         return [{"id": str(row["id"]), "title": row.get("title") or "Chat", "created_at": row.get("created_at")} for row in (r.data or [])]
     except Exception:
         return []
@@ -128,7 +160,7 @@ def chat_create(user_id: str, title: str) -> Optional[str]:
     if not sb:
         return None
     try:
-        r = sb.table("chats").insert({"user_id": user_id, "title": title[:200]}).execute()
+        r = _execute(sb.table("chats").insert({"user_id": user_id, "title": title[:200]}), "chats.insert")
         if r.data and len(r.data) > 0:
             return str(r.data[0]["id"])
         return None
@@ -141,7 +173,7 @@ def chat_update_title(chat_id: str, title: str) -> bool:
         sb = get_supabase_client()
         if not sb:
             return False
-        sb.table("chats").update({"title": title[:200]}).eq("id", chat_id).execute()
+        _execute(sb.table("chats").update({"title": title[:200]}).eq("id", chat_id), "chats.update")
         return True
     except Exception:
         return False
@@ -155,7 +187,7 @@ def messages_list(chat_id: str) -> List[Dict[str, Any]]:
     if not sb:
         return []
     try:
-        r = sb.table("messages").select("role, content, created_at").eq("chat_id", chat_id).order("created_at", desc=False).execute()
+        r = _execute(sb.table("messages").select("role, content, created_at").eq("chat_id", chat_id).order("created_at", desc=False), "messages.select")
         return [{"role": row.get("role", "user"), "content": row.get("content") or "", "created_at": row.get("created_at")} for row in (r.data or [])]
     except Exception:
         return []
@@ -166,7 +198,7 @@ def message_insert(chat_id: str, role: str, content: str) -> bool:
         sb = get_supabase_client()
         if not sb:
             return False
-        sb.table("messages").insert({"chat_id": chat_id, "role": role, "content": content}).execute()
+        _execute(sb.table("messages").insert({"chat_id": chat_id, "role": role, "content": content}), "messages.insert")
         return True
     except Exception:
         return False
@@ -180,7 +212,7 @@ def user_memory_get_all(user_id: str) -> Dict[str, str]:
     if not sb:
         return {}
     try:
-        r = sb.table("user_memory").select("key, value").eq("user_id", user_id).execute()
+        r = _execute(sb.table("user_memory").select("key, value").eq("user_id", user_id), "user_memory.select")
         return {row["key"]: row.get("value") or "" for row in (r.data or [])}
     except Exception:
         return {}
@@ -191,12 +223,12 @@ def user_memory_upsert(user_id: str, key: str, value: str) -> bool:
         sb = get_supabase_client()
         if not sb:
             return False
-        sb.table("user_memory").upsert({
+        _execute(sb.table("user_memory").upsert({
             "user_id": user_id,
             "key": key,
             "value": value[:2000],
             "updated_at": datetime.now(timezone.utc).isoformat(),
-        }, on_conflict="user_id,key").execute()
+        }, on_conflict="user_id,key"), "user_memory.upsert")
         return True
     except Exception:
         return False
@@ -210,7 +242,7 @@ def user_profile_get(user_id: str) -> Optional[Dict[str, Any]]:
     if not sb:
         return None
     try:
-        r = sb.table("user_profile").select("*").eq("user_id", user_id).execute()
+        r = _execute(sb.table("user_profile").select("*").eq("user_id", user_id), "user_profile.select")
         if r.data and len(r.data) > 0:
             row = r.data[0]
             return {
@@ -250,7 +282,7 @@ def user_profile_upsert(user_id: str, profile: Dict[str, Any]) -> bool:
             "additional_notes": (profile.get("additional_notes") or "").strip() or None,
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
-        sb.table("user_profile").upsert(payload, on_conflict="user_id").execute()
+        _execute(sb.table("user_profile").upsert(payload, on_conflict="user_id"), "user_profile.upsert")
         return True
     except Exception:
         return False
@@ -263,14 +295,14 @@ def get_recent_messages_from_other_chats(user_id: str, exclude_chat_id: str, lim
         return []
     try:
         # Get other chat ids for user
-        chats_r = sb.table("chats").select("id").eq("user_id", user_id).neq("id", exclude_chat_id).order("created_at", desc=True).limit(5).execute()
+        chats_r = _execute(sb.table("chats").select("id").eq("user_id", user_id).neq("id", exclude_chat_id).order("created_at", desc=True).limit(5), "chats.select")
         chat_ids = [c["id"] for c in (chats_r.data or [])]
         if not chat_ids:
             return []
         # Get latest messages from those chats (simple: one message per chat, latest)
         out = []
         for cid in chat_ids[:3]:
-            msg_r = sb.table("messages").select("role, content").eq("chat_id", cid).order("created_at", desc=True).limit(2).execute()
+            msg_r = _execute(sb.table("messages").select("role, content").eq("chat_id", cid).order("created_at", desc=True).limit(2), "messages.select")
             for m in (msg_r.data or []):
                 out.append({"role": m.get("role", "user"), "content": (m.get("content") or "")[:500]})
         return out[:limit]
@@ -286,7 +318,7 @@ def reminders_list(user_id: str) -> List[Dict[str, Any]]:
     if not sb:
         return []
     try:
-        r = sb.table("user_reminders").select("id, title, when_iso, note, done, created_at").eq("user_id", user_id).order("created_at", desc=True).execute()
+        r = _execute(sb.table("user_reminders").select("id, title, when_iso, note, done, created_at").eq("user_id", user_id).order("created_at", desc=True), "user_reminders.select")
         return [
             {
                 "id": str(row["id"]),
@@ -308,13 +340,13 @@ def reminder_insert(user_id: str, title: str, when_iso: str, note: str = "", don
     if not sb:
         return None
     try:
-        r = sb.table("user_reminders").insert({
+        r = _execute(sb.table("user_reminders").insert({
             "user_id": user_id,
             "title": (title or "")[:500],
             "when_iso": when_iso or "",
             "note": (note or "")[:1000],
             "done": done,
-        }).execute()
+        }), "user_reminders.insert")
         if r.data and len(r.data) > 0:
             return str(r.data[0]["id"])
         return None
@@ -339,7 +371,7 @@ def reminder_update(user_id: str, reminder_id: str, **kwargs) -> bool:
             payload["done"] = bool(kwargs["done"])
         if not payload:
             return True
-        sb.table("user_reminders").update(payload).eq("id", reminder_id).eq("user_id", user_id).execute()
+        _execute(sb.table("user_reminders").update(payload).eq("id", reminder_id).eq("user_id", user_id), "user_reminders.update")
         return True
     except Exception:
         return False
@@ -350,7 +382,7 @@ def reminder_delete(user_id: str, reminder_id: str) -> bool:
     if not sb:
         return False
     try:
-        sb.table("user_reminders").delete().eq("id", reminder_id).eq("user_id", user_id).execute()
+        _execute(sb.table("user_reminders").delete().eq("id", reminder_id).eq("user_id", user_id), "user_reminders.delete")
         return True
     except Exception:
         return False
@@ -364,7 +396,7 @@ def journal_entries_list(user_id: str) -> List[Dict[str, Any]]:
     if not sb:
         return []
     try:
-        r = sb.table("user_journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+        r = _execute(sb.table("user_journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True), "user_journal_entries.select")
         out = []
         for row in (r.data or []):
             symptoms = row.get("symptoms")
@@ -401,7 +433,7 @@ def journal_entry_insert(user_id: str, entry: Dict[str, Any]) -> Optional[str]:
             "condition_summary": (entry.get("condition_summary") or "")[:1000],
             "user_experience": (entry.get("user_experience") or "")[:1000],
         }
-        r = sb.table("user_journal_entries").insert(payload).execute()
+        r = _execute(sb.table("user_journal_entries").insert(payload), "user_journal_entries.insert")
         if r.data and len(r.data) > 0:
             return str(r.data[0]["id"])
         return None
@@ -414,7 +446,7 @@ def journal_entry_delete(user_id: str, entry_id: str) -> bool:
     if not sb:
         return False
     try:
-        sb.table("user_journal_entries").delete().eq("id", entry_id).eq("user_id", user_id).execute()
+        _execute(sb.table("user_journal_entries").delete().eq("id", entry_id).eq("user_id", user_id), "user_journal_entries.delete")
         return True
     except Exception:
         return False
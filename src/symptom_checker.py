@@ -16,6 +16,10 @@ except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from src.utils import HealBeeUtilities
 
+from src.language_id import identify_language
+from src.localized_kb import get_localized_kb
+from src.symptom_lexicon import SymptomLexicon, get_symptom_lexicon
+
 # Attempt to import NLUResult from the existing nlu_processor.
 # If running this subtask in isolation and that file isn't in the same root,
 # this import might fail. For the purpose of creating the class structure,
@@ -80,6 +84,7 @@ class SymptomChecker:
         self.sarvam_client = SarvamAPIClient(api_key=api_key)
         self.utils = HealBeeUtilities(api_key=api_key)
         self.symptom_kb: Optional[Dict[str, Dict]] = None # Stores symptom_name.lower() -> symptom_data
+        self.symptom_lexicon: Optional[SymptomLexicon] = None # Multilingual term -> KB symptom index
         self.collected_symptom_details: Dict[str, Dict[str, str]] = {} # symptom_name.lower() -> {question: answer}
         self.pending_follow_up_questions: List[Dict[str, str]] = [] # List of {"symptom_name": str, "question": str}
         if symptom_kb_path is None:
@@ -147,6 +152,7 @@ class SymptomChecker:
                 kb = json.load(f)
                 if "symptoms" in kb and isinstance(kb["symptoms"], list):
                     self.symptom_kb = {s['symptom_name'].lower(): s for s in kb['symptoms']}
+                    self.symptom_lexicon = get_symptom_lexicon(kb['symptoms'], filepath)
                     print(f"✅ Symptom knowledge base loaded successfully from {filepath}. {len(self.symptom_kb)} symptoms processed.")
                 else:
                     print(f"⚠️ Warning: 'symptoms' key not found or not a list in {filepath}. Symptom checker may not function correctly.")
@@ -172,40 +178,17 @@ class SymptomChecker:
         
         for entity in self.nlu_result.entities:
             if entity.entity_type == "symptom":
-                entity_text_lower = self.utils.translate_text_to_english(entity.text).lower()
-                # Attempt direct match with symptom_name (which are keys in self.symptom_kb)
-                if entity_text_lower in self.symptom_kb and entity_text_lower not in processed_symptom_kb_names:
-                    relevant_symptoms_data.append(self.symptom_kb[entity_text_lower])
-                    processed_symptom_kb_names.add(entity_text_lower)
-                    continue
-
-                # If no direct match on entity_text_lower as a primary key,
-                # iterate through KB to check keywords for each symptom.
-                for kb_symptom_name_lower, kb_symptom_data in self.symptom_kb.items():
-                    if kb_symptom_name_lower in processed_symptom_kb_names:
-                        continue # Already added this KB symptom
-
-                    # Check if entity_text_lower is one of the keywords for this KB symptom
-                    # Also, check if entity_text_lower contains any of the keywords or vice-versa (more flexible)
-                    # Or if the kb_symptom_name_lower itself is present in entity_text_lower
-                    # This handles cases like "terrible cough" matching "cough"
-
-                    # Check if kb_symptom_name (the key) is in entity_text_lower
-                    if kb_symptom_name_lower in entity_text_lower:
-                        relevant_symptoms_data.append(kb_symptom_data)
-                        processed_symptom_kb_names.add(kb_symptom_name_lower)
-                        break # Found match for this entity, move to next entity
-
-                    # Check keywords
-                    found_keyword_match = False
-                    for keyword in kb_symptom_data.get("keywords", []):
-                        if keyword.lower() in entity_text_lower:
-                            relevant_symptoms_data.append(kb_symptom_data)
-                            processed_symptom_kb_names.add(kb_symptom_name_lower)
-                            found_keyword_match = True
-                            break
-                    if found_keyword_match:
-                        break # Found keyword match for this entity, move to next entity
+                # Local lookup over KB names, keywords and their multilingual variants
+                kb_symptom_name_lower = self.symptom_lexicon.resolve(entity.text, processed_symptom_kb_names)
+                if kb_symptom_name_lower is None:
+                    # Last resort for unknown non-English wording: translate (cached) and look up again
+                    guess = identify_language(entity.text)
+                    if guess.language != "en-IN" or guess.romanized_hinglish:
+                        english = self.utils.translate_text_to_english(entity.text)
+                        kb_symptom_name_lower = self.symptom_lexicon.resolve(english, processed_symptom_kb_names)
+                if kb_symptom_name_lower is not None:
+                    relevant_symptoms_data.append(self.symptom_kb[kb_symptom_name_lower])
+                    processed_symptom_kb_names.add(kb_symptom_name_lower)
 
         if not relevant_symptoms_data:
             print("ℹ️ No relevant symptoms identified from NLU entities based on current KB.")
@@ -256,6 +239,13 @@ class SymptomChecker:
             return None
         return self.pending_follow_up_questions.pop(0)
 
+    def localize(self, text: str, target_lang: str) -> str:
+        '''
+        A KB question or triage point in target_lang, served from the prebuilt localized KB
+        (no network call); strings missing from it are translated live.
+        '''
+        return get_localized_kb().translate(text, target_lang, self.utils)
+
     def record_answer(self, symptom_name: str, question_asked: str, user_answer: str):
         '''
         Records the user's answer to a follow-up question.
@@ -283,6 +273,34 @@ class SymptomChecker:
             print("🚨 Error: SarvamAPIClient not available or API key missing for assessment.")
             return self.DEFAULT_ASSESSMENT_ERROR.copy()
 
+        messages = self._assessment_messages(previous_symptoms_summary)
+        try:
+            print("🔄 Calling Sarvam-M for preliminary assessment...")
+            response = self.sarvam_client.chat_completion(messages=messages, temperature=0.4, max_tokens=600,
+                                                          operation="assessment")
+        except Exception as e:
+            print(f"🚨 An unexpected error occurred during LLM call or processing: {e}")
+            return self.DEFAULT_ASSESSMENT_ERROR.copy()
+        return self._assessment_from_completion(response)
+
+    async def generate_preliminary_assessment_async(self, previous_symptoms_summary: Optional[str] = None) -> Dict[str, Any]:
+        """asyncio version of generate_preliminary_assessment (same prompt, parsing and fallbacks)."""
+        if not self.sarvam_client or not getattr(self.sarvam_client, 'api_key', None):
+            print("🚨 Error: SarvamAPIClient not available or API key missing for assessment.")
+            return self.DEFAULT_ASSESSMENT_ERROR.copy()
+
+        messages = self._assessment_messages(previous_symptoms_summary)
+        try:
+            print("🔄 Calling Sarvam-M for preliminary assessment...")
+            response = await self.sarvam_client.chat_completion_async(messages=messages, temperature=0.4, max_tokens=600,
+                                                                      operation="assessment")
+        except Exception as e:
+            print(f"🚨 An unexpected error occurred during LLM call or processing: {e}")
+            return self.DEFAULT_ASSESSMENT_ERROR.copy()
+        return self._assessment_from_completion(response)
+
+    def _assessment_messages(self, previous_symptoms_summary: Optional[str] = None) -> List[Dict[str, str]]:
+        """Prompt for the preliminary assessment: all symptoms stated so far plus this turn's follow-up answers."""
         full_symptom_description = ""
         if previous_symptoms_summary and previous_symptoms_summary.strip():
             full_symptom_description += "PREVIOUSLY STATED IN THIS CONVERSATION (you MUST include ALL of these in your assessment — do not narrow to only the latest message):\n"
@@ -312,12 +330,12 @@ Keep your language empathetic and clear. Base your entire response on ALL sympto
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": full_symptom_description}
         ]
+        return messages
 
+    def _assessment_from_completion(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate the LLM's JSON assessment and attach KB triage points (DEFAULT_ASSESSMENT_ERROR on any problem)."""
         llm_content_raw = "" # Initialize for logging in case of early failure
         try:
-            print("🔄 Calling Sarvam-M for preliminary assessment...")
-            response = self.sarvam_client.chat_completion(messages=messages, temperature=0.4, max_tokens=600)
-
             if not response or "choices" not in response or not response["choices"]:
                 print("🚨 Error: Invalid response structure from LLM.")
                 return self.DEFAULT_ASSESSMENT_ERROR.copy()
@@ -361,6 +379,63 @@ Keep your language empathetic and clear. Base your entire response on ALL sympto
 
         return llm_assessment_data
 
+
+def format_assessment(assessment: Dict[str, Any], util: HealBeeUtilities, target_lang: str) -> str:
+    """
+    Markdown of a preliminary assessment in target_lang. Every heading and value is collected
+    first; KB triage points come from the prebuilt localized KB and the rest is translated
+    in one util.translate_many() pass, instead of one serial /translate call per string.
+    """
+    next_steps = assessment.get('recommended_next_steps', 'N/A')
+    if isinstance(next_steps, list):
+        steps = list(next_steps)
+    elif isinstance(next_steps, str):
+        # Split on punctuation marks (., !, ?) followed by whitespace and bullet each sentence
+        sentences = re.split(r'(?<=[.!?])\s+', next_steps.strip())
+        steps = ['\n- '.join(sentences).strip().lstrip('- ')]
+    else:
+        steps = None
+    warnings = assessment.get('potential_warnings')
+    warnings = warnings if isinstance(warnings, list) and warnings else []
+    kb_points = assessment.get('relevant_kb_triage_points')
+    kb_points = kb_points if isinstance(kb_points, list) and kb_points else []
+    summary = assessment.get('assessment_summary', 'N/A')
+    severity = assessment.get('suggested_severity', 'N/A')
+    disclaimer = assessment.get('disclaimer', 'Always consult a doctor for medical advice.')
+
+    strings = ['Preliminary Health Assessment', 'Summary', summary, 'Suggested Severity', severity,
+               'Recommended Next Steps', *(steps if steps is not None else ['N/A']), 'Disclaimer', disclaimer]
+    if warnings:
+        strings += ['Potential Warnings', *warnings]
+    if kb_points:
+        strings += ['Relevant Triage Points from Knowledge Base', *kb_points]
+    translated = get_localized_kb().translate_many([s for s in strings if isinstance(s, str)], target_lang, util)
+
+    def t(text: Any) -> str:
+        return translated.get(text, text) if isinstance(text, str) else str(text)
+
+    out = f"<h4> {t('Preliminary Health Assessment')}:</h4>\n\n"
+    out += f"**{t('Summary')}:** {t(summary)}\n\n"
+    out += f"**{t('Suggested Severity')}:** {t(severity)}\n\n"
+    out += f"**{t('Recommended Next Steps')}:**\n"
+    if isinstance(next_steps, list):
+        for step in steps:
+            out += f"- {t(step)}\n"
+    elif steps is not None:
+        out += f"{t(steps[0])}\n"
+    else:
+        out += f"- {t('N/A')}\n"
+    if warnings:
+        out += f"\n**{t('Potential Warnings')}:**\n"
+        for warning in warnings:
+            out += f"- {t(warning)}\n"
+    if kb_points:
+        out += f"\n**{t('Relevant Triage Points from Knowledge Base')}:**\n"
+        for point in kb_points:
+            out += f"- {t(point)}\n"
+    out += f"\n\n**{t('Disclaimer')}:** {t(disclaimer)}"
+    return out
+
 # Example Usage (for testing purposes, can be removed or commented out later)
 if __name__ == '__main__':
     # Mock NLUResult for testing, ensuring it matches the more complete placeholder
@@ -0,0 +1,120 @@
+"""
+Multilingual symptom lexicon: resolves a symptom entity (in any supported language)
+to its symptom knowledge base entry with a local lookup.
+
+Every KB symptom is indexed under its name and keywords, plus
+  - native-script translations of those from the localized KB artifact
+    (python -m src.localized_kb), and
+  - the Devanagari and romanized Hindi variants in hinglish_symptoms.json (each
+    hinglish entry is attached to the KB symptom its English terms resolve to).
+
+resolve() tries an exact hit first, then the KB-order-first symptom with a term inside
+the text (one Aho-Corasick pass) — the same precedence as the old per-symptom substring
+scan. Only the KB's own English names and keywords match anywhere inside the text, as
+before. Native-script variants must be whole words there, and Latin-script variants
+(romanized Hindi, which collides with English words: "cold" in "cold hands") only
+match a whole entity. Callers translate only what the lexicon cannot resolve.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.localized_kb import KB_PATH, LocalizedKB, get_localized_kb
+from src.text_index import KeywordAutomaton, is_whole_token
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HINGLISH_SYMPTOMS_PATH = os.path.join(_PROJECT_ROOT, "src", "hinglish_symptoms.json")
+
+
+def normalize_term(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class SymptomLexicon:
+    """Term -> KB symptom index over names, keywords and their multilingual variants."""
+
+    def __init__(self, symptoms: List[Dict[str, Any]], localized: Optional[LocalizedKB] = None,
+                 hinglish: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            symptoms: KB symptom entries (symptom_knowledge_base.json "symptoms")
+            localized: Prebuilt KB translations supplying native-script variants
+            hinglish: {english symptom: [Devanagari / romanized variants]}
+        """
+        self.symptoms = {s["symptom_name"].lower(): s for s in symptoms}
+        self._keys = list(self.symptoms)
+        self._order = {key: i for i, key in enumerate(self._keys)}
+        self._exact: Dict[str, str] = {}
+        self._automaton = KeywordAutomaton()
+        for key, symptom in self.symptoms.items():
+            english = [symptom["symptom_name"]] + list(symptom.get("keywords", []))
+            self._add_terms(key, english, variant=False)
+        for key, symptom in self.symptoms.items():
+            english = [symptom["symptom_name"]] + list(symptom.get("keywords", []))
+            self._add_terms(key, [v for term in english for v in (localized.variants(term) if localized else [])])
+        for name, variants in (hinglish or {}).items():
+            terms = [name] + list(variants)
+            # The entry joins the KB symptom its name (or, failing that, any variant) resolves to
+            key = next(filter(None, (self.resolve(t) for t in terms)), None)
+            if key is None:
+                # e.g. "body ache" -> "body aches"
+                key = next((k for k in self._keys if k.startswith(normalize_term(name))), None)
+            if key is not None:
+                self._add_terms(key, terms)
+        self._automaton.build()
+
+    def _add_terms(self, key: str, terms: Iterable[str], variant: bool = True) -> None:
+        """KB terms match anywhere; native-script variants as whole words; Latin-script variants exactly."""
+        for term in terms:
+            term = normalize_term(term)
+            if term:
+                # First KB symptom to claim a term keeps it (KB order decides ties)
+                self._exact.setdefault(term, key)
+                if not variant:
+                    self._automaton.add(term, (self._order[key], False))
+                elif not term.isascii():
+                    self._automaton.add(term, (self._order[key], True))
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def resolve(self, text: str, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Lowercase KB symptom name for text (skipping exclude), or None."""
+        term = normalize_term(text)
+        if not term:
+            return None
+        exclude = set(exclude)
+        key = self._exact.get(term)
+        if key is not None and key not in exclude:
+            return key
+        ranks = [rank for start, end, (rank, whole_word) in self._automaton.iter_matches(term)
+                 if self._keys[rank] not in exclude and (not whole_word or is_whole_token(term, start, end))]
+        return self._keys[min(ranks)] if ranks else None
+
+
+def _read_hinglish(path: str) -> Dict[str, List[str]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read {path}: {e}")
+        return {}
+
+
+_lexicons: Dict[str, SymptomLexicon] = {}
+_lexicons_lock = threading.Lock()
+
+
+def get_symptom_lexicon(symptoms: List[Dict[str, Any]], kb_path: str = KB_PATH) -> SymptomLexicon:
+    """Process-wide lexicon for the KB at kb_path, built on first use (symptoms: its entries)."""
+    lexicon = _lexicons.get(kb_path)
+    if lexicon is None:
+        with _lexicons_lock:
+            lexicon = _lexicons.get(kb_path)
+            if lexicon is None:
+                lexicon = SymptomLexicon(symptoms, get_localized_kb(), _read_hinglish(HINGLISH_SYMPTOMS_PATH))
+                print(f"✅ Symptom lexicon built: {len(lexicon)} terms for {len(lexicon.symptoms)} symptoms.")
+                _lexicons[kb_path] = lexicon
+    return lexicon
@@ -0,0 +1,237 @@
+"""
+Multi-pattern text matching helpers shared by the NLU and symptom checking code.
+
+KeywordAutomaton is an Aho-Corasick automaton: every occurrence of every keyword is
+found in a single left-to-right pass over the text, so per-message cost depends on
+the text length and the number of hits, not on how many keywords are indexed.
+BKTree answers bounded edit-distance lookups for spelling correction without
+comparing the query against every dictionary term.
+"""
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def is_word_char(ch: str) -> bool:
+    """Letters, digits and combining vowel signs / viramas of Indic scripts; ZWJ / ZWNJ join too."""
+    return unicodedata.category(ch)[0] in "LMN" or ch in "\u200c\u200d"
+
+
+def is_whole_token(text: str, start: int, end: int) -> bool:
+    """True if text[start:end] is not glued to a word character on either side."""
+    if start > 0 and is_word_char(text[start - 1]) and is_word_char(text[start]):
+        return False
+    return not (end < len(text) and is_word_char(text[end]) and is_word_char(text[end - 1]))
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick keyword index. Matching is exact and case-sensitive; lowercase both
+    keywords and text if you need case-insensitive matching.
+    """
+
+    def __init__(self, keywords: Optional[Iterable[str]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [-1]      # keyword id ending at this node, or -1
+        self._dict_link: List[int] = [-1]   # nearest node on the fail chain with an output
+        self._keywords: List[str] = []
+        self._values: List[Any] = []
+        self._built = False
+        for keyword in keywords or ():
+            self.add(keyword)
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def add(self, keyword: str, value: Any = None) -> bool:
+        """
+        Register a keyword with an optional payload (defaults to the keyword itself).
+        If the keyword is already registered the first payload is kept and False is returned.
+        """
+        if not keyword:
+            return False
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._dict_link.append(-1)
+            node = nxt
+        if self._output[node] != -1:
+            return False
+        self._output[node] = len(self._keywords)
+        self._keywords.append(keyword)
+        self._values.append(keyword if value is None else value)
+        self._built = False
+        return True
+
+    def build(self) -> "KeywordAutomaton":
+        """Compute failure links (breadth-first). Called automatically before the first search."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = -1
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._dict_link[child] = fail if self._output[fail] != -1 else self._dict_link[fail]
+                queue.append(child)
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, value) for every keyword occurrence, overlapping ones included."""
+        if not self._built:
+            self.build()
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node if output[node] != -1 else dict_link[node]
+            while hit != -1:
+                keyword_id = output[hit]
+                end = i + 1
+                yield end - len(self._keywords[keyword_id]), end, self._values[keyword_id]
+                hit = dict_link[hit]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """All matches of iter_matches as a list, ordered by end position."""
+        return list(self.iter_matches(text))
+
+    def contains_any(self, text: str) -> bool:
+        """True as soon as any keyword occurs in text."""
+        return next(self.iter_matches(text), None) is not None
+
+
+class IntervalSet:
+    """Sorted, merged half-open [start, end) spans with O(log n) overlap queries."""
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if [start, end) shares at least one position with a stored span."""
+        if start >= end:
+            return False
+        i = bisect_right(self._ends, start)
+        return i < len(self._starts) and self._starts[i] < end
+
+    def add(self, start: int, end: int) -> None:
+        """Insert [start, end), merging it with any spans it overlaps or touches. Empty spans are ignored."""
+        if start >= end:
+            return
+        i = bisect_left(self._ends, start)
+        j = bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Levenshtein edit distance (insert / delete / substitute, all cost 1), computed with
+    Hyyrö's bit-parallel algorithm: one handful of integer operations per character of
+    the longer string instead of a full dynamic-programming row.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(b):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+    pv, mv, score = mask, 0, len(b)
+    for ch in a:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over a metric (Levenshtein by default). A bounded-distance lookup
+    only visits subtrees whose edge distance lies within [d - radius, d + radius], so it
+    touches a small fraction of the terms instead of scanning all of them.
+    """
+
+    def __init__(self, terms: Optional[Iterable[str]] = None, distance=levenshtein):
+        self._distance = distance
+        self._root: Optional[Tuple[str, Dict[int, Any]]] = None
+        self._size = 0
+        for term in terms or ():
+            self.add(term)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, term: str) -> None:
+        """Insert a term; duplicates are ignored."""
+        if self._root is None:
+            self._root = (term, {})
+            self._size = 1
+            return
+        node_term, children = self._root
+        while True:
+            d = self._distance(term, node_term)
+            if d == 0:
+                return
+            child = children.get(d)
+            if child is None:
+                children[d] = (term, {})
+                self._size += 1
+                return
+            node_term, children = child
+
+    def search(self, term: str, radius: int) -> List[Tuple[int, str]]:
+        """All (distance, term) pairs within radius of term, closest first."""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_term, children = stack.pop()
+            d = self._distance(term, node_term)
+            if d <= radius:
+                found.append((d, node_term))
+            for edge in range(max(1, d - radius), d + radius + 1):
+                child = children.get(edge)
+                if child is not None:
+                    stack.append(child)
+        found.sort()
+        return found
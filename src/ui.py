@@ -17,10 +17,12 @@ from datetime import datetime, timedelta
 # Adjust import paths
 try:
     from src.nlu_processor import SarvamMNLUProcessor, HealthIntent, NLUResult
+    from src.emergency_detector import emergency_response
     from src.response_generator import HealBeeResponseGenerator
-    from src.symptom_checker import SymptomChecker
+    from src.symptom_checker import SymptomChecker, format_assessment
     from src.audio_capture import AudioCleaner
     from src.utils import HealBeeUtilities, get_relevant_journal_entries
+    from src.messages import get_message
     try:
         from src.utils import detect_and_extract_reminder, detect_and_extract_journal, detect_nearby_places_request, extract_nearby_location
     except ImportError:
@@ -63,9 +65,10 @@ except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from src.nlu_processor import SarvamMNLUProcessor, HealthIntent, NLUResult
     from src.response_generator import HealBeeResponseGenerator
-    from src.symptom_checker import SymptomChecker
+    from src.symptom_checker import SymptomChecker, format_assessment
     from src.audio_capture import AudioCleaner
     from src.utils import HealBeeUtilities, get_relevant_journal_entries
+    from src.messages import get_message
     try:
         from src.utils import detect_and_extract_reminder, detect_and_extract_journal, detect_nearby_places_request, extract_nearby_location
     except ImportError:
@@ -678,7 +681,7 @@ def _leaflet_map_html(places: list, height: int = 500) -> str:
 def _get_nlu_processor(api_key: str):
     if not api_key:
         return None
-    return SarvamMNLUProcessor(api_key=api_key)
+    return SarvamMNLUProcessor(api_key=api_key, combined_nlu=True)
 
 
 @st.cache_resource
@@ -734,21 +737,22 @@ def clean_assistant_text(text: str) -> str:
     return text.strip()
 
 
-def _format_nearby_places_for_chat(places: list, translate_fn, location_name: str = "") -> str:
+def _format_nearby_places_for_chat(places: list, lang_code: str, location_name: str = "") -> str:
     """
     Format nearby hospitals/clinics as plain text for chat. No markdown, no HTML.
+    Labels come from the pre-translated message catalog (no translation calls).
     location_name: e.g. "Velachery" or "Velachery–Tambaram" for the intro line.
     """
     if not places:
-        return translate_fn("I couldn't find clinics near this area. Try a nearby locality.")
+        return get_message("nearby_none_found", lang_code)
     if location_name:
-        intro = translate_fn("Here are some clinics and hospitals near {} (within 10 km):").format(location_name)
+        intro = get_message("nearby_intro_location", lang_code, location=location_name)
     else:
-        intro = translate_fn("Here are some clinics and hospitals near you (within 10 km):")
-    label_address = translate_fn("Address")
-    label_contact = translate_fn("Contact")
-    label_website = translate_fn("Website")
-    contact_na = translate_fn("Not available")
+        intro = get_message("nearby_intro", lang_code)
+    label_address = get_message("label_address", lang_code)
+    label_contact = get_message("label_contact", lang_code)
+    label_website = get_message("label_website", lang_code)
+    contact_na = get_message("contact_not_available", lang_code)
     lines = [intro, ""]
     for i, p in enumerate(places[:8], 1):
         name = (p.get("name") or "—").strip()
@@ -761,8 +765,8 @@ def _format_nearby_places_for_chat(places: list, translate_fn, location_name: st
         if website:
             lines.append(f"   {label_website}: {website}")
         lines.append("")
-    lines.append(translate_fn("This is general information. In an emergency, go to the nearest hospital directly."))
-    lines.append(translate_fn("If you want details about any one place, just tell me the name."))
+    lines.append(get_message("nearby_disclaimer", lang_code))
+    lines.append(get_message("nearby_details_hint", lang_code))
     return "\n".join(lines).strip()
 
 
@@ -788,6 +792,24 @@ def markdown_to_html_safe(text: str) -> str:
     return s
 
 
+def stream_assistant_reply(placeholder, chunks) -> str:
+    """
+    Render an assistant reply progressively in a st.empty() placeholder as chunks arrive,
+    styled like the chat bubbles. Returns the full text; the placeholder is cleared at the end
+    because the finished message is shown by the chat pane.
+    """
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        placeholder.markdown(
+            f"<div class='healbee-msg-label'>HealBee</div>"
+            f"<div class='healbee-bubble-assistant'>{markdown_to_html_safe(clean_assistant_text(text))}▌</div>",
+            unsafe_allow_html=True,
+        )
+    placeholder.empty()
+    return text.strip()
+
+
 def strip_html_for_display(text: str) -> str:
     """
     Strip HTML tags and common entities so text is safe for chat titles and sidebar labels.
@@ -887,19 +909,17 @@ def _save_chat_to_journal(assessment: dict) -> None:
         # Store in user's chat language (any of 8)
         user_lang = st.session_state.get("current_language_code") or "en-IN"
         util = _get_utils(SARVAM_API_KEY)
+        label_experience = get_message("journal_user_experience", user_lang)
         if user_lang != "en-IN" and util:
             try:
                 title = util.translate_text(title_raw, user_lang) or title_raw
                 condition_summary = util.translate_text(condition_summary_raw, user_lang) or condition_summary_raw
-                label_experience = util.translate_text("User experience:", user_lang) or "User experience:"
             except Exception:
                 title = title_raw
                 condition_summary = condition_summary_raw
-                label_experience = "User experience:"
         else:
             title = title_raw
             condition_summary = condition_summary_raw
-            label_experience = "User experience:"
         content_parts = [condition_summary] if condition_summary else []
         if user_experience:
             content_parts.append(label_experience + " " + user_experience)
@@ -1361,6 +1381,17 @@ def main_ui():
                         if s and s not in st.session_state.extracted_symptoms:
                             st.session_state.extracted_symptoms.append(s)
 
+                    # Emergency fast path: NLU made no Sarvam calls; answer with the pre-localized message (no LLM, no translation)
+                    if nlu_output.is_emergency:
+                        emergency_msg = emergency_response(user_lang)
+                        add_message_to_conversation("assistant", emergency_msg)
+                        _persist_message_to_db("assistant", emergency_msg)
+                        st.session_state.last_advice_given = emergency_msg[:800]
+                        st.session_state.symptom_checker_active = False
+                        _save_health_context_to_memory()
+                        st.session_state.voice_input_stage = None
+                        return
+
                     # Check for reminder request first (even if NLU classified as symptom). If user clearly asks to set a reminder, handle it and skip symptom checker / LLM.
                     reminder_just_set = None
                     try:
@@ -1391,8 +1422,8 @@ def main_ui():
                         reminder_just_set = None
                     if reminder_just_set and reminder_just_set.get("title"):
                         _title = reminder_just_set["title"]
-                        fixed_msg_en = f"I've set a reminder for \"{_title}\". You can view or edit it in the Reminders page."
-                        translated_bot_response = util.translate_text(fixed_msg_en, user_lang) if user_lang != "en-IN" else fixed_msg_en
+                        # Pre-translated template: no /translate round-trip
+                        translated_bot_response = get_message("reminder_set", user_lang, title=_title)
                         add_message_to_conversation("assistant", translated_bot_response)
                         _persist_message_to_db("assistant", translated_bot_response)
                         st.session_state.last_advice_given = translated_bot_response[:800]
@@ -1428,8 +1459,7 @@ def main_ui():
                         journal_added = None
                     if journal_added and journal_added.get("title"):
                         _title = journal_added["title"]
-                        fixed_msg_en = f"I've added \"{_title}\" to your Journal. You can view or edit it on the Journal page."
-                        translated_bot_response = util.translate_text(fixed_msg_en, user_lang) if user_lang != "en-IN" else fixed_msg_en
+                        translated_bot_response = get_message("journal_added", user_lang, title=_title)
                         add_message_to_conversation("assistant", translated_bot_response)
                         _persist_message_to_db("assistant", translated_bot_response)
                         st.session_state.last_advice_given = translated_bot_response[:800]
@@ -1441,15 +1471,8 @@ def main_ui():
                     # Nearby hospitals/clinics: text-only, location from message (no GPS, no buttons)
                     if detect_nearby_places_request(user_query_text):
                         _location = extract_nearby_location(user_query_text)
-                        def _nearby_t(s: str) -> str:
-                            if user_lang == "en-IN":
-                                return s
-                            try:
-                                return util.translate_text(s, user_lang) or s
-                            except Exception:
-                                return s
                         if not _location or not _location.strip():
-                            need_area_msg = _nearby_t("I need the area name (for example: Velachery, Tambaram, Guindy) to find nearby clinics.")
+                            need_area_msg = get_message("nearby_need_area", user_lang)
                             add_message_to_conversation("assistant", need_area_msg)
                             _persist_message_to_db("assistant", need_area_msg)
                             st.session_state.last_advice_given = need_area_msg[:800]
@@ -1459,7 +1482,7 @@ def main_ui():
                             return
                         _places = search_nearby_health_places(_location.strip(), 6)
                         st.session_state.nearby_chat_results = _places
-                        nearby_response = _format_nearby_places_for_chat(_places, _nearby_t, location_name=_location.strip())
+                        nearby_response = _format_nearby_places_for_chat(_places, user_lang, location_name=_location.strip())
                         add_message_to_conversation("assistant", nearby_response)
                         _persist_message_to_db("assistant", nearby_response)
                         st.session_state.last_advice_given = nearby_response[:800]
@@ -1483,7 +1506,7 @@ def main_ui():
                         if st.session_state.pending_symptom_question_data:
                             question_to_ask_raw = st.session_state.pending_symptom_question_data['question']
                             symptom_context_raw = st.session_state.pending_symptom_question_data['symptom_name']
-                            question_to_ask_translated = util.translate_text(question_to_ask_raw, user_lang)
+                            question_to_ask_translated = st.session_state.symptom_checker_instance.localize(question_to_ask_raw, user_lang)
                             add_message_to_conversation("assistant", question_to_ask_translated)
                             _persist_message_to_db("assistant", question_to_ask_translated)
                         else:
@@ -1506,8 +1529,11 @@ def main_ui():
                                 session_context["past_messages"] = get_recent_messages_from_other_chats(uid, st.session_state.current_chat_id, limit=8)
                             except Exception:
                                 pass
-                        bot_response = response_gen.generate_response(user_query_text, nlu_output, session_context=session_context)
-                        translated_bot_response = util.translate_text(bot_response, user_lang)
+                        # Stream the answer into the placeholder as it is generated (translated sentence by sentence;
+                        # safety and fallback replies come pre-localized in user_lang and skip /translate)
+                        response_stream = response_gen.generate_response_stream(user_query_text, nlu_output, session_context=session_context,
+                                                                                reply_language=user_lang)
+                        translated_bot_response = stream_assistant_reply(spinner_placeholder, util.translate_stream(response_stream, user_lang))
                         add_message_to_conversation("assistant", translated_bot_response)
                         _persist_message_to_db("assistant", translated_bot_response)
                         st.session_state.last_advice_given = translated_bot_response[:800]
@@ -1544,7 +1570,7 @@ def main_ui():
                 if st.session_state.pending_symptom_question_data:
                     question_to_ask_raw = st.session_state.pending_symptom_question_data['question']
                     symptom_context_raw = st.session_state.pending_symptom_question_data['symptom_name']
-                    question_to_ask_translated = util.translate_text(question_to_ask_raw, user_lang)
+                    question_to_ask_translated = st.session_state.symptom_checker_instance.localize(question_to_ask_raw, user_lang)
                     add_message_to_conversation("assistant", question_to_ask_translated)
                     _persist_message_to_db("assistant", question_to_ask_translated)
                 else:
@@ -1608,34 +1634,8 @@ def main_ui():
                         if sym_name and sym_name not in st.session_state.extracted_symptoms:
                             st.session_state.extracted_symptoms.append(sym_name)
                     try:
-                        assessment_str = f"<h4> {util.translate_text('Preliminary Health Assessment', user_lang)}:</h4>\n\n"
-                        assessment_str += f"**{util.translate_text('Summary', user_lang)}:** {util.translate_text(assessment.get('assessment_summary', 'N/A'), user_lang)}\n\n"
-                        assessment_str += f"**{util.translate_text('Suggested Severity', user_lang)}:** {util.translate_text(assessment.get('suggested_severity', 'N/A'), user_lang)}\n\n"
-                        assessment_str += f"**{util.translate_text('Recommended Next Steps', user_lang)}:**\n"
-                        next_steps = assessment.get('recommended_next_steps', 'N/A')
-                        if isinstance(next_steps, list): 
-                            for step in next_steps: assessment_str += f"- {util.translate_text(step, user_lang)}\n"
-                        elif isinstance(next_steps, str): # This is the block to modify
-                            ### Replace the original problematic f-string line here
-                            # Split on punctuation marks (., !, ?) followed by whitespace
-                            sentences = re.split(r'(?<=[.!?])\s+', next_steps.strip())
-                            # Add bullet to each sentence
-                            temp_steps = '\n- '.join(sentences).strip()
-                            # remove leading bullet if present (e.g. if next_steps started with punctuation)
-                            temp_steps = temp_steps.lstrip('- ')
-                            # Append to assessment_str
-                            assessment_str += f"{util.translate_text(temp_steps, user_lang)}\n"
-                        else: 
-                            assessment_str += f"- {util.translate_text('N/A', user_lang)}\n"
-                        warnings = assessment.get('potential_warnings')
-                        if warnings and isinstance(warnings, list) and len(warnings) > 0 :
-                            assessment_str += f"\n**{util.translate_text('Potential Warnings', user_lang)}:**\n"
-                            for warning in warnings: assessment_str += f"- {util.translate_text(warning, user_lang)}\n"
-                        kb_points = assessment.get('relevant_kb_triage_points')
-                        if kb_points and isinstance(kb_points, list) and len(kb_points) > 0:
-                            assessment_str += f"\n**{util.translate_text('Relevant Triage Points from Knowledge Base', user_lang)}:**\n"
-                            for point in kb_points: assessment_str += f"- {util.translate_text(point, user_lang)}\n"
-                        assessment_str += f"\n\n**{util.translate_text('Disclaimer', user_lang)}:** {util.translate_text(assessment.get('disclaimer', 'Always consult a doctor for medical advice.'), user_lang)}"
+                        # All headings and values translated in one parallel, cached pass
+                        assessment_str = format_assessment(assessment, util, user_lang)
                         add_message_to_conversation("assistant", assessment_str)
                         _persist_message_to_db("assistant", assessment_str)
                         # Session memory: store last advice (summary for continuity)
@@ -1696,7 +1696,7 @@ def main_ui():
                         _persist_message_to_db("user", transcribed_text)
                         process_and_display_response(transcribed_text, lang_for_stt) 
                     else:
-                        add_message_to_conversation("system", "⚠️ STT failed to transcribe audio or returned empty. Please try again.")
+                        add_message_to_conversation("system", get_message("stt_failed", lang_for_stt))
                 except Exception as e:
                     st.error(f"STT Error: {e}")
                     add_message_to_conversation("system", f"Sorry, an error occurred during voice transcription. Please try again. (Details: {e})")
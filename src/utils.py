@@ -1,7 +1,10 @@
+import hashlib
 import json
+import os
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass
 import requests
 import numpy as np
@@ -9,13 +12,68 @@ import base64
 from pydub import AudioSegment
 import io
 import soundfile as sf
+from src.cache import DiskLRUCache, TwoTierCache, get_shared_cache, get_shared_disk_cache, make_cache_key
+from src.http_transport import (SARVAM_BASE_URL, AsyncSarvamTransport, SarvamTransport, get_async_transport,
+                                get_transport, httpx)
+from src.language_id import detect_language
+from src.messages import LocalizedText
+
+# Concurrent /translate calls when translating a set of strings (translate_many)
+TRANSLATE_FAN_OUT = int(os.getenv("HEALBEE_TRANSLATE_FAN_OUT", "6"))
+# Size limit of the on-disk synthesized speech cache
+TTS_CACHE_MB = float(os.getenv("HEALBEE_TTS_CACHE_MB", "256"))
+
+# A sentence ends at . ! ? or a Devanagari danda followed by whitespace, or at a line break
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?\u0964\u0965])[ \t]+|[ \t]*\n+')
+# ...unless the period belongs to a list number ("1.") or a common abbreviation
+_NOT_A_SENTENCE_END = re.compile(r'(?:\b(?:e\.g|i\.e|etc|dr|mr|mrs|ms|vs|approx|no|st)|\d)\.$', re.IGNORECASE)
+
+
+def split_completed_sentences(buffer: str) -> Tuple[List[Tuple[str, str]], str]:
+    """
+    Split streamed text into the sentences completed so far and the unfinished rest.
+    Returns ([(sentence, separator), ...], rest); the separator (spaces or line breaks)
+    is kept so the text can be reassembled with its layout.
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(buffer):
+        sentence = buffer[start:match.start()]
+        if "\n" not in match.group() and _NOT_A_SENTENCE_END.search(sentence):
+            continue
+        sentences.append((sentence, match.group()))
+        start = match.end()
+    return sentences, buffer[start:]
 
 class HealBeeUtilities:
     """Core utilities for HealBee healthcare application"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, transport: Optional[SarvamTransport] = None,
+                 async_transport: Optional[AsyncSarvamTransport] = None, base_url: Optional[str] = None,
+                 translation_cache: Optional[TwoTierCache] = None, cache_translations: bool = True,
+                 tts_cache: Optional[DiskLRUCache] = None, cache_speech: bool = True):
+        """
+        Args:
+            translation_cache: Cache for translate_text / translate_text_to_english results;
+                defaults to the shared on-disk cache (HEALBEE_CACHE_DIR/translation_cache.sqlite3)
+            cache_translations: False sends every translation to the API
+            tts_cache: Cache for synthesize_speech audio; defaults to the shared on-disk cache
+                (HEALBEE_CACHE_DIR/tts_cache/, HEALBEE_TTS_CACHE_MB)
+            cache_speech: False sends every synthesis to the API
+        """
         self.api_key = api_key
-        self.base_api_url = "https://api.sarvam.ai"
+        self.base_api_url = (base_url or SARVAM_BASE_URL).rstrip("/")
+        # Shared pooled session (keep-alive + retries) unless one is injected
+        self.transport = transport or get_transport()
+        self._async_transport = async_transport  # created on first async call
+        if translation_cache is None and cache_translations:
+            # Translations do not go stale; most traffic is repeated headings and KB questions
+            translation_cache = get_shared_cache("translation_cache", max_memory_entries=2048,
+                                                 max_disk_entries=50000, ttl_seconds=90 * 24 * 3600)
+        self.translation_cache = translation_cache if cache_translations else None
+        if tts_cache is None and cache_speech:
+            tts_cache = get_shared_disk_cache("tts_cache", max_bytes=int(TTS_CACHE_MB * 1024 * 1024), suffix=".wav")
+        self.tts_cache = tts_cache if cache_speech else None
         self._initialize_language_support()
 
     def _initialize_language_support(self):
@@ -61,6 +119,15 @@ class HealBeeUtilities:
         cleaned = re.sub(r'\s+', ' ', text)
         return cleaned.strip()  # Remove leading/trailing spaces
 
+    def _translate_payload(self, text: str, target_lang: str) -> Dict[str, str]:
+        return {
+            "input": text,
+            "target_language_code": target_lang,
+            "source_language_code": 'auto',
+            "mode": "formal",
+            "model": "mayura:v1",
+        }
+
     def translate_text(self, text: str, target_lang: str) -> str:
         """
         Translate text to target language using Sarvam-M
@@ -71,27 +138,34 @@ class HealBeeUtilities:
         if target_lang.startswith("en"):
             return text  # No translation needed for English
 
-        headers = {"api-subscription-key": self.api_key}
-        payload = {
-            "input": text,
-            "target_language_code": target_lang,
-            "source_language_code": 'auto',
-            "mode": "formal",
-            "model": "mayura:v1",
-        }
+        return self._translate(text, target_lang)
 
-        try:
-            response = requests.post(
-                f"{self.base_api_url}/translate",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            return self.clean_whitespace(response.json()["translated_text"])
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return text  # Fallback to original
+    def translate_many(self, texts: Iterable[str], target_lang: str,
+                       max_workers: int = TRANSLATE_FAN_OUT, failed: Optional[Set[str]] = None) -> Dict[str, str]:
+        """
+        Translate a set of strings at once: duplicates and blanks are dropped, cached strings
+        are served from the translation cache and the rest go out in parallel (at most
+        max_workers /translate calls at a time). Returns {text: translation}; a failed
+        translation maps to its original text and, if failed is given, is added to it
+        (a translation that merely equals its source, e.g. "COVID-19", is not a failure).
+        """
+        unique = list(dict.fromkeys(t for t in texts if t and t.strip()))
+        if target_lang.startswith("en") or not unique:
+            return {t: t for t in unique}
+
+        def _one(text: str) -> str:
+            translated = self._try_translate(text, target_lang)
+            if translated is None:
+                if failed is not None:
+                    failed.add(text)
+                return text
+            return translated
+
+        if max_workers <= 1 or len(unique) == 1:
+            return {t: _one(t) for t in unique}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique)),
+                                thread_name_prefix="healbee-translate") as executor:
+            return dict(zip(unique, executor.map(_one, unique)))
 
     def translate_text_to_english(self, text: str) -> str:
         """
@@ -99,37 +173,99 @@ class HealBeeUtilities:
         Args:
             text: Text to translate
         """
-        
-        headers = {"api-subscription-key": self.api_key}
-        payload = {
-            "input": text,
-            "target_language_code": 'en-IN',
-            "source_language_code": 'auto',
-            "mode": "formal",
-            "model": "mayura:v1",
-        }
+        return self._translate(text, 'en-IN')
 
+    def _translation_cache_key(self, payload: Dict[str, str]) -> Optional[str]:
+        """Key over API base URL, source text, target language, mode and model; None when caching is off."""
+        if self.translation_cache is None or not payload["input"].strip():
+            return None
+        # A mock or staging server's replies must never be served for the real API
+        return make_cache_key("translate", self.base_api_url, payload)
+
+    def _translate(self, text: str, target_lang: str) -> str:
+        translated = self._try_translate(text, target_lang)
+        return text if translated is None else translated  # fallback to original
+
+    def _cached_translation(self, payload: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+        """(cache key, cached translation or None); shared by the sync and async paths."""
+        cache_key = self._translation_cache_key(payload)
+        cached = self.translation_cache.get(cache_key) if cache_key is not None else None
+        return cache_key, cached or None  # an empty entry is never a translation
+
+    def _accept_translation(self, text: str, cache_key: Optional[str], raw: str) -> Optional[str]:
+        """Cleaned reply, cached; None for an empty reply to non-blank text (not cached)."""
+        translated = self.clean_whitespace(raw)
+        if not translated and text.strip():
+            print("Translation error: empty translation")
+            return None
+        if cache_key is not None:
+            self.translation_cache.set(cache_key, translated)
+        return translated
+
+    def _try_translate(self, text: str, target_lang: str) -> Optional[str]:
+        """Cached or fresh translation, or None if the call failed or came back empty (not cached)."""
+        payload = self._translate_payload(text, target_lang)
+        cache_key, cached = self._cached_translation(payload)
+        if cached is not None:
+            return cached
+
+        headers = {"api-subscription-key": self.api_key}
         try:
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.base_api_url}/translate",
                 headers=headers,
                 json=payload,
-                timeout=30
+                read_timeout=30
             )
             response.raise_for_status()
-            return self.clean_whitespace(response.json()["translated_text"])
+            raw = response.json()["translated_text"]
         except Exception as e:
             print(f"Translation error: {e}")
-            return text  # Fallback to original
+            return None
+        return self._accept_translation(text, cache_key, raw)
 
-    def synthesize_speech(self, text, language_code):
+    def translation_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate and sizes of the translation cache ({} when caching is off)."""
+        return self.translation_cache.stats() if self.translation_cache is not None else {}
+
+    def translate_stream(self, chunks: Iterable[str], target_lang: str) -> Iterator[str]:
         """
-        Synthesize speech using Sarvam or another TTS API.
-        Returns audio bytes (e.g., MP3 or WAV).
+        Translate streamed English text sentence by sentence, as each sentence completes.
+        Up to two sentences are translated in the background while the stream keeps
+        arriving; output keeps the original order and line breaks. English, and LocalizedText
+        chunks already in target_lang (catalog / safety replies), pass through unchanged.
         """
-        
-        headers = {"api-subscription-key": self.api_key}
-        payload = {
+        if target_lang.startswith("en"):
+            yield from chunks
+            return
+
+        def _translate(sentence: str, separator: str) -> str:
+            return (self.translate_text(sentence, target_lang) if sentence.strip() else sentence) + separator
+
+        pending: List[Future] = []
+        buffer = ""
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="healbee-translate") as executor:
+            for chunk in chunks:
+                if isinstance(chunk, LocalizedText) and chunk.is_in(target_lang):
+                    if buffer.strip():
+                        pending.append(executor.submit(_translate, buffer.strip(), ""))
+                    buffer = ""
+                    passthrough: Future = Future()
+                    passthrough.set_result(chunk)
+                    pending.append(passthrough)
+                    continue
+                buffer += chunk
+                sentences, buffer = split_completed_sentences(buffer)
+                pending.extend(executor.submit(_translate, sentence, sep) for sentence, sep in sentences)
+                while pending and pending[0].done():
+                    yield pending.pop(0).result()
+            if buffer.strip():
+                pending.append(executor.submit(_translate, buffer.strip(), ""))
+            for future in pending:
+                yield future.result()
+
+    def _tts_payload(self, text, language_code) -> Dict[str, Any]:
+        return {
             "text": text,
             "target_language_code": language_code,
             "speaker": 'abhilash',
@@ -139,48 +275,72 @@ class HealBeeUtilities:
             "speech_sample_rate": 22050,
         }
 
+    def _merge_tts_audios(self, result: Dict[str, Any]) -> bytes:
+        """Join the base64 WAV segments of a TTS response into one WAV file."""
+        segments = []
+        for b64_wav in result["audios"]:
+            # Decode base64 to bytes
+            audio_bytes = base64.b64decode(b64_wav)
+            
+            # Create in-memory file-like object
+            audio_file = io.BytesIO(audio_bytes)
+            
+            # Load audio segment
+            segment = AudioSegment.from_wav(audio_file)
+            segments.append(segment)
+
+        # Concatenate all segments
+        merged_audio = sum(segments[1:], segments[0])
+
+        # Export to bytes
+        output = io.BytesIO()
+        merged_audio.export(output, format="wav")
+        return output.getvalue()
+
+    def _tts_cache_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        """Key over API base URL, text hash and every voice setting (None when caching is off)."""
+        if self.tts_cache is None or not payload["text"].strip():
+            return None
+        settings = {k: v for k, v in payload.items() if k != "text"}
+        text_hash = hashlib.sha256(payload["text"].encode("utf-8")).hexdigest()
+        return make_cache_key("tts", self.base_api_url, text_hash, settings)
+
+    def synthesize_speech(self, text, language_code):
+        """
+        Synthesize speech using Sarvam or another TTS API.
+        Returns audio bytes (e.g., MP3 or WAV).
+        """
+        
+        headers = {"api-subscription-key": self.api_key}
+        payload = self._tts_payload(text, language_code)
+        cache_key = self._tts_cache_key(payload)
+        if cache_key is not None:
+            cached = self.tts_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.base_api_url}/text-to-speech",
                 headers=headers,
                 json=payload,
-                timeout=30
+                read_timeout=30
             )
             response.raise_for_status()
-            result = response.json()
-            segments = []
-            for b64_wav in result["audios"]:
-                # Decode base64 to bytes
-                audio_bytes = base64.b64decode(b64_wav)
-                
-                # Create in-memory file-like object
-                audio_file = io.BytesIO(audio_bytes)
-                
-                # Load audio segment
-                segment = AudioSegment.from_wav(audio_file)
-                segments.append(segment)
-
-            # Concatenate all segments
-            merged_audio = sum(segments[1:], segments[0])
-
-            # Export to bytes
-            output = io.BytesIO()
-            merged_audio.export(output, format="wav")
-            return output.getvalue()
+            audio = self._merge_tts_audios(response.json())
         except Exception as e:
             print(f"Speech synthesis error: {e}")
             return None
+        if cache_key is not None:
+            self.tts_cache.set(cache_key, audio)
+        return audio
 
-    def transcribe_audio(self, audio_data, sample_rate=48000, source_language="hi-IN"):
-        """
-        Send cleaned audio to Sarvam's Saarika v2 for transcription
-        
-        Args:
-            audio_data: Cleaned audio data (int16)
-            sample_rate: Audio sample rate
-            source_language: Source language code (e.g., "hi-IN", "ta-IN", etc.)
-        """
-        
+    def tts_cache_stats(self) -> Dict[str, Any]:
+        """Counters of the speech cache ({} when caching is off)."""
+        return self.tts_cache.stats() if self.tts_cache is not None else {}
+
+    def _stt_request(self, audio_data, sample_rate, source_language) -> Tuple[Dict, Dict, Dict]:
+        """Headers, multipart files and form data of a Saarika v2 transcription call."""
         audio_buffer = io.BytesIO()
         sf.write(audio_buffer, audio_data, sample_rate, format='WAV')
         audio_buffer.seek(0)
@@ -194,14 +354,26 @@ class HealBeeUtilities:
         payload = {
             "language_code": source_language
         }
+        return headers, files, payload
+
+    def transcribe_audio(self, audio_data, sample_rate=48000, source_language="hi-IN"):
+        """
+        Send cleaned audio to Sarvam's Saarika v2 for transcription
+        
+        Args:
+            audio_data: Cleaned audio data (int16)
+            sample_rate: Audio sample rate
+            source_language: Source language code (e.g., "hi-IN", "ta-IN", etc.)
+        """
+        headers, files, payload = self._stt_request(audio_data, sample_rate, source_language)
 
         try:
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.base_api_url}/speech-to-text",
                 headers=headers,
                 data=payload,
                 files=files,
-                timeout=60
+                read_timeout=60
             )
             response.raise_for_status()
             result = response.json()
@@ -218,6 +390,91 @@ class HealBeeUtilities:
                 "language_detected": source_language
             }
 
+    # --- asyncio versions (same payloads and fallbacks) over the pooled async transport ---
+
+    @property
+    def async_transport(self) -> AsyncSarvamTransport:
+        if self._async_transport is None:
+            self._async_transport = get_async_transport()
+        return self._async_transport
+
+    async def translate_text_async(self, text: str, target_lang: str) -> str:
+        """asyncio version of translate_text"""
+        if target_lang.startswith("en"):
+            return text
+        return await self._translate_async(text, target_lang)
+
+    async def translate_text_to_english_async(self, text: str) -> str:
+        """asyncio version of translate_text_to_english"""
+        return await self._translate_async(text, 'en-IN')
+
+    async def _translate_async(self, text: str, target_lang: str) -> str:
+        payload = self._translate_payload(text, target_lang)
+        cache_key, cached = self._cached_translation(payload)
+        if cached is not None:
+            return cached
+        try:
+            response = await self.async_transport.post(
+                f"{self.base_api_url}/translate",
+                headers={"api-subscription-key": self.api_key},
+                json=payload,
+                read_timeout=30
+            )
+            response.raise_for_status()
+            raw = response.json()["translated_text"]
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return text
+        translated = self._accept_translation(text, cache_key, raw)
+        return text if translated is None else translated  # fallback to original
+
+    async def synthesize_speech_async(self, text, language_code):
+        """asyncio version of synthesize_speech"""
+        payload = self._tts_payload(text, language_code)
+        cache_key = self._tts_cache_key(payload)
+        if cache_key is not None:
+            cached = self.tts_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        try:
+            response = await self.async_transport.post(
+                f"{self.base_api_url}/text-to-speech",
+                headers={"api-subscription-key": self.api_key},
+                json=payload,
+                read_timeout=30
+            )
+            response.raise_for_status()
+            audio = self._merge_tts_audios(response.json())
+        except Exception as e:
+            print(f"Speech synthesis error: {e}")
+            return None
+        if cache_key is not None:
+            self.tts_cache.set(cache_key, audio)
+        return audio
+
+    async def transcribe_audio_async(self, audio_data, sample_rate=48000, source_language="hi-IN"):
+        """asyncio version of transcribe_audio"""
+        headers, files, payload = self._stt_request(audio_data, sample_rate, source_language)
+        try:
+            response = await self.async_transport.post(
+                f"{self.base_api_url}/speech-to-text",
+                headers=headers,
+                data=payload,
+                files=files,
+                read_timeout=60
+            )
+            response.raise_for_status()
+            result = response.json()
+            return {
+                "transcription": result.get("transcript", ""),
+                "language_detected": result.get("language_code", source_language)
+            }
+        except httpx.HTTPError as e:
+            print(f"❌ Sarvam STT API call failed: {e}")
+            return {
+                "transcription": "",
+                "language_detected": source_language
+            }
 
     def batch_translate(self, texts: List[str], target_lang: str) -> List[str]:
         """Optimized batch translation for multiple texts"""
@@ -232,11 +489,11 @@ class HealBeeUtilities:
         }
 
         try:
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.base_api_url}/translate/batch",
                 headers=headers,
                 json=payload,
-                timeout=45
+                read_timeout=45
             )
             response.raise_for_status()
             return response.json()["translations"]
@@ -245,27 +502,8 @@ class HealBeeUtilities:
             return texts
 
     def detect_language(self, text: str) -> str:
-        """Robust language detection with code-mixing support"""
-        # First check for strong indicators
-        if re.search(r"[\u0900-\u097F]", text):  # Hindi/Sanskrit Unicode range
-            return "hi-IN"
-        if re.search(r"[\u0B80-\u0BFF]", text):  # Tamil
-            return "ta-IN"
-        
-        # Fallback to API detection
-        try:
-            headers = {"Authorization": f"Bearer {self.api_key}"}
-            response = requests.post(
-                f"{self.base_api_url}/detect-language",
-                headers=headers,
-                json={"text": text},
-                timeout=15
-            )
-            response.raise_for_status()
-            return response.json().get("language", "en-IN")
-        except Exception as e:
-            print(f"Language detection error: {e}")
-            return "en-IN"
+        """Robust language detection with code-mixing support (offline, no API call)"""
+        return detect_language(text)
 
     def get_display_language(self, lang_code: str) -> str:
         """Get user-friendly language name"""
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.cache import TwoTierCache
+from src.http_transport import AsyncSarvamTransport
+from src.nlu_processor import HealthIntent, NLUResult, SarvamAPIClient, SarvamMNLUProcessor
+from src.response_generator import HealBeeResponseGenerator
+from src.symptom_checker import SymptomChecker
+
+
+class FakeAsyncSarvamClient:
+    """Async fake: answers chat_completion_async by a phrase of the system prompt, after a delay."""
+
+    def __init__(self, contents, delay=0.0):
+        self.api_key = "test_api_key"
+        self.contents = contents
+        self.delay = delay
+        self.calls = []
+
+    async def chat_completion_async(self, messages, **kwargs):
+        self.calls.append(messages)
+        await asyncio.sleep(self.delay)
+        system = messages[0]["content"]
+        content = next((v for k, v in self.contents.items() if k in system), "")
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def test_async_transport_retries_and_client_caches():
+    statuses = [503, 200]
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        status = statuses.pop(0) if statuses else 200
+        return httpx.Response(status, json={"choices": [{"message": {"content": "ok"}}]})
+
+    transport = AsyncSarvamTransport(backoff_base=0.01, transport=httpx.MockTransport(handler))
+    client = SarvamAPIClient(api_key="test_api_key", cache=TwoTierCache(db_path=None), async_transport=transport)
+    messages = [{"role": "user", "content": "hello"}]
+
+    async def run():
+        first = await client.chat_completion_async(messages, temperature=0.1, use_cache=True)
+        second = await client.chat_completion_async(messages, temperature=0.1, use_cache=True)
+        await transport.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {"choices": [{"message": {"content": "ok"}}]}
+    assert transport.retries == 1
+    assert len(seen) == 2  # one retried call, then served from cache
+
+
+def test_process_transcription_async_runs_steps_concurrently():
+    processor = SarvamMNLUProcessor(api_key="test_api_key", combined_nlu=False, local_intent_threshold=None)
+    processor.sarvam_client = FakeAsyncSarvamClient({
+        "intent classifier": json.dumps({"intent": "medication_info", "confidence": 0.8}),
+        "entity extractor": json.dumps({"entities": [{"text": "insulin", "type": "medication", "start": 9, "end": 16}]}),
+    }, delay=0.2)
+    start = time.monotonic()
+    result = asyncio.run(processor.process_transcription_async("How does insulin work?", "en-IN"))
+    assert time.monotonic() - start < 0.35
+    assert len(processor.sarvam_client.calls) == 2
+    assert result.intent == HealthIntent.MEDICATION_INFO
+    assert [e.text for e in result.entities] == ["insulin"]
+
+
+def test_async_step_timeout_uses_fallbacks():
+    processor = SarvamMNLUProcessor(api_key="test_api_key", combined_nlu=False, step_timeout=0.05,
+                                    local_intent_threshold=None)
+    processor.sarvam_client = FakeAsyncSarvamClient({}, delay=1.0)
+    result = asyncio.run(processor.process_transcription_async("Tell me about vitamin D", "en-IN"))
+    assert result.intent == HealthIntent.UNKNOWN
+
+
+def _nlu_result(text="I have a fever", intent=HealthIntent.GENERAL_HEALTH):
+    return NLUResult(original_text=text, intent=intent, confidence=0.9, entities=[], is_emergency=False,
+                     requires_disclaimer=True, language_detected="en-IN")
+
+
+def test_generate_response_async_matches_sync_prompt():
+    generator = HealBeeResponseGenerator(api_key="test_api_key")
+    fake = FakeAsyncSarvamClient({"": "Drink fluids and rest."})
+    generator.sarvam_client = fake
+    text = asyncio.run(generator.generate_response_async("How do I stay hydrated?", _nlu_result()))
+    assert text == "Drink fluids and rest."
+    assert fake.calls[0] == generator._build_messages("How do I stay hydrated?", _nlu_result())
+
+
+def test_generate_preliminary_assessment_async():
+    answer = {"assessment_summary": "Mild fever.", "suggested_severity": "Seems mild",
+              "recommended_next_steps": "Rest", "potential_warnings": [], "disclaimer": "x"}
+    checker = SymptomChecker(_nlu_result(intent=HealthIntent.SYMPTOM_QUERY), api_key="test_api_key")
+    checker.sarvam_client = FakeAsyncSarvamClient({"AI Health Assistant": json.dumps(answer)})
+    assessment = asyncio.run(checker.generate_preliminary_assessment_async())
+    assert assessment["assessment_summary"] == "Mild fever."
+    assert assessment["disclaimer"] == SymptomChecker.DEFAULT_ASSESSMENT_ERROR["disclaimer"]
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import time
+from src.cache import DiskLRUCache, TwoTierCache, make_cache_key
+from src.http_transport import SarvamTransport
+from src.mock_sarvam_server import MockSarvamServer
+from src.nlu_processor import SarvamAPIClient
+from src.rate_limit import EndpointRateLimiter
+from src.utils import HealBeeUtilities
+
+
+def test_make_cache_key_ignores_dict_order():
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key({"temperature": 0.1}) != make_cache_key({"temperature": 0.3})
+
+
+def test_memory_tier_lru_eviction_and_counters():
+    cache = TwoTierCache(db_path=None, max_memory_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_disk_tier_survives_restart_and_respects_ttl(tmp_path):
+    db_path = str(tmp_path / "llm_cache.sqlite3")
+    cache = TwoTierCache(db_path=db_path)
+    cache.set("key", {"choices": [{"message": {"content": "ok"}}]})
+
+    reopened = TwoTierCache(db_path=db_path)
+    assert reopened.get("key") == {"choices": [{"message": {"content": "ok"}}]}
+    assert reopened.stats()["disk_hits"] == 1
+
+    expired = TwoTierCache(db_path=db_path, ttl_seconds=0.01)
+    time.sleep(0.05)
+    assert expired.get("key") is None
+    assert expired.stats()["disk_entries"] == 0
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TwoTierCache(db_path=str(tmp_path / "c.sqlite3"), max_memory_entries=1, max_disk_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        time.sleep(0.01)
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2
+    assert cache.get("a") is None
+    assert cache.get("b") == "b"
+
+
+class _FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": "{\"intent\": \"symptom_query\"}"}}]}
+
+
+def test_chat_completion_cache_skips_network_on_repeat():
+    posts = []
+
+    class _FakeTransport:
+        def post(self, url, headers=None, json=None, read_timeout=None):
+            posts.append(json)
+            return _FakeResponse()
+
+    client = SarvamAPIClient(api_key="test_api_key", cache=TwoTierCache(db_path=None), transport=_FakeTransport())
+    messages = [{"role": "user", "content": "I have fever"}]
+
+    first = client.chat_completion(messages=messages, temperature=0.3, use_cache=True)
+    second = client.chat_completion(messages=messages, temperature=0.3, use_cache=True)
+    assert first == second
+    assert len(posts) == 1
+
+    client.chat_completion(messages=messages, temperature=0.1, use_cache=True)  # different sampling params
+    client.chat_completion(messages=messages, temperature=0.3)  # caching not requested
+    assert len(posts) == 3
+
+    mock = SarvamAPIClient(api_key="test_api_key", cache=client.cache, transport=_FakeTransport(),
+                           base_url="http://127.0.0.1:9")
+    mock.chat_completion(messages=messages, temperature=0.3, use_cache=True)  # another API never shares entries
+    assert len(posts) == 4
+
+
+class _TranslateResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        if self.payload["input"] == "fail":
+            raise RuntimeError("upstream down")
+
+    def json(self):
+        if self.payload["input"] == "Drink water":
+            return {"translated_text": ""}
+        return {"translated_text": f"[{self.payload['target_language_code']}]  {self.payload['input']}"}
+
+
+def test_translations_are_cached_across_instances(tmp_path):
+    posts = []
+
+    class _FakeTransport:
+        def post(self, url, headers=None, json=None, read_timeout=None):
+            posts.append(json)
+            return _TranslateResponse(json)
+
+    db_path = str(tmp_path / "translation_cache.sqlite3")
+    util = HealBeeUtilities(api_key="test_api_key", transport=_FakeTransport(),
+                            translation_cache=TwoTierCache(db_path=db_path))
+    assert util.translate_text("Summary", "hi-IN") == "[hi-IN] Summary"
+    assert util.translate_text("Summary", "hi-IN") == "[hi-IN] Summary"
+    assert util.translate_text("Summary", "ta-IN") == "[ta-IN] Summary"
+    assert util.translate_text_to_english("Summary") == "[en-IN] Summary"
+    assert util.translate_text("fail", "hi-IN") == "fail"  # fallbacks are not cached
+    util.translate_text("fail", "hi-IN")
+    assert len(posts) == 5
+    assert util.translation_cache_stats()["hits"] == 1
+
+    restarted = HealBeeUtilities(api_key="test_api_key", transport=_FakeTransport(),
+                                 translation_cache=TwoTierCache(db_path=db_path))
+    assert restarted.translate_text("Summary", "ta-IN") == "[ta-IN] Summary"
+    assert restarted.translation_cache_stats()["disk_hits"] == 1 and len(posts) == 5
+
+    elsewhere = HealBeeUtilities(api_key="test_api_key", transport=_FakeTransport(), base_url="http://127.0.0.1:9",
+                                 translation_cache=TwoTierCache(db_path=db_path))
+    elsewhere.translate_text("Summary", "ta-IN")  # another API base URL never shares entries
+    assert len(posts) == 6
+
+    uncached = HealBeeUtilities(api_key="test_api_key", transport=_FakeTransport(), cache_translations=False)
+    uncached.translate_text("Summary", "hi-IN")
+    assert len(posts) == 7 and uncached.translation_cache_stats() == {}
+
+
+def test_disk_lru_cache_is_bounded_by_bytes_and_survives_restart(tmp_path):
+    directory = str(tmp_path / "tts_cache")
+    cache = DiskLRUCache(directory, max_bytes=10, suffix=".wav")
+    cache.set("a", b"aaaa")
+    time.sleep(0.01)
+    cache.set("b", b"bbbb")
+    time.sleep(0.01)
+    assert cache.get("a") == b"aaaa"  # "b" is now least recently used
+    cache.set("c", b"cccc")
+    assert cache.get("b") is None
+    assert sorted(os.listdir(directory)) == ["a.wav", "c.wav"]
+    cache.set("huge", b"x" * 11)  # larger than the whole cache
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5, "entries": 2, "bytes": 8}
+
+    reopened = DiskLRUCache(directory, max_bytes=4, suffix=".wav")
+    assert reopened.get("c") == b"cccc" and reopened.get("a") is None  # the older "a" was evicted on load
+
+
+def test_disk_lru_cache_sweeps_stale_temp_files(tmp_path):
+    stale, fresh = tmp_path / "a.wav.1.2.tmp", tmp_path / "b.wav.3.4.tmp"
+    stale.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+    cache = DiskLRUCache(str(tmp_path), suffix=".wav")
+    assert sorted(os.listdir(tmp_path)) == ["b.wav.3.4.tmp"]  # may still be being written
+    assert cache.stats()["entries"] == 0
+
+
+def test_speech_is_cached_per_text_and_voice_settings(tmp_path):
+    transport = SarvamTransport(rate_limiter=EndpointRateLimiter({}))
+    with MockSarvamServer() as server:
+        util = HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport,
+                                cache_translations=False, tts_cache=DiskLRUCache(str(tmp_path), suffix=".wav"))
+        audio = util.synthesize_speech("Drink water", "hi-IN")
+        assert audio[:4] == b"RIFF"
+        assert util.synthesize_speech("Drink water", "hi-IN") == audio
+        util.synthesize_speech("Drink water", "ta-IN")
+        assert server.stats.requests["tts"] == 2
+        assert util.tts_cache_stats()["hits"] == 1
+
+        restarted = HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport,
+                                     cache_translations=False, tts_cache=DiskLRUCache(str(tmp_path), suffix=".wav"))
+        assert restarted.synthesize_speech("Drink water", "ta-IN")[:4] == b"RIFF"
+        assert server.stats.requests["tts"] == 2
+
+
+def test_empty_translations_are_not_cached_sync_or_async():
+    posts = []
+
+    class _FakeTransport:
+        def post(self, url, headers=None, json=None, read_timeout=None):
+            posts.append(json)
+            return _TranslateResponse(json)
+
+    class _FakeAsyncTransport:
+        async def post(self, url, headers=None, json=None, read_timeout=None):
+            posts.append(json)
+            return _TranslateResponse(json)
+
+    cache = TwoTierCache(db_path=None)
+    util = HealBeeUtilities(api_key="test_api_key", transport=_FakeTransport(),
+                            async_transport=_FakeAsyncTransport(), translation_cache=cache)
+    assert asyncio.run(util.translate_text_async("Drink water", "hi-IN")) == "Drink water"
+    assert util.translate_text("Drink water", "hi-IN") == "Drink water"
+    assert cache.stats()["memory_entries"] == 0 and len(posts) == 2
+    assert asyncio.run(util.translate_text_async("Rest", "hi-IN")) == "[hi-IN] Rest"
+    assert util.translate_text("Rest", "hi-IN") == "[hi-IN] Rest" and len(posts) == 3
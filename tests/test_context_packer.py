@@ -0,0 +1,56 @@
+from src.context_packer import ContextSection, estimate_tokens, pack_sections
+from src.nlu_processor import HealthIntent, NLUResult
+from src.response_generator import HealBeeResponseGenerator
+
+
+def test_estimate_tokens_counts_indic_denser_than_ascii():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 400) == 100
+    assert estimate_tokens("बुखार" * 20) == 50
+
+
+def test_pack_sections_by_priority_keeps_original_order():
+    sections = [
+        ContextSection("low", 10, ["x" * 400]),
+        ContextSection("high", 90, ["important"]),
+        ContextSection("mid", 50, ["a" * 40, "b" * 40, "c" * 40], keep="tail"),
+    ]
+    packed = pack_sections(sections, budget=30)
+    assert packed.text == "important\n" + "b" * 40 + "; " + "c" * 40
+    assert packed.trimmed == ["mid"] and packed.dropped == ["low"]
+
+    everything = pack_sections(sections, budget=10_000)
+    assert everything.text.split("\n")[0] == "x" * 400 and not everything.dropped
+
+
+def test_summary_and_required_sections():
+    sections = [
+        ContextSection("journal", 50, ["entry " * 50], summary="journal titles"),
+        ContextSection("places", 95, ["1. Clinic A", "2. Clinic B"], joiner="\n", required=True),
+    ]
+    packed = pack_sections(sections, budget=0)
+    assert packed.text == "1. Clinic A"
+    assert packed.dropped == ["journal"] and packed.trimmed == ["places"]
+    assert pack_sections(sections, budget=12).summarized == ["journal"]
+
+
+def test_generate_response_prompt_respects_budget():
+    nlu = NLUResult(original_text="q", intent=HealthIntent.SYMPTOM_QUERY, confidence=0.9, entities=[],
+                    is_emergency=False, requires_disclaimer=True, language_detected="en-IN")
+    context = {
+        "extracted_symptoms": ["fever", "cough"],
+        "past_messages": [{"role": "user", "content": "old message " * 20}] * 8,
+        "relevant_journal_entries": [{"datetime": "2024-01-01T10:00:00", "title": "Flu", "content": "x" * 300}] * 5,
+        "reminder_just_set": {"title": "Take paracetamol at 9pm"},
+    }
+    generator = HealBeeResponseGenerator(api_key="test_api_key")
+    full = generator._build_messages("q", nlu, context)
+    assert generator.last_packed_context.dropped == []
+
+    generator.prompt_token_budget = estimate_tokens(full[0]["content"]) + 600
+    tight = generator._build_messages("q", nlu, context)
+    packed = generator.last_packed_context
+    assert packed.tokens <= generator.prompt_token_budget
+    assert "ACTIVE SYMPTOM SET" in tight[1]["content"] and "Take paracetamol at 9pm" in tight[1]["content"]
+    assert "past_messages" in packed.dropped + packed.trimmed + packed.summarized
+    assert len(tight[1]["content"]) < len(full[1]["content"])
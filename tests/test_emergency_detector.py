@@ -0,0 +1,53 @@
+import json
+import os
+from src.emergency_detector import EMERGENCY_RESPONSES, EmergencyDetector, emergency_response
+from src.nlu_processor import SarvamMNLUProcessor, HealthIntent
+
+_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "nlu_config.json")
+
+
+def _keyword_lists():
+    with open(_CONFIG, "r", encoding="utf-8") as f:
+        return json.load(f)["keyword_lists"]["emergency_keywords"]
+
+
+def test_every_language_keyword_is_detected():
+    keyword_lists = _keyword_lists()
+    detector = EmergencyDetector(keyword_lists)
+    for language, keywords in keyword_lists.items():
+        for keyword in keywords:
+            assert detector.detect(f"please help, {keyword} since 10 minutes") is not None, (language, keyword)
+    assert detector.detect("I have a mild cold") is None
+
+
+def test_keywords_only_match_whole_tokens():
+    detector = EmergencyDetector(_keyword_lists())
+    # Marathi "विष" (poison) inside Hindi "विषय" (topic) and "विषाणु" (virus)
+    assert detector.detect("मुझे डेंगू के विषय में जानकारी दें") is None
+    assert detector.detect("मेरे बच्चे को विषाणु संक्रमण है") is None
+    assert detector.detect("I feel urgently sleepy") is None
+    match = detector.detect("त्याने विष घेतले")
+    assert match is not None and match.keyword == "विष"
+    assert detector.detect("Chest pain, please help!") is not None
+
+
+def test_responses_cover_all_supported_languages():
+    assert set(_keyword_lists()) <= set(EMERGENCY_RESPONSES)
+    assert emergency_response("ta-IN") == EMERGENCY_RESPONSES["ta"]
+    assert emergency_response("xx-IN") == EMERGENCY_RESPONSES["en"]
+    assert emergency_response(None) == EMERGENCY_RESPONSES["en"]
+
+
+class _NoNetworkClient:
+    def chat_completion(self, messages, **kwargs):
+        raise AssertionError("emergency path must not call Sarvam")
+
+
+def test_emergency_in_other_script_short_circuits_regardless_of_ui_language():
+    processor = SarvamMNLUProcessor(api_key="test_api_key", local_intent_threshold=None)
+    processor.sarvam_client = _NoNetworkClient()
+    # Tamil keyword while the UI language is English; romanized Hindi caught after normalization
+    for text in ["அப்பாவுக்கு மார்பு வலி", "papa ko seene mein dard ho raha hai"]:
+        result = processor.process_transcription(text, "en-IN")
+        assert result.is_emergency
+        assert result.intent == HealthIntent.EMERGENCY
@@ -6,7 +6,6 @@ from datetime import datetime
 from difflib import SequenceMatcher
 import unittest
 import json
-import time
 from unittest.mock import patch
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -104,15 +103,14 @@ class HealBeeEvaluator:
         baseline_total_entities = 0
         baseline_total_predicted_entities = 0
 
-        for case in self.test_cases['nlu']:
-            time.sleep(1)
-
-            # Process test case
-            result = self.nlu_processor.process_transcription(
-                case['input_text'],
-                case['language']
-            )
-
+        # Process all test cases as one batch (de-duplicated, rate-limited instead of sleeping per case)
+        results = self.nlu_processor.process_many(
+            [case['input_text'] for case in self.test_cases['nlu']],
+            [case['language'] for case in self.test_cases['nlu']],
+            max_concurrency=2,
+            requests_per_second=1.0
+        )
+        for case, result in zip(self.test_cases['nlu'], results):
             # --- FIX: Normalize intent comparison ---
             if result.intent.value.strip().lower() == case['expected_intent'].strip().lower():
                 correct_intents += 1
@@ -223,7 +221,7 @@ class HealBeeEvaluator:
                 for question, answer in answers.items():
                     checker.record_answer(symptom, question, answer)
 
-            time.sleep(1)
+            # Pacing is done by the transport's per-endpoint rate limiter
             assessment = checker.generate_preliminary_assessment()
 
             # Evaluate assessment quality
@@ -285,7 +283,6 @@ class HealBeeEvaluator:
                     language_detected="en-IN"
                 )
 
-            time.sleep(30) # Honor API rate limit
             response = self.response_generator.generate_response(
                 case['input_text'],
                 nlu_result
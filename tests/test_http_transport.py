@@ -0,0 +1,178 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.http_transport import AsyncSingleFlight, SarvamTransport, endpoint_for_url
+from src.rate_limit import EndpointRateLimiter, TokenBucket
+
+
+class _Server:
+    """Local HTTP/1.1 server that answers with queued status codes and records client ports."""
+
+    def __init__(self, statuses, delay=0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.client_ports = []
+        self.bodies = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.client_ports.append(self.client_address[1])
+                server.bodies.append(body)
+                status = server.statuses.pop(0) if server.statuses else 200
+                time.sleep(server.delay)
+                payload = b'{"ok": true}'
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/test"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def make(statuses=(), delay=0.0):
+        servers.append(_Server(statuses, delay))
+        return servers[-1]
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def test_reuses_one_keep_alive_connection(server_factory):
+    server = server_factory()
+    transport = SarvamTransport(pool_size=2)
+    for _ in range(5):
+        assert transport.post(server.url, json={"x": 1}).status_code == 200
+    assert len(server.client_ports) == 5
+    assert len(set(server.client_ports)) == 1
+
+
+def test_retries_429_and_5xx_then_succeeds(server_factory):
+    server = server_factory([429, 503])
+    transport = SarvamTransport(max_retries=3, backoff_base=0.01)
+    response = transport.post(server.url, json={"x": 1})
+    assert response.status_code == 200
+    assert transport.retries == 2
+    assert len(server.bodies) == 3
+
+
+def test_gives_up_after_max_retries(server_factory):
+    server = server_factory([500, 500, 500])
+    transport = SarvamTransport(max_retries=1, backoff_base=0.01)
+    assert transport.post(server.url, json={}).status_code == 500
+    assert len(server.bodies) == 2
+
+
+def test_multipart_body_is_resent_on_retry(server_factory):
+    server = server_factory([502])
+    transport = SarvamTransport(max_retries=1, backoff_base=0.01)
+    files = {"file": ("audio.wav", io.BytesIO(b"RIFFdata"), "audio/wav")}
+    assert transport.post(server.url, data={"language_code": "hi-IN"}, files=files).status_code == 200
+    assert all(b"RIFFdata" in body for body in server.bodies)
+
+
+def test_connection_errors_are_retried_then_raised():
+    transport = SarvamTransport(max_retries=2, backoff_base=0.01, connect_timeout=0.5)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.post("http://127.0.0.1:9/unreachable", json={})
+    assert transport.retries == 2
+
+
+def test_identical_concurrent_posts_share_one_call(server_factory):
+    server = server_factory(delay=0.2)
+    transport = SarvamTransport(rate_limiter=EndpointRateLimiter({}))
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        responses = list(pool.map(lambda _: transport.post(server.url, json={"q": 1}), range(5)))
+    assert len(server.bodies) == 1
+    assert all(r.json() == {"ok": True} for r in responses)
+    assert transport.stats()["coalesced"] == 4
+    # Different payloads and uploads are not coalesced
+    transport.post(server.url, json={"q": 2})
+    transport.post(server.url, files={"file": ("a.wav", io.BytesIO(b"x"), "audio/wav")})
+    assert len(server.bodies) == 3
+
+
+def test_cancelled_async_leader_does_not_cancel_followers():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "response"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "response"
+    assert calls == [1] and flight.coalesced == 1
+
+
+def test_rate_limiter_queues_per_endpoint(server_factory):
+    server = server_factory()
+    limiter = EndpointRateLimiter({"chat": 10.0, "other": 0})
+    transport = SarvamTransport(rate_limiter=limiter, coalesce=False)
+    chat_url = server.url.replace("/v1/test", "/v1/chat/completions")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=15) as pool:
+        statuses = list(pool.map(lambda i: transport.post(chat_url, json={"q": i}).status_code, range(15)))
+    assert statuses == [200] * 15
+    # Burst of 10, then 5 more at 10/s
+    assert time.monotonic() - start >= 0.45
+    stats = transport.stats()["rate_limits"]
+    assert list(stats) == ["chat"]
+    assert stats["chat"]["acquired"] == 15 and stats["chat"]["waits"] == 5
+    assert stats["chat"]["max_wait_s"] > 0 and stats["chat"]["queue_depth"] == 0
+
+
+def test_token_bucket_reports_queue_depth():
+    bucket = TokenBucket(rate=20.0)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(bucket.acquire) for _ in range(4)]
+        time.sleep(0.02)
+        assert bucket.stats()["queue_depth"] == 3
+        waits = sorted(f.result() for f in futures)
+    assert waits[0] == 0 and waits[-1] == pytest.approx(0.15, abs=0.02)
+    assert bucket.stats()["queue_depth"] == 0
+
+
+def test_endpoint_for_url():
+    assert endpoint_for_url("https://api.sarvam.ai/v1/chat/completions") == "chat"
+    assert endpoint_for_url("https://api.sarvam.ai/translate") == "translate"
+    assert endpoint_for_url("https://api.sarvam.ai/text-to-speech") == "tts"
+    assert endpoint_for_url("https://api.sarvam.ai/speech-to-text") == "stt"
+    assert endpoint_for_url("https://api.sarvam.ai/v1/other") == "other"
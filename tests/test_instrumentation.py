@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from src import nominatim_places, supabase_client
+from src.http_transport import SarvamTransport
+from src.instrumentation import Histogram, add_exporter, current_span, instrument, metrics, remove_exporter
+from src.mock_sarvam_server import EndpointProfile, MockSarvamServer
+from src.nlu_processor import SarvamAPIClient
+from src.rate_limit import EndpointRateLimiter
+from src.resilience import ResilientCaller
+from src.utils import HealBeeUtilities
+
+
+@pytest.fixture
+def spans():
+    metrics.reset()
+    collected = []
+    add_exporter(collected.append)
+    yield collected
+    remove_exporter(collected.append)
+
+
+def test_sarvam_calls_record_bytes_status_tokens_and_retries(spans):
+    transport = SarvamTransport(rate_limiter=EndpointRateLimiter({}), backoff_base=0.01, backoff_max=0.02)
+    profiles = {"tts": EndpointProfile(0, 0, error_rate=1.0)}
+    with MockSarvamServer(profiles) as server:
+        client = SarvamAPIClient(api_key="mock", base_url=server.base_url, transport=transport,
+                                 resilience=ResilientCaller("chat", hedge_percentile=0))
+        client.chat_completion([{"role": "user", "content": "I have fever"}], operation="nlu.entities")
+        util = HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport,
+                                cache_translations=False, cache_speech=False)
+        util.translate_text("Drink water", "hi-IN")
+        assert util.synthesize_speech("Drink water", "hi-IN") is None
+
+    chat, translate, tts = spans
+    assert (chat.service, chat.operation, chat.status) == ("sarvam", "nlu.entities", 200)
+    assert chat.request_bytes > 0 and chat.response_bytes > 0
+    assert chat.prompt_tokens > 0 and chat.completion_tokens > 0
+    assert translate.operation == "translate" and translate.retries == 0
+    assert tts.operation == "tts" and tts.status >= 500 and tts.retries == transport.max_retries
+
+    snapshot = metrics.snapshot()
+    assert snapshot["sarvam.nlu.entities"]["calls"] == 1
+    assert snapshot["sarvam.nlu.entities"]["tokens"]["count"] == 1
+    assert snapshot["sarvam.tts"]["retries"] == transport.max_retries
+
+
+def test_hedged_call_records_only_the_winning_attempt(spans):
+    caller = ResilientCaller("chat", hedge_delay=0.05)
+    release, loser_done = threading.Event(), threading.Event()
+
+    def attempt(hedged):
+        span = current_span()
+        if not hedged:
+            release.wait(2)
+            span.status, span.request_bytes = 500, 1000  # finishes after the span was exported
+            loser_done.set()
+            return "slow"
+        span.status, span.request_bytes, span.response_bytes = 200, 100, 50
+        return "hedge"
+
+    with instrument("sarvam", "nlu.intent"):
+        assert caller.call(attempt) == "hedge"
+    release.set()
+    loser_done.wait(2)
+    (span,) = spans
+    assert (span.status, span.request_bytes, span.response_bytes, span.hedges) == (200, 100, 50, 1)
+    assert metrics.snapshot()["sarvam.nlu.intent"]["hedges"] == 1
+
+
+def test_nominatim_calls_are_instrumented(spans, monkeypatch):
+    def fail(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("offline")
+
+    monkeypatch.setattr(nominatim_places.requests, "get", fail)
+    assert nominatim_places._search("Pune") == []
+    assert (spans[0].service, spans[0].operation, spans[0].error) == ("nominatim", "search", "ConnectionError")
+    assert metrics.snapshot()["nominatim.search"]["errors"] == 1
+
+
+def test_supabase_queries_record_status_and_response_size(spans):
+    class _Result:
+        data = [{"id": "c1", "title": "Fever"}]
+
+    class _Query:
+        def execute(self):
+            return _Result()
+
+    supabase_client._execute(_Query(), "chats.select")
+    assert (spans[0].service, spans[0].operation, spans[0].status) == ("supabase", "chats.select", 200)
+    assert spans[0].response_bytes == len('[{"id": "c1", "title": "Fever"}]')
+
+
+def test_histogram_percentiles():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    for value in [0.05] * 90 + [0.7] * 9 + [3.0]:
+        histogram.add(value)
+    assert histogram.percentile(50) == 0.1
+    assert histogram.percentile(95) == 1.0
+    assert histogram.percentile(100) == 3.0
+    assert histogram.to_dict()["buckets"] == {"0.1": 90, "0.5": 0, "1.0": 9, "+Inf": 1}
+
+
+def test_wrapper_overhead_is_negligible():
+    metrics.reset()
+    n = 20000
+    start = time.perf_counter()
+    for _ in range(n):
+        with instrument("bench", "noop"):
+            pass
+    per_call = (time.perf_counter() - start) / n
+    assert per_call < 50e-6
+    assert metrics.snapshot()["bench.noop"]["calls"] == n
@@ -0,0 +1,31 @@
+import time
+from src.intent_classifier import LocalIntentClassifier, extract_features, get_local_intent_classifier
+
+
+def test_features_are_normalized_char_and_word_ngrams():
+    features = extract_features("Mujhe  Bukhar")
+    assert "w:mujhe" in features
+    assert " bu" in features
+    assert abs(sum(v * v for v in features.values()) - 1.0) < 1e-9
+
+
+def test_train_save_load_roundtrip(tmp_path):
+    examples = [("i have fever", "symptom_query"), ("i have cough", "symptom_query"),
+                ("can i take paracetamol", "medication_info"), ("dose of crocin", "medication_info")] * 5
+    model = LocalIntentClassifier.train(examples, epochs=10)
+    path = str(tmp_path / "model.json")
+    model.save(path, min_weight=0.0)
+    loaded = LocalIntentClassifier.load(path)
+    assert loaded.predict("i have a headache")[0] == "symptom_query"
+    assert loaded.predict("can i take crocin")[0] == "medication_info"
+
+
+def test_shipped_model_is_fast_and_sane():
+    model = get_local_intent_classifier()
+    assert model is not None
+    assert model.predict("Can I take paracetamol daily?")[0] == "medication_info"
+    assert model.predict("मुझे बुखार है")[0] == "symptom_query"
+    start = time.perf_counter()
+    for _ in range(200):
+        model.predict("What are the side effects of paracetamol for my mother?")
+    assert (time.perf_counter() - start) / 200 < 0.002
@@ -0,0 +1,44 @@
+import json
+import os
+import pytest
+from src.language_id import detect_language, identify_language
+from src.nlu_processor import normalize_hinglish_terms
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("मुझे बुखार है और सिर में दर्द है", "hi-IN"),
+    ("मला ताप आहे आणि डोकं दुखत आहे", "mr-IN"),
+    ("আমার জ্বর হয়েছে", "bn-IN"),
+    ("ನನಗೆ ಜ್ವರ ಇದೆ", "kn-IN"),
+    ("எனக்கு காய்ச்சல் இருக்கிறது", "ta-IN"),
+    ("నాకు జ్వరం ఉంది", "te-IN"),
+    ("എനിക്ക് പനി ഉണ്ട്", "ml-IN"),
+    ("I have a headache since morning", "en-IN"),
+])
+def test_detects_every_supported_language(text, expected):
+    assert detect_language(text) == expected
+
+
+def test_code_mixed_devanagari_is_not_english():
+    assert detect_language("मुझे fever और headache है") == "hi-IN"
+    assert detect_language("diabetes के क्या लक्षण हैं?") == "hi-IN"
+
+
+def test_romanized_hinglish_is_flagged_but_reported_as_english():
+    guess = identify_language("Mujhe weakness feel ho rahi hai since yesterday.")
+    assert guess.language == "en-IN"
+    assert guess.romanized_hinglish
+    assert not identify_language("I have been feeling weak since yesterday.").romanized_hinglish
+
+
+def test_empty_or_letterless_text_uses_default():
+    assert detect_language("") == "en-IN"
+    assert detect_language("123 ?!", default="hi-IN") == "hi-IN"
+
+
+def test_matches_nlu_test_case_languages():
+    path = os.path.join(os.path.dirname(__file__), "test_data", "nlu_test_cases.json")
+    with open(path, encoding="utf-8") as f:
+        cases = json.load(f)
+    for case in cases:
+        assert detect_language(normalize_hinglish_terms(case["input_text"])) == case["language"], case["input_text"]
@@ -0,0 +1,104 @@
+import copy
+import json
+
+import pytest
+
+from src.http_transport import SarvamTransport
+from src.localized_kb import LocalizedKB, build_localized_kb, kb_strings
+from src.mock_sarvam_server import MockSarvamServer
+from src.rate_limit import EndpointRateLimiter
+from src.utils import HealBeeUtilities
+
+KB = {"symptoms": [
+    {"symptom_name": "fever", "keywords": ["temperature"],
+     "follow_up_questions": ["How long have you had the fever?", "What is your temperature?"],
+     "basic_triage_points": ["Fever lasting more than 3 days warrants attention."]},
+    {"symptom_name": "cough", "keywords": [],
+     "follow_up_questions": ["How long have you had the fever?"],
+     "basic_triage_points": ["Coughing up blood is an urgent medical sign."]},
+]}
+
+
+@pytest.fixture
+def server():
+    with MockSarvamServer() as server:
+        yield server
+
+
+def _util(server):
+    transport = SarvamTransport(rate_limiter=EndpointRateLimiter({}))
+    return HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport, cache_translations=False)
+
+
+def test_build_translates_only_new_or_changed_strings(server, tmp_path):
+    kb_path, out_path = tmp_path / "kb.json", str(tmp_path / "kb.localized.json")
+    kb = copy.deepcopy(KB)
+    kb_path.write_text(json.dumps(kb), encoding="utf-8")
+    assert len(kb_strings(kb)) == 7
+
+    counts = build_localized_kb(_util(server), str(kb_path), out_path, ["hi-IN", "ta-IN"])
+    assert counts == {"strings": 7, "translated": 14, "reused": 0, "failed": 0}
+    assert server.stats.requests["translate"] == 14
+
+    kb["symptoms"][1]["basic_triage_points"] = ["Coughing up blood needs urgent care."]
+    kb_path.write_text(json.dumps(kb), encoding="utf-8")
+    counts = build_localized_kb(_util(server), str(kb_path), out_path, ["hi-IN", "ta-IN"])
+    assert counts == {"strings": 7, "translated": 2, "reused": 12, "failed": 0}
+    assert server.stats.requests["translate"] == 16
+
+    artifact = json.loads(open(out_path, encoding="utf-8").read())
+    assert len(artifact["strings"]) == 7 and artifact["languages"] == ["hi-IN", "ta-IN"]
+    assert "Coughing up blood is an urgent medical sign." not in {e["en-IN"] for e in artifact["strings"].values()}
+
+
+class _EchoUtil:
+    """Returns names like "COVID-19" unchanged and fails the strings in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.requests = 0
+
+    def translate_many(self, texts, target_lang, failed=None):
+        self.requests += len(texts)
+        failed.update(t for t in texts if t in self.failing)
+        return {t: t if t == "COVID-19" or t in self.failing else f"[{target_lang}] {t}" for t in texts}
+
+
+def test_identical_translations_are_kept_and_only_errors_fail(tmp_path):
+    kb_path, out_path = tmp_path / "kb.json", str(tmp_path / "kb.localized.json")
+    kb = {"symptoms": [{"symptom_name": "fever", "keywords": ["COVID-19"],
+                        "follow_up_questions": ["Any cough?"], "basic_triage_points": []}]}
+    kb_path.write_text(json.dumps(kb), encoding="utf-8")
+
+    counts = build_localized_kb(_EchoUtil(failing=["Any cough?"]), str(kb_path), out_path, ["hi-IN"])
+    assert counts == {"strings": 3, "translated": 2, "reused": 0, "failed": 1}
+    assert LocalizedKB(out_path, str(kb_path)).get("COVID-19", "hi-IN") == "COVID-19"
+
+    util = _EchoUtil()
+    counts = build_localized_kb(util, str(kb_path), out_path, ["hi-IN"])
+    assert counts == {"strings": 3, "translated": 1, "reused": 2, "failed": 0}
+    assert util.requests == 1  # only the failed string is retried
+
+
+def test_localized_kb_serves_without_network(server, tmp_path):
+    kb_path, out_path = tmp_path / "kb.json", str(tmp_path / "kb.localized.json")
+    kb_path.write_text(json.dumps(KB), encoding="utf-8")
+    build_localized_kb(_util(server), str(kb_path), out_path, ["hi-IN"])
+
+    localized = LocalizedKB(out_path, str(kb_path))
+    assert localized.translate("What is your temperature?", "hi-IN") == "[hi-IN] What is your temperature?"
+    assert localized.translate("What is your temperature?", "ta-IN") == "What is your temperature?"  # not built
+    assert localized.get("What is your temperature?", "en-IN") == "What is your temperature?"
+
+    before = server.stats.requests["translate"]
+    util = _util(server)
+    result = localized.translate_many(["Summary", "What is your temperature?"], "hi-IN", util)
+    assert result == {"Summary": "[hi-IN] Summary", "What is your temperature?": "[hi-IN] What is your temperature?"}
+    assert server.stats.requests["translate"] == before + 1
+
+    assert len(LocalizedKB(str(tmp_path / "missing.json"))) == 0
+
+    artifact = json.loads(open(out_path, encoding="utf-8").read())
+    artifact["mode"] = "modern-colloquial"
+    (tmp_path / "other_mode.json").write_text(json.dumps(artifact), encoding="utf-8")
+    assert len(LocalizedKB(str(tmp_path / "other_mode.json"), str(kb_path))) == 0
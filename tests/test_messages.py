@@ -0,0 +1,27 @@
+from src.messages import MESSAGE_LANGUAGES, get_message, load_message_catalog
+from src.nlu_processor import HealthIntent, NLUResult
+from src.response_generator import HealBeeResponseGenerator
+
+
+def test_catalog_covers_every_language_with_the_same_parameters():
+    for key, templates in load_message_catalog().items():
+        assert set(templates) == set(MESSAGE_LANGUAGES), key
+        params = {lang: sorted(p for p in ("{title}", "{location}") if p in t) for lang, t in templates.items()}
+        assert len({tuple(p) for p in params.values()}) == 1, key
+
+
+def test_get_message_fills_params_and_falls_back_to_english():
+    assert get_message("reminder_set", "en-IN", title="BP tablet") == (
+        "I've set a reminder for \"BP tablet\". You can view or edit it in the Reminders page.")
+    assert "\"BP tablet\"" in get_message("reminder_set", "ta-IN", title="BP tablet")
+    assert get_message("label_address", "hi") == "पता"
+    assert get_message("label_address", "gu-IN") == "Address"
+
+
+def test_response_fallbacks_are_localized_without_translation():
+    nlu = NLUResult(original_text="q", intent=HealthIntent.DIAGNOSIS_REQUEST, confidence=0.9, entities=[],
+                    is_emergency=False, requires_disclaimer=True, language_detected="te-IN")
+    generator = HealBeeResponseGenerator(api_key="test_api_key")
+    assert generator._get_hardcoded_safety_response(nlu) == get_message("diagnosis_refusal", "te")
+    assert generator._text_from_completion({}, nlu) == get_message("response_unavailable", "te")
+    assert generator._error_response(nlu) == get_message("response_error", "te")
@@ -0,0 +1,66 @@
+import json
+import random
+
+import pytest
+import requests
+
+from src.cache import TwoTierCache
+from src.http_transport import SarvamTransport
+from src.mock_sarvam_server import EndpointProfile, MockSarvamServer
+from src.nlu_processor import HealthIntent, SarvamAPIClient, SarvamMNLUProcessor
+from src.rate_limit import EndpointRateLimiter
+from src.resilience import ResilientCaller
+from src.utils import HealBeeUtilities
+
+
+@pytest.fixture
+def transport():
+    return SarvamTransport(rate_limiter=EndpointRateLimiter({}), backoff_base=0.01, backoff_max=0.05)
+
+
+def test_full_text_pipeline_runs_against_mock(transport):
+    with MockSarvamServer() as server:
+        nlu = SarvamMNLUProcessor(api_key="mock", cache_llm=False)
+        nlu.sarvam_client = SarvamAPIClient(api_key="mock", base_url=server.base_url, transport=transport,
+                                            cache=TwoTierCache(db_path=None),
+                                            resilience=ResilientCaller("chat", hedge_percentile=0))
+        result = nlu.process_transcription("I have had fever and headache since yesterday", "en-IN")
+        assert result.intent == HealthIntent.SYMPTOM_QUERY
+        assert {"fever", "headache"} <= {e.text for e in result.entities}
+
+        stream = "".join(nlu.sarvam_client.chat_completion_stream([{"role": "user", "content": "hi"}]))
+        assert stream.startswith("Thank you for sharing.")
+
+        util = HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport,
+                                translation_cache=TwoTierCache(db_path=None), cache_speech=False)
+        assert util.translate_text("Drink water", "hi-IN") == "[hi-IN] Drink water"
+        assert util.synthesize_speech("Drink water", "hi-IN")[:4] == b"RIFF"
+        assert server.stats.requests["tts"] == 1
+
+
+def test_mock_errors_and_rate_limits_are_configurable(transport):
+    profiles = {"translate": EndpointProfile(0, 0, rate_limit=1), "chat": EndpointProfile(0, 0, error_rate=1.0)}
+    with MockSarvamServer(profiles, seed=1) as server:
+        first = transport.post(f"{server.base_url}/translate", json={"input": "a", "target_language_code": "hi-IN"})
+        throttled = transport.session.post(f"{server.base_url}/translate",
+                                           json={"input": "b", "target_language_code": "hi-IN"})
+        assert first.status_code == 200 and throttled.status_code == 429
+        assert throttled.headers["Retry-After"] == "1"
+
+        failed = transport.post(f"{server.base_url}/v1/chat/completions",
+                                json={"messages": [{"role": "user", "content": "hi"}]})
+        assert failed.status_code >= 500
+        assert server.stats.errors["chat"] == transport.max_retries + 1
+
+
+def test_mock_latency_profile_and_detect_language():
+    profile = EndpointProfile(median_latency=0.2, p95_latency=0.6)
+    rng = random.Random(3)
+    samples = sorted(profile.sample_latency(rng) for _ in range(2000))
+    assert samples[1000] == pytest.approx(0.2, rel=0.15)
+    assert samples[1900] == pytest.approx(0.6, rel=0.2)
+
+    with MockSarvamServer() as server:
+        body = requests.post(f"{server.base_url}/detect-language", json={"input": "मला ताप आहे"}).json()
+        assert body["language_code"] == "mr-IN" and body["script_code"] == "Deva"
+        assert json.loads(requests.post(f"{server.base_url}/nope", json={}).text)["error"]
@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from src.nlu_processor import SarvamMNLUProcessor, HealthIntent
+
+
+class FakeSarvamClient:
+    """
+    Returns canned chat completion contents and records every call.
+    `contents` is either a queue (list) or a dict keyed by a phrase of the system prompt,
+    which keeps answers deterministic when the NLU steps run concurrently.
+    """
+
+    def __init__(self, contents, delay=0.0):
+        self.contents = contents if isinstance(contents, dict) else list(contents)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def chat_completion(self, messages, **kwargs):
+        with self._lock:
+            self.calls.append(messages)
+            if isinstance(self.contents, dict):
+                system = messages[0]["content"]
+                content = next(v for k, v in self.contents.items() if k in system)
+            else:
+                content = self.contents.pop(0)
+        time.sleep(self.delay)
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def _processor(contents, combined=True, local_intent_threshold=None):
+    processor = SarvamMNLUProcessor(api_key="test_api_key", combined_nlu=combined,
+                                    local_intent_threshold=local_intent_threshold)
+    processor.sarvam_client = FakeSarvamClient(contents)
+    return processor
+
+
+def test_combined_nlu_uses_single_call():
+    answer = {"intent": "medication_info", "confidence": 0.9,
+              "entities": [{"text": "paracetamol", "type": "medication", "start": 10, "end": 21}]}
+    processor = _processor(["```json\n" + json.dumps(answer) + "\n```"])
+    result = processor.process_transcription("Can I take paracetamol daily?", "en-IN")
+    assert len(processor.sarvam_client.calls) == 1
+    assert result.intent == HealthIntent.MEDICATION_INFO
+    assert result.confidence == 0.9
+    assert [e.text for e in result.entities] == ["paracetamol"]
+
+
+def test_combined_nlu_falls_back_to_two_calls_on_bad_json():
+    processor = _processor({
+        "classify the intent AND extract": "not json at all",
+        "intent classifier": json.dumps({"intent": "medication_info", "confidence": 0.8}),
+        "entity extractor": json.dumps({"entities": [{"text": "insulin", "type": "medication", "start": 9, "end": 16}]}),
+    })
+    result = processor.process_transcription("How does insulin work?", "en-IN")
+    assert len(processor.sarvam_client.calls) == 3
+    assert result.intent == HealthIntent.MEDICATION_INFO
+    assert [e.text for e in result.entities] == ["insulin"]
+
+
+def test_hinglish_symptom_precheck_overrides_combined_intent():
+    answer = {"intent": "general_health", "confidence": 0.6, "entities": []}
+    processor = _processor([json.dumps(answer)])
+    result = processor.process_transcription("mujhe bukhar hai", "hi-IN")
+    assert result.intent == HealthIntent.SYMPTOM_QUERY
+    assert result.confidence == 1.0
+    assert any(e.text == "fever" for e in result.entities)
+
+
+def test_emergency_short_circuits_llm_calls():
+    processor = _processor([])
+    result = processor.process_transcription("I have severe chest pain", "en-IN")
+    assert processor.sarvam_client.calls == []
+    assert result.is_emergency
+    assert result.intent == HealthIntent.EMERGENCY
+    assert result.confidence == 1.0
+
+
+def test_intent_and_entity_steps_run_concurrently():
+    processor = _processor({
+        "intent classifier": json.dumps({"intent": "medication_info", "confidence": 0.8}),
+        "entity extractor": json.dumps({"entities": []}),
+    }, combined=False)
+    processor.sarvam_client.delay = 0.3
+    start = time.monotonic()
+    result = processor.process_transcription("How does insulin work?", "en-IN")
+    assert time.monotonic() - start < 0.55
+    assert len(processor.sarvam_client.calls) == 2
+    assert result.intent == HealthIntent.MEDICATION_INFO
+
+
+def test_slow_step_falls_back_after_timeout():
+    processor = _processor({
+        "intent classifier": json.dumps({"intent": "medication_info", "confidence": 0.8}),
+        "entity extractor": json.dumps({"entities": []}),
+    }, combined=False)
+    processor.sarvam_client.delay = 0.5
+    processor.step_timeout = 0.1
+    start = time.monotonic()
+    result = processor.process_transcription("How does insulin work?", "en-IN")
+    assert time.monotonic() - start < 0.4
+    assert result.intent == HealthIntent.UNKNOWN
+    assert result.confidence == 0.5
+
+
+def test_confident_local_intent_skips_llm_intent_call():
+    processor = _processor({
+        "entity extractor": json.dumps({"entities": [{"text": "paracetamol", "type": "medication", "start": 10, "end": 21}]}),
+    }, local_intent_threshold=0.5)
+    result = processor.process_transcription("Can I take paracetamol daily?", "en-IN")
+    assert len(processor.sarvam_client.calls) == 1
+    assert "entity extractor" in processor.sarvam_client.calls[0][0]["content"]
+    assert result.intent == HealthIntent.MEDICATION_INFO
+
+
+def test_local_unknown_intent_still_asks_llm():
+    answer = json.dumps({"intent": "general_health", "confidence": 0.8, "entities": []})
+    processor = _processor({"classify the intent AND extract": answer}, local_intent_threshold=0.5)
+    assert processor.local_intent_classifier.predict("hello")[0] == "unknown"
+    result = processor.process_transcription("hello", "en-IN")
+    assert len(processor.sarvam_client.calls) == 1
+    assert result.intent == HealthIntent.GENERAL_HEALTH
+
+
+def test_process_many_dedupes_and_preserves_order():
+    answer = json.dumps({"intent": "medication_info", "confidence": 0.9, "entities": []})
+    processor = _processor({"classify the intent AND extract": answer})
+    processor.sarvam_client.delay = 0.05
+    texts = ["Can I take paracetamol daily?", "I have severe chest pain", "Can I take paracetamol daily?",
+             "How does insulin work?"]
+    results = list(processor.process_many(texts, "en-IN", max_concurrency=4))
+    assert [r.original_text for r in results] == texts
+    assert [r.intent for r in results] == [HealthIntent.MEDICATION_INFO, HealthIntent.EMERGENCY,
+                                           HealthIntent.MEDICATION_INFO, HealthIntent.MEDICATION_INFO]
+    # Duplicate query answered once, emergency answered locally
+    assert len(processor.sarvam_client.calls) == 2
+    assert results[0] is not results[2]
+
+
+def test_process_many_rate_limits_llm_queries():
+    answer = json.dumps({"intent": "general_health", "confidence": 0.9, "entities": []})
+    processor = _processor({"classify the intent AND extract": answer})
+    texts = [f"Tell me about vitamin {c}" for c in "ABCD"]
+    start = time.monotonic()
+    results = list(processor.process_many(texts, ["en-IN"] * 4, max_concurrency=4, requests_per_second=20))
+    assert len(results) == 4
+    assert time.monotonic() - start >= 0.14  # 1 token up front, then 3 more at 20/s
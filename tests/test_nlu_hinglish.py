@@ -3,8 +3,15 @@ from src.nlu_processor import normalize_hinglish_terms, correct_misspelled_entit
 def test_hinglish_normalization_examples():
     assert normalize_hinglish_terms("mere papa ko bukhar aur khansi hai") == "mere papa ko fever aur cough hai"
     assert normalize_hinglish_terms("मुझे sardi ho gayi hai") == "मुझे cold ho gayi hai"
-    assert normalize_hinglish_terms("pet mein jalan hai") == "pet mein burning sensation hai"
+    assert normalize_hinglish_terms("pet mein jalan hai") == "burning sensation hai"
     assert normalize_hinglish_terms("mere dost ko gala kharab hai") == "mere dost ko cough hai"
     assert normalize_hinglish_terms("मुझे thakan aur chakkar aa rahe hain") == "मुझे fatigue aur dizziness aa rahe hain"
     assert normalize_hinglish_terms("मुझे सिर दर्द है") == "मुझे headache है"
-    assert normalize_hinglish_terms("mere dost ko pet dard hai") == "mere dost ko stomach pain hai"
\ No newline at end of file
+    assert normalize_hinglish_terms("mere dost ko pet dard hai") == "mere dost ko stomach pain hai"
+
+def test_hinglish_normalization_longest_match_and_case():
+    # Longest variant wins over shorter overlapping ones, regardless of casing
+    assert normalize_hinglish_terms("Mujhe Pet Mein Dard hai") == "Mujhe stomach pain hai"
+    assert normalize_hinglish_terms("BUKHAR aur khansi") == "fever aur cough"
+    # Variants only match on word boundaries
+    assert normalize_hinglish_terms("bukharwala") == "bukharwala"
@@ -0,0 +1,41 @@
+from src.nlu_processor import HealthIntent, NLUResult
+from src.prompts import (
+    HEALTHCARE_SYSTEM_PROMPT,
+    PROMPT_MODULES,
+    assemble_system_prompt,
+    build_system_prompt,
+    select_prompt_modules,
+)
+from src.response_generator import HealBeeResponseGenerator
+
+
+def test_all_modules_reassemble_the_full_prompt():
+    assert assemble_system_prompt(tuple(PROMPT_MODULES)) == HEALTHCARE_SYSTEM_PROMPT
+
+
+def test_modules_follow_intent_and_features():
+    wellness = build_system_prompt("wellness_tip")
+    assert len(wellness) < len(HEALTHCARE_SYSTEM_PROMPT) / 2
+    assert "### 3.3." in wellness and "## 8." not in wellness
+
+    assert select_prompt_modules("symptom_query") == ("core", "conversation", "symptom")
+    nearby = build_system_prompt("symptom_query", frozenset({"nearby", "prior_context"}))
+    assert "### 10.2 " in nearby and "### 11.2" in nearby and "## 8." not in nearby
+    assert "continuity" in select_prompt_modules("general_health", frozenset({"journal"}))
+
+
+def test_assembled_prompts_are_memoized():
+    assemble_system_prompt.cache_clear()
+    first = build_system_prompt("disease_info")
+    assert build_system_prompt("prevention_info") is first
+    assert assemble_system_prompt.cache_info().hits == 1
+
+
+def test_generate_response_uses_compact_prompt_unless_disabled():
+    nlu = NLUResult(original_text="q", intent=HealthIntent.WELLNESS_TIP, confidence=0.9, entities=[],
+                    is_emergency=False, requires_disclaimer=True, language_detected="en-IN")
+    compact = HealBeeResponseGenerator(api_key="test_api_key")._build_messages("q", nlu, {})
+    full = HealBeeResponseGenerator(api_key="test_api_key", compact_prompts=False)._build_messages("q", nlu, {})
+    assert compact[0]["content"] == build_system_prompt("wellness_tip")
+    assert full[0]["content"] == HEALTHCARE_SYSTEM_PROMPT
+    assert compact[1] == full[1]
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from src.nlu_processor import HealthIntent, NLUResult, SarvamAPIClient
+from src.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+from src.response_generator import HealBeeResponseGenerator
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status}", response=response)
+
+
+def test_breaker_trips_fails_fast_and_recovers_through_half_open_probe():
+    caller = ResilientCaller("chat", breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.1), hedge_percentile=0)
+
+    def fail(hedged):
+        raise _http_error(503)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.HTTPError):
+            caller.call(fail)
+    with pytest.raises(CircuitOpenError):
+        caller.call(lambda hedged: "never sent")
+    assert caller.stats()["trips"] == 1 and caller.stats()["rejected"] == 1
+
+    time.sleep(0.15)
+    # Failed probe re-opens the breaker
+    with pytest.raises(requests.exceptions.HTTPError):
+        caller.call(fail)
+    assert caller.breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.15)
+    assert caller.call(lambda hedged: "ok") == "ok"
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    caller = ResilientCaller("chat", breaker=CircuitBreaker(failure_threshold=1), hedge_percentile=0)
+
+    def bad_request(hedged):
+        raise _http_error(400)
+
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.HTTPError):
+            caller.call(bad_request)
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_hedged_request_wins_when_first_attempt_is_slow():
+    caller = ResilientCaller("chat", hedge_delay=0.05)
+    release = threading.Event()
+
+    def attempt(hedged):
+        if not hedged:
+            release.wait(2)
+            return "slow"
+        return "hedge"
+
+    assert caller.call(attempt) == "hedge"
+    release.set()
+    stats = caller.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1 and stats["successes"] == 1
+
+
+def test_async_hedge_cancels_the_slow_attempt():
+    caller = ResilientCaller("chat", hedge_delay=0.05)
+    cancelled = []
+
+    async def attempt(hedged):
+        if hedged:
+            return "hedge"
+        try:
+            await asyncio.sleep(2)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "slow"
+
+    assert asyncio.run(caller.call_async(attempt)) == "hedge"
+    assert cancelled == [True]
+
+
+def test_open_breaker_returns_generate_response_fallback():
+    posts = []
+
+    class _FakeTransport:
+        def post(self, url, **kwargs):
+            posts.append(url)
+            raise requests.exceptions.ConnectionError("down")
+
+    caller = ResilientCaller("chat", breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60), hedge_percentile=0)
+    generator = HealBeeResponseGenerator(api_key="test_api_key")
+    generator.sarvam_client = SarvamAPIClient(api_key="test_api_key", transport=_FakeTransport(), resilience=caller)
+    nlu = NLUResult(original_text="How do I sleep better?", intent=HealthIntent.WELLNESS_TIP, confidence=0.9,
+                    entities=[], is_emergency=False, requires_disclaimer=True, language_detected="en-IN")
+
+    fallback = "Sorry, I am unable to assist you at the moment. Please try again later."
+    assert generator.generate_response("How do I sleep better?", nlu) == fallback
+    assert generator.generate_response("How do I sleep better?", nlu) == fallback
+    assert len(posts) == 1  # second turn failed fast without touching the network
+    assert list(generator.sarvam_client.chat_completion_stream([{"role": "user", "content": "hi"}])) == []
+    assert len(posts) == 1
@@ -0,0 +1,118 @@
+import json
+
+from src.emergency_detector import emergency_response
+from src.messages import get_message
+from src.nlu_processor import HealthIntent, NLUResult, SarvamAPIClient, iter_sse_content
+from src.response_generator import HealBeeResponseGenerator
+from src.utils import HealBeeUtilities, split_completed_sentences
+
+
+def _sse(*deltas):
+    lines = [b": keep-alive", b""]
+    for delta in deltas:
+        chunk = {"choices": [{"index": 0, "delta": {"content": delta}}]}
+        lines += [f"data: {json.dumps(chunk)}".encode("utf-8"), b""]
+    return lines + [b"data: [DONE]", b""]
+
+
+class _StreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+
+def test_iter_sse_content_parses_deltas_and_stops_at_done():
+    lines = _sse("Hel", "lo ", "तुम") + [b'data: {"choices": [{"delta": {"content": "ignored"}}]}']
+    assert list(iter_sse_content(lines)) == ["Hel", "lo ", "तुम"]
+
+
+def test_chat_completion_stream_requests_sse():
+    posts = []
+
+    class _FakeTransport:
+        def post(self, url, headers=None, json=None, read_timeout=None, stream=False):
+            posts.append((json, stream))
+            return _StreamResponse(_sse("Rest ", "well."))
+
+    client = SarvamAPIClient(api_key="test_api_key", transport=_FakeTransport())
+    assert "".join(client.chat_completion_stream([{"role": "user", "content": "hi"}])) == "Rest well."
+    payload, stream = posts[0]
+    assert payload["stream"] is True and stream is True
+
+
+class _FakeStreamingClient:
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    def chat_completion_stream(self, messages, **kwargs):
+        yield from self.deltas
+
+
+def _nlu_result(**overrides):
+    fields = dict(original_text="How do I sleep better?", intent=HealthIntent.WELLNESS_TIP, confidence=0.9,
+                  entities=[], is_emergency=False, requires_disclaimer=True, language_detected="en-IN")
+    fields.update(overrides)
+    return NLUResult(**fields)
+
+
+def test_generate_response_stream_yields_deltas_and_fallbacks():
+    generator = HealBeeResponseGenerator(api_key="test_api_key")
+    generator.sarvam_client = _FakeStreamingClient(["\n ", "Keep a ", "regular schedule."])
+    assert list(generator.generate_response_stream("q", _nlu_result())) == ["Keep a ", "regular schedule."]
+
+    generator.sarvam_client = _FakeStreamingClient([])
+    assert list(generator.generate_response_stream("q", _nlu_result())) == [
+        "Sorry, I am unable to assist you at the moment. Please try again later."]
+
+    chunks = list(generator.generate_response_stream("q", _nlu_result(is_emergency=True)))
+    assert len(chunks) == 1 and "immediate medical attention" in chunks[0]
+
+
+def test_split_completed_sentences_keeps_numbers_and_layout():
+    sentences, rest = split_completed_sentences("Rest well. Tips:\n1. Drink water. 2. Sleep e.g. 8 hours. Then")
+    assert sentences == [("Rest well.", " "), ("Tips:", "\n"), ("1. Drink water.", " "), ("2. Sleep e.g. 8 hours.", " ")]
+    assert rest == "Then"
+
+
+def test_translate_stream_translates_each_completed_sentence():
+    utils = HealBeeUtilities(api_key="test_api_key")
+    translated = []
+
+    def fake_translate(text, target_lang):
+        translated.append(text)
+        return f"<{text}>"
+
+    utils.translate_text = fake_translate
+    chunks = ["Drink wa", "ter. Rest", " well.\nSee a ", "doctor"]
+    assert "".join(utils.translate_stream(chunks, "hi-IN")) == "<Drink water.> <Rest well.>\n<See a doctor>"
+    assert translated == ["Drink water.", "Rest well.", "See a doctor"]
+    assert list(utils.translate_stream(iter(chunks), "en-IN")) == chunks
+
+
+def test_pre_localized_replies_skip_translate_stream():
+    generator = HealBeeResponseGenerator(api_key="test_api_key")
+    generator.sarvam_client = _FakeStreamingClient([])
+    utils = HealBeeUtilities(api_key="test_api_key")
+    translated = []
+    utils.translate_text = lambda text, target_lang: translated.append(text) or f"<{text}>"
+
+    emergency = generator.generate_response_stream("q", _nlu_result(is_emergency=True), reply_language="hi-IN")
+    fallback = generator.generate_response_stream("q", _nlu_result(), reply_language="hi-IN")
+    replies = ["".join(utils.translate_stream(stream, "hi-IN")) for stream in (emergency, fallback)]
+    assert replies == [emergency_response("hi"), get_message("response_unavailable", "hi")]
+    assert translated == []
+
+    # Catalog text in another language than the target is still translated
+    english = [get_message("response_error", "en")]
+    assert "".join(utils.translate_stream(english, "hi-IN")) == f"<{english[0]}>"
@@ -0,0 +1,106 @@
+import json
+import time
+
+from src.cache import TwoTierCache
+from src.http_transport import SarvamTransport
+from src.localized_kb import LocalizedKB, build_localized_kb
+from src.mock_sarvam_server import EndpointProfile, MockSarvamServer
+from src.rate_limit import EndpointRateLimiter
+from src.nlu_processor import HealthIntent, MedicalEntity, NLUResult
+from src.symptom_checker import SymptomChecker, format_assessment
+from src.symptom_lexicon import SymptomLexicon
+from src.utils import HealBeeUtilities
+
+ASSESSMENT = {
+    "assessment_summary": "Likely a viral fever.",
+    "suggested_severity": "Mild",
+    "recommended_next_steps": ["Drink water", "Rest", "Drink water"],
+    "potential_warnings": ["See a doctor if fever lasts over 3 days"],
+    "relevant_kb_triage_points": ["Rest", "Check temperature twice a day"],
+    "disclaimer": "Always consult a doctor.",
+}
+
+
+def test_assessment_is_translated_in_one_parallel_pass():
+    transport = SarvamTransport(rate_limiter=EndpointRateLimiter({}))
+    with MockSarvamServer({"translate": EndpointProfile(0.1, 0.1)}) as server:
+        util = HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport,
+                                translation_cache=TwoTierCache(db_path=None))
+        start = time.perf_counter()
+        markdown = format_assessment(ASSESSMENT, util, "ta-IN")
+        elapsed = time.perf_counter() - start
+        # 14 distinct strings; "Drink water" and "Rest" are translated once
+        assert server.stats.requests["translate"] == 14
+        assert elapsed < 14 * 0.1 / 2
+
+        format_assessment(ASSESSMENT, util, "ta-IN")
+        assert server.stats.requests["translate"] == 14  # second render served from cache
+
+    assert markdown.startswith("<h4> [ta-IN] Preliminary Health Assessment:</h4>\n\n")
+    assert "**[ta-IN] Summary:** [ta-IN] Likely a viral fever.\n\n" in markdown
+    assert markdown.count("- [ta-IN] Drink water\n") == 2
+    assert "\n**[ta-IN] Relevant Triage Points from Knowledge Base:**\n- [ta-IN] Rest\n" in markdown
+    assert markdown.endswith("\n\n**[ta-IN] Disclaimer:** [ta-IN] Always consult a doctor.")
+
+
+def test_english_assessment_makes_no_calls_and_keeps_layout():
+    util = HealBeeUtilities(api_key="mock", transport=None, cache_translations=False)
+    util.translate_text = None  # any translation call would fail
+    assessment = dict(ASSESSMENT, recommended_next_steps="Drink water. Rest well!", potential_warnings=[])
+    markdown = format_assessment(assessment, util, "en-IN")
+    assert "**Recommended Next Steps:**\nDrink water.\n- Rest well!\n" in markdown
+    assert "Potential Warnings" not in markdown
+
+
+def test_symptom_entities_resolve_locally_in_any_script(monkeypatch):
+    entities = [MedicalEntity(text, "symptom", 0.9, 0, 0) for text in ("बुखार", "pet dard", "terrible cough", "fever")]
+    nlu = NLUResult(original_text="...", intent=HealthIntent.SYMPTOM_QUERY, confidence=0.9, entities=entities,
+                    is_emergency=False, requires_disclaimer=True, language_detected="hi-IN")
+    checker = SymptomChecker(nlu_result=nlu, api_key="test_api_key")
+
+    def no_network(text):
+        raise AssertionError(f"translated {text!r}")
+
+    monkeypatch.setattr(checker.utils, "translate_text_to_english", no_network)
+    names = [s["symptom_name"] for s in checker.identify_relevant_symptoms()]
+    assert names == ["fever", "stomach ache", "cough"]
+
+
+def test_unknown_wording_falls_back_to_translation_only_when_not_english(monkeypatch):
+    entities = [MedicalEntity("ಜ್ವರ", "symptom", 0.9, 0, 0), MedicalEntity("strange tingling", "symptom", 0.9, 0, 0)]
+    nlu = NLUResult(original_text="...", intent=HealthIntent.SYMPTOM_QUERY, confidence=0.9, entities=entities,
+                    is_emergency=False, requires_disclaimer=True, language_detected="kn-IN")
+    checker = SymptomChecker(nlu_result=nlu, api_key="test_api_key")
+    translated = []
+    monkeypatch.setattr(checker.utils, "translate_text_to_english", lambda text: translated.append(text) or "fever")
+    assert [s["symptom_name"] for s in checker.identify_relevant_symptoms()] == ["fever"]
+    assert translated == ["ಜ್ವರ"]
+
+
+def test_lexicon_indexes_localized_kb_variants(tmp_path):
+    kb = {"symptoms": [{"symptom_name": "fever", "keywords": ["temperature"],
+                        "follow_up_questions": [], "basic_triage_points": []}]}
+    kb_path, out_path = tmp_path / "kb.json", str(tmp_path / "kb.localized.json")
+    kb_path.write_text(json.dumps(kb), encoding="utf-8")
+    transport = SarvamTransport(rate_limiter=EndpointRateLimiter({}))
+    with MockSarvamServer() as server:
+        util = HealBeeUtilities(api_key="mock", base_url=server.base_url, transport=transport, cache_translations=False)
+        build_localized_kb(util, str(kb_path), out_path, ["ta-IN"])
+
+    lexicon = SymptomLexicon(kb["symptoms"], LocalizedKB(out_path, str(kb_path)), {"fever": ["bukhar", "बुखार"]})
+    assert lexicon.resolve("[ta-IN] temperature") == "fever"  # mock translation of a keyword
+    assert lexicon.resolve(" BUKHAR ") == "fever"
+    assert lexicon.resolve("तेज बुखार") == "fever"  # native-script variants match whole words
+    assert lexicon.resolve("high temperature") == "fever"  # KB keywords still match anywhere
+    assert lexicon.resolve("fever", exclude={"fever"}) is None
+
+
+def test_lexicon_variants_do_not_match_inside_other_words():
+    kb = {"symptoms": [{"symptom_name": "nasal congestion", "keywords": ["stuffy nose"]},
+                       {"symptom_name": "headache", "keywords": []}]}
+    lexicon = SymptomLexicon(kb["symptoms"], None, {"cold": ["cold", "sardi", "जुकाम", "nasal congestion"], "headache": ["सिर दर्द"]})
+    assert lexicon.resolve("cold") == "nasal congestion"
+    assert lexicon.resolve("cold hands") is None  # romanized / English variants match whole entities only
+    assert lexicon.resolve("mujhe sardi hai") is None  # left to the translation fallback
+    assert lexicon.resolve("जुकामों") is None
+    assert lexicon.resolve("तेज सिर दर्द") == "headache"
@@ -0,0 +1,50 @@
+from src.text_index import BKTree, IntervalSet, KeywordAutomaton, levenshtein
+from src.nlu_processor import SarvamMNLUProcessor, MedicalEntity
+
+
+def test_automaton_finds_overlapping_matches_in_one_pass():
+    index = KeywordAutomaton(["he", "she", "hers", "ache", "headache"])
+    matches = index.find_all("ushers headache")
+    assert (1, 4, "she") in matches
+    assert (2, 6, "hers") in matches
+    assert (7, 15, "headache") in matches
+    assert (11, 15, "ache") in matches
+    assert index.contains_any("no pain") is False
+
+
+def test_automaton_keeps_first_payload_for_duplicate_keywords():
+    index = KeywordAutomaton()
+    assert index.add("fever", 0)
+    assert not index.add("fever", 5)
+    assert index.find_all("high fever") == [(5, 10, 0)]
+
+
+def test_interval_set_merges_and_queries():
+    spans = IntervalSet()
+    spans.add(10, 15)
+    spans.add(0, 3)
+    spans.add(3, 6)
+    assert len(spans) == 2
+    assert spans.overlaps(5, 7)
+    assert not spans.overlaps(6, 10)
+    assert spans.overlaps(14, 20)
+    assert not spans.overlaps(4, 4)
+
+
+def test_kb_augmentation_skips_spans_covered_by_llm_entities():
+    processor = SarvamMNLUProcessor(api_key="test_api_key")
+    text = "I have a headache and a sore throat"
+    llm_entities = [MedicalEntity(text="sore throat", entity_type="symptom", confidence=0.9, start_pos=24, end_pos=35)]
+    entities = processor._augment_and_correct_entities(text, llm_entities)
+    texts = [e.text.lower() for e in entities]
+    assert texts.count("sore throat") == 1
+    assert "headache" in texts
+
+
+def test_bk_tree_bounded_search_matches_linear_scan():
+    terms = ["fever", "cough", "cold", "flu", "migraine", "asthma", "allergy", "rash", "fevers"]
+    tree = BKTree(terms)
+    assert len(tree) == len(terms)
+    for query in ["fevr", "coff", "alergi", "xyz"]:
+        expected = sorted((levenshtein(query, t), t) for t in terms if levenshtein(query, t) <= 2)
+        assert tree.search(query, 2) == expected